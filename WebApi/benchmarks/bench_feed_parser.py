@@ -0,0 +1,54 @@
+"""
+Streaming feed parser (services/feed_parser.py) vs feedparser on the saved fixture feeds in
+tests/fixtures/feeds, by feed length and entry limit. Runs offline.
+
+    python -m benchmarks.bench_feed_parser --items 40 200 1000 --limits 10 25 --repeat 5
+
+Longer feeds are built by repeating the fixture's entries, so they keep its large
+content:encoded / content bodies. feedparser always parses the whole feed; the streaming
+parser stops after `limit` entries.
+"""
+import benchmarks.common  # noqa: F401  (loads .env, FERNET_KEY)
+
+import argparse
+import os
+import re
+
+from benchmarks.common import median_ms, print_table, time_calls
+from services.feed_parser import parse_feed_with_feedparser, stream_feed_entries
+
+FEEDS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "tests", "fixtures", "feeds")
+FEEDS = {"rss": ("news_rss_content_encoded.xml", b"item"), "atom": ("tech_atom.xml", b"entry")}
+
+
+def make_feed(name: str, items: int) -> bytes:
+    filename, tag = FEEDS[name]
+    with open(os.path.join(FEEDS_DIR, filename), "rb") as f:
+        content = f.read()
+    entries = re.findall(rb"<%s>.*?</%s>\s*" % (tag, tag), content, re.DOTALL)
+    head = content[:content.index(entries[0])]
+    tail = content[content.index(entries[-1]) + len(entries[-1]):]
+    repeated = (entries * (items // len(entries) + 1))[:items]
+    return head + b"".join(repeated) + tail
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Streaming feed parser vs feedparser")
+    parser.add_argument("--items", type=int, nargs="+", default=[40, 200, 1000])
+    parser.add_argument("--limits", type=int, nargs="+", default=[10, 25])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    rows = []
+    for name in FEEDS:
+        for items in args.items:
+            content = make_feed(name, items)
+            for limit in args.limits:
+                streaming = median_ms(time_calls(lambda: stream_feed_entries(content, limit), args.repeat))
+                reference = median_ms(time_calls(lambda: parse_feed_with_feedparser(content, limit), args.repeat))
+                rows.append([name, items, len(content), limit, streaming, reference, round(reference / streaming, 1)])
+    print_table(["feed", "items", "bytes", "limit", "streaming ms", "feedparser ms", "speedup"], rows)
+
+
+if __name__ == "__main__":
+    main()
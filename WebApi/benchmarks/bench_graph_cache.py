@@ -0,0 +1,69 @@
+"""
+Cost of building and compiling a workflow graph vs serving it from the compiled graph
+cache, by workflow length, for linear chains and a fan-out/fan-in DAG. Runs offline.
+
+    python -m benchmarks.bench_graph_cache --lengths 1 3 5 10 --repeat 50
+
+"miss ms" is build + compile (what every run paid before the cache), "hit us" is
+get_compiled_graph on a warm cache, and "by key us" is the saved-plan path, which
+skips resolving the steps.
+"""
+import benchmarks.common  # noqa: F401  (loads .env, FERNET_KEY)
+
+import argparse
+import statistics
+
+from benchmarks.common import median_ms, print_table, time_calls
+from builder.graph_builder import build_graph_from_user_input, get_compiled_graph, get_compiled_graph_by_key, get_graph_key, graph_cache
+from mapping.node_mapping import function_map
+
+
+def make_workflow(length: int, dag: bool) -> tuple:
+    node_ids = list(function_map)[:length]
+    steps = [{"node_id": node_id, "seq": seq} for seq, node_id in enumerate(node_ids, 1)]
+    if not dag or length < 3:
+        return steps, None
+    # First node fans out to every middle node, which all join into the last one
+    first, middle, last = node_ids[0], node_ids[1:-1], node_ids[-1]
+    edges = [{"source": first, "target": node_id} for node_id in middle]
+    edges += [{"source": node_id, "target": last} for node_id in middle]
+    return steps, edges
+
+
+def median_us(durations) -> float:
+    return round(statistics.median(durations) * 1_000_000, 2)
+
+
+def measure(steps: list, edges, repeat: int) -> list:
+    miss = median_ms(time_calls(lambda: build_graph_from_user_input(steps, edges).compile(), repeat))
+    graph_cache.clear()
+    get_compiled_graph(steps, edges)
+    hits = repeat * 100
+    hit = median_us(time_calls(lambda: get_compiled_graph(steps, edges), hits))
+    key = get_graph_key(steps, edges)
+    by_key = median_us(time_calls(lambda: get_compiled_graph_by_key(key), hits))
+    return [miss, hit, by_key, round(miss * 1000 / hit)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compiled graph cache: build+compile vs cache hit")
+    parser.add_argument("--lengths", type=int, nargs="+", default=[1, 3, 5, 10])
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    rows = []
+    for length in args.lengths:
+        if length > len(function_map):
+            print(f"⚠️ Skipping length {length}: only {len(function_map)} node types")
+            continue
+        for dag in (False, True):
+            if dag and length < 3:
+                continue
+            steps, edges = make_workflow(length, dag)
+            rows.append([length, "dag" if dag else "chain"] + measure(steps, edges, args.repeat))
+    graph_cache.clear()
+    print_table(["nodes", "shape", "miss ms", "hit us", "by key us", "speedup"], rows)
+
+
+if __name__ == "__main__":
+    main()
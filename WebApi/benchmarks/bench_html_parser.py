@@ -0,0 +1,95 @@
+"""
+HTML parsing cost by page size: html.parser vs lxml (when installed), and main-content
+extraction inline vs in the HTML process pool. Runs offline.
+
+    python -m benchmarks.bench_html_parser --sizes 50000 500000 2000000 8000000
+
+Pages are built by repeating the blocks of tests/fixtures/extraction/blog_density.html up
+to each size, so they keep the fixture's mix of navigation, sidebar links and prose.
+"""
+import benchmarks.common  # noqa: F401  (loads .env, FERNET_KEY)
+
+import argparse
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from bs4 import BeautifulSoup
+
+from benchmarks.common import median_ms, print_table, time_calls
+from services import html_parser
+from services.content_extractor import _extract_main_content, extract_main_content
+
+FIXTURE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "tests", "fixtures", "extraction", "blog_density.html")
+
+
+def make_page(size: int) -> str:
+    with open(FIXTURE, encoding="utf-8") as f:
+        html = f.read()
+    body = html[html.index("<body>") + len("<body>"):html.index("</body>")]
+    repeats = max(1, size // len(body))
+    return "<html><body>" + body * repeats + "</body></html>"
+
+
+def available_backends() -> list:
+    backends = ["html.parser"]
+    try:
+        import lxml  # noqa: F401
+        backends.append("lxml")
+    except ImportError:
+        pass
+    return backends
+
+
+def concurrent_extract(html: str, threads: int) -> float:
+    """Wall time for `threads` extractions at once (shows GIL contention vs the pool)."""
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        list(executor.map(lambda _: extract_main_content(html), range(threads)))
+    return time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description="HTML parsing benchmark by page size")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[50_000, 500_000, 2_000_000, 8_000_000])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--threads", type=int, default=4, help="Concurrent extractions for the contention column")
+    args = parser.parse_args()
+
+    backends = available_backends()
+    rows = []
+    for size in args.sizes:
+        html = make_page(size)
+        row = [len(html)]
+        for backend in backends:
+            row.append(median_ms(time_calls(lambda: BeautifulSoup(html, backend), args.repeat)))
+        row.append(median_ms(time_calls(lambda: _extract_main_content(html), args.repeat)))
+
+        # Offload every document to the process pool regardless of the threshold
+        threshold = html_parser.HTML_PROCESS_POOL_THRESHOLD
+        html_parser.HTML_PROCESS_POOL_THRESHOLD = 0
+        try:
+            extract_main_content(html)  # start the pool outside the timing
+            row.append(median_ms(time_calls(lambda: extract_main_content(html), args.repeat)))
+            pooled = concurrent_extract(html, args.threads)
+        finally:
+            html_parser.HTML_PROCESS_POOL_THRESHOLD = threshold
+        html_parser.HTML_PROCESS_POOL_SIZE, pool_size = 0, html_parser.HTML_PROCESS_POOL_SIZE
+        try:
+            inline = concurrent_extract(html, args.threads)
+        finally:
+            html_parser.HTML_PROCESS_POOL_SIZE = pool_size
+        row += [round(inline * 1000, 1), round(pooled * 1000, 1)]
+        rows.append(row)
+    html_parser.shutdown_html_process_pool()
+
+    headers = ["chars"] + [f"parse {backend} ms" for backend in backends] + [
+        "extract inline ms", "extract pool ms", f"{args.threads}x inline ms", f"{args.threads}x pool ms",
+    ]
+    print(f"Default backend: {html_parser.PARSER_BACKEND}, pool size {html_parser.HTML_PROCESS_POOL_SIZE} "
+          f"({html_parser.HTML_PROCESS_START_METHOD})")
+    print_table(headers, rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""
+Throughput of the background job queue with N worker processes. Needs a local Redis
+(REDIS_HOST/REDIS_PORT from .env) and uses its own stream, so it never touches real runs.
+
+    python -m benchmarks.bench_job_queue --workers 1 2 4 --jobs 200 --concurrency 4 --job-seconds 0.05
+
+Every job runs a stub workflow that sleeps --job-seconds, so the numbers show queue and
+worker overhead and how throughput scales with workers, not node latency.
+"""
+import os
+
+# Before job_queue/worker are imported, also in the spawned worker processes
+os.environ.setdefault("JOB_STREAM", "bench_workflow_runs")
+os.environ.setdefault("JOB_GROUP", "bench_workflow_workers")
+os.environ.setdefault("JOB_READ_BLOCK_MS", "200")
+
+import benchmarks.common  # noqa: F401  (loads .env, FERNET_KEY)
+
+import argparse
+import asyncio
+import multiprocessing
+import signal
+import statistics
+import time
+
+from benchmarks.common import print_table
+from redis_client import get_redis_client
+from services.job_queue import JOB_STREAM, JOB_GROUP, RUN_COMPLETED, ensure_job_group, enqueue_run
+
+PAYLOAD = {"graph_flowData": [], "additional_input": [], "edges": None, "no_cache": False}
+
+
+def _run_worker(name: str, concurrency: int, job_seconds: float):
+    import worker
+
+    async def stub_workflow(*args, **kwargs):
+        await asyncio.sleep(job_seconds)
+        return {"results": []}
+
+    async def main():
+        worker.execute_graph_flow_async = stub_workflow
+        stop = asyncio.Event()
+        asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, stop.set)
+        await worker.work(name, concurrency, stop)
+
+    asyncio.run(main())
+
+
+async def _wait_for_consumers(client, count: int):
+    while True:
+        consumers = await client.xinfo_consumers(JOB_STREAM, JOB_GROUP)
+        if len(consumers) >= count:
+            return
+        await asyncio.sleep(0.1)
+
+
+async def _statuses(client, run_ids):
+    async with client.pipeline(transaction=False) as pipe:
+        for run_id in run_ids:
+            pipe.hmget(f"job_run:{run_id}", "status", "created_at", "started_at")
+        return await pipe.execute()
+
+
+async def run_round(workers: int, jobs: int, concurrency: int, job_seconds: float) -> list:
+    client = await get_redis_client()
+    await client.delete(JOB_STREAM)
+    await ensure_job_group(client)
+
+    context = multiprocessing.get_context("spawn")
+    processes = [context.Process(target=_run_worker, args=(f"bench-{workers}-{i}", concurrency, job_seconds)) for i in range(workers)]
+    for process in processes:
+        process.start()
+    run_ids = []
+    try:
+        # Start timing once every worker is reading, so process start-up isn't measured
+        await _wait_for_consumers(client, workers)
+        started = time.perf_counter()
+        run_ids = [await enqueue_run("bench", PAYLOAD) for _ in range(jobs)]
+        while True:
+            statuses = await _statuses(client, run_ids)
+            if all(status == RUN_COMPLETED for status, _, _ in statuses):
+                break
+            await asyncio.sleep(0.02)
+        elapsed = time.perf_counter() - started
+    finally:
+        for process in processes:
+            process.terminate()
+        for process in processes:
+            process.join(timeout=10)
+        keys = [f"job_run:{run_id}" for run_id in run_ids] + [f"job_result:{run_id}" for run_id in run_ids]
+        if keys:
+            await client.delete(*keys)
+        await client.delete(JOB_STREAM)
+
+    queue_waits = [float(started_at) - float(created_at) for _, created_at, started_at in statuses]
+    ideal = workers * concurrency / job_seconds
+    return [
+        workers,
+        jobs,
+        round(elapsed, 2),
+        round(jobs / elapsed, 1),
+        round(min(ideal, jobs / job_seconds), 1),
+        round(statistics.median(queue_waits) * 1000, 1),
+    ]
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Job queue throughput for N worker processes")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--jobs", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=4, help="Jobs per worker at once")
+    parser.add_argument("--job-seconds", type=float, default=0.05, help="Duration of the stub workflow")
+    args = parser.parse_args()
+
+    rows = [await run_round(workers, args.jobs, args.concurrency, args.job_seconds) for workers in args.workers]
+    print_table(["workers", "jobs", "seconds", "jobs/s", "ideal jobs/s", "median queue wait ms"], rows)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,75 @@
+"""
+Category matching throughput of fetch_top_news in entries/s, over the headlines of the
+saved fixture feeds in tests/fixtures/feeds. Runs offline.
+
+    python -m benchmarks.bench_news_matching --entries 100000
+
+"one scan" is score_headline over the combined title + description; "two scans" runs the
+pattern over the title and the description separately, for comparison. Both visit every
+character once. The single scan is faster for headlines that don't match (the common case)
+and slower for categories most headlines match, where it loops over the matches in Python.
+"""
+import benchmarks.common  # noqa: F401  (loads .env, FERNET_KEY)
+
+import argparse
+import os
+import time
+
+from benchmarks.common import print_table
+from nodes.fetch_top_news import CATEGORY_PATTERNS, NEWS_CATEGORIES, score_headline
+from services.feed_parser import clean_text, parse_feed
+
+FEEDS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "tests", "fixtures", "feeds")
+SOURCE = "BBC News"
+
+
+def load_headlines() -> list:
+    headlines = []
+    for name in sorted(os.listdir(FEEDS_DIR)):
+        with open(os.path.join(FEEDS_DIR, name), "rb") as f:
+            for entry in parse_feed(f.read(), 1000):
+                title, description = clean_text(entry["title"]), clean_text(entry["summary"])
+                content = title + ("\n\n" + description if description else "")
+                headlines.append((title, description, content))
+    return headlines
+
+
+def one_scan(pattern, headlines) -> int:
+    return sum(1 for title, _, content in headlines if score_headline(pattern, content, len(title)))
+
+
+def two_scans(pattern, headlines) -> int:
+    return sum(1 for title, description, _ in headlines if 2 * len(pattern.findall(title)) + len(pattern.findall(description)))
+
+
+def entries_per_second(fn, pattern, headlines, repeat: int) -> tuple:
+    """Best of `repeat` runs, and the number of matching headlines."""
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        matched = fn(pattern, headlines)
+        best = min(best, time.perf_counter() - started)
+    return round(len(headlines) / best), matched
+
+
+def main():
+    parser = argparse.ArgumentParser(description="fetch_top_news category matching throughput")
+    parser.add_argument("--entries", type=int, default=100_000, help="Headlines scored per category")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    fixture = load_headlines()
+    headlines = (fixture * (args.entries // len(fixture) + 1))[:args.entries]
+    rows = []
+    for category in NEWS_CATEGORIES:
+        pattern = CATEGORY_PATTERNS[SOURCE][category]
+        single, matched = entries_per_second(one_scan, pattern, headlines, args.repeat)
+        double, _ = entries_per_second(two_scans, pattern, headlines, args.repeat)
+        rows.append([category, round(matched / len(headlines) * 100, 1), single, double])
+    avg_chars = sum(len(content) for _, _, content in fixture) // len(fixture)
+    print(f"{len(fixture)} fixture headlines (avg {avg_chars} chars), {len(headlines)} scored per category, {SOURCE} keywords")
+    print_table(["category", "matched %", "one scan entries/s", "two scans entries/s"], rows)
+
+
+if __name__ == "__main__":
+    main()
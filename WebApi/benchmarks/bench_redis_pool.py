@@ -0,0 +1,91 @@
+"""
+Per-lookup latency of a get_user_openai_key_sync-style read (GET + decrypt): a new
+redis.Redis(...) per lookup (how node code read Redis before the shared pool) vs
+get_sync_redis_client(). Needs a local Redis (REDIS_HOST/REDIS_PORT from .env); it writes
+one bench_redis_pool key and deletes it afterwards.
+
+    python -m benchmarks.bench_redis_pool --threads 1 8 32 --lookups 2000
+
+With several threads, the pool's avg_wait_ms is the time spent waiting for a free
+connection (REDIS_MAX_CONNECTIONS).
+"""
+import benchmarks.common  # noqa: F401  (loads .env, FERNET_KEY)
+
+import argparse
+import json
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import redis
+
+import redis_client
+from benchmarks.common import print_table
+from redis_client import REDIS_DB, REDIS_HOST, REDIS_PASSWORD, REDIS_PORT, decrypt_api_key, encrypt_api_key
+
+KEY = "api_key:bench_redis_pool:openai"
+
+
+def fresh_client_lookup() -> str:
+    client = redis.Redis(host=REDIS_HOST, port=REDIS_PORT, password=REDIS_PASSWORD, db=REDIS_DB, decode_responses=True)
+    try:
+        return decrypt_api_key(json.loads(client.get(KEY))["api_key"])
+    finally:
+        client.close()
+
+
+def pooled_lookup() -> str:
+    return decrypt_api_key(json.loads(redis_client.get_sync_redis_client().get(KEY))["api_key"])
+
+
+def timed(lookup) -> float:
+    started = time.perf_counter()
+    lookup()
+    return time.perf_counter() - started
+
+
+def measure(lookup, threads: int, lookups: int) -> list:
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        durations = sorted(executor.map(lambda _: timed(lookup), range(lookups)))
+    elapsed = time.perf_counter() - started
+    return [
+        round(statistics.median(durations) * 1000, 3),
+        round(durations[int(len(durations) * 0.95)] * 1000, 3),
+        round(lookups / elapsed),
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fresh Redis client per lookup vs the shared sync pool")
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--lookups", type=int, default=2000)
+    args = parser.parse_args()
+
+    setup = redis.Redis(host=REDIS_HOST, port=REDIS_PORT, password=REDIS_PASSWORD, db=REDIS_DB)
+    setup.set(KEY, json.dumps({"api_key": encrypt_api_key("sk-bench")}))
+    rows = []
+    try:
+        for threads in args.threads:
+            fresh = measure(fresh_client_lookup, threads, args.lookups)
+            # New pool per round so its wait stats only cover this round
+            redis_client.close_sync_redis_pool()
+            redis_client.init_sync_redis_pool()
+            pooled_lookup()  # connect outside the timing
+            pooled = measure(pooled_lookup, threads, args.lookups)
+            pool_stats = redis_client.get_sync_redis_pool_stats()
+            rows.append([threads] + fresh + pooled + [pool_stats["avg_wait_ms"], pool_stats["created"]])
+    finally:
+        setup.delete(KEY)
+        setup.close()
+        redis_client.close_sync_redis_pool()
+
+    print(f"{args.lookups} lookups per round, pool max {redis_client.REDIS_MAX_CONNECTIONS} connections")
+    print_table([
+        "threads", "fresh median ms", "fresh p95 ms", "fresh lookups/s",
+        "pool median ms", "pool p95 ms", "pool lookups/s", "pool avg_wait_ms", "pool connections",
+    ], rows)
+
+
+if __name__ == "__main__":
+    main()
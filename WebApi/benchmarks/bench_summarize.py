@@ -0,0 +1,103 @@
+"""
+Latency and output size of summarize_html_content on large pages, single pass vs the
+chunked map-reduce path. Runs offline: the LLM is a stub that sleeps --llm-seconds and
+returns a ~150 word summary, so the numbers show the chunking and fan-out, not a model.
+
+    python -m benchmarks.bench_summarize --sizes 20000 100000 400000 1000000 --llm-seconds 0.5
+
+Pages are the text extracted from the tests/fixtures/extraction pages, repeated up to each
+size. "sequential ms" runs the chunk summaries one at a time for comparison.
+"""
+import benchmarks.common  # noqa: F401  (loads .env, FERNET_KEY)
+
+import argparse
+import glob
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.common import median_ms, print_table, time_calls
+from nodes import summarize_html_content
+from services.content_extractor import extract_main_content
+from services.node_metrics import collect_node_metrics
+from services.text_chunking import estimate_tokens
+
+FIXTURES = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "tests", "fixtures", "extraction")
+STUB_SUMMARY = " ".join(["point"] * 150)
+
+
+def fixture_text() -> str:
+    texts = []
+    for path in sorted(glob.glob(os.path.join(FIXTURES, "*.html"))):
+        with open(path, encoding="utf-8") as f:
+            texts.append(extract_main_content(f.read())["text"])
+    return "\n\n".join(text for text in texts if text)
+
+
+def make_page(text: str, size: int) -> str:
+    return "\n\n".join([text] * max(1, size // len(text)))
+
+
+def stub_completion(llm_seconds: float, calls: list):
+    def completion(api_key, **kwargs):
+        calls.append(estimate_tokens(kwargs["messages"][1]["content"]))
+        time.sleep(llm_seconds)
+        return STUB_SUMMARY
+    return completion
+
+
+def summarize(page: str) -> dict:
+    with collect_node_metrics() as metrics:
+        state = summarize_html_content.summarize_html_content({"user_id": "bench", "node_input": page})
+    return {"result": state["node_result"], "metrics": metrics}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="summarize_html_content latency and output size by page size")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[20_000, 100_000, 400_000, 1_000_000])
+    parser.add_argument("--llm-seconds", type=float, default=0.5, help="Duration of each stub LLM call")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    calls = []
+    summarize_html_content.get_user_openai_key_sync = lambda user_id: "sk-bench"
+    summarize_html_content.cached_chat_completion = stub_completion(args.llm_seconds, calls)
+    text = fixture_text()
+
+    rows = []
+    for size in args.sizes:
+        page = make_page(text, size)
+        calls.clear()
+        run = summarize(page)
+        llm_calls, reduce_tokens = len(calls), calls[-1]
+        parallel = median_ms(time_calls(lambda: summarize(page), args.repeat))
+
+        pool = summarize_html_content.summary_executor
+        summarize_html_content.summary_executor = ThreadPoolExecutor(max_workers=1)
+        try:
+            sequential = median_ms(time_calls(lambda: summarize(page), args.repeat))
+        finally:
+            summarize_html_content.summary_executor.shutdown()
+            summarize_html_content.summary_executor = pool
+
+        rows.append([
+            len(page),
+            estimate_tokens(page),
+            run["metrics"].get("summary_chunks", 0),
+            run["metrics"].get("summary_chunks_dropped", 0),
+            llm_calls,
+            reduce_tokens,
+            len(run["result"]),
+            parallel,
+            sequential,
+        ])
+
+    print(f"Single pass up to {summarize_html_content.SUMMARY_SINGLE_PASS_TOKENS} tokens, chunks of "
+          f"{summarize_html_content.SUMMARY_CHUNK_TOKENS}, {summarize_html_content.SUMMARY_MAP_WORKERS} map workers, "
+          f"stub LLM {args.llm_seconds}s per call")
+    print_table(["chars", "tokens est", "chunks", "dropped", "llm calls", "reduce input tokens", "result chars",
+                 "ms", "sequential ms"], rows)
+
+
+if __name__ == "__main__":
+    main()
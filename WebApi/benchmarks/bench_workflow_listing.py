@@ -0,0 +1,144 @@
+"""
+Redis round trips and latency of listing a user's workflows as the number of saved
+workflows grows. Needs a local Redis (REDIS_HOST/REDIS_PORT from .env); it writes under
+its own bench_listing_* users and deletes them afterwards.
+
+    python -m benchmarks.bench_workflow_listing --counts 10 100 500 2000 --repeat 5
+
+Columns compare one GET per workflow (the original listing), MGET in batches of
+REDIS_BATCH_SIZE over the full blobs, and the paginated summary listing
+(get_user_workflows) for its first page and for every page.
+"""
+import benchmarks.common  # noqa: F401  (loads .env, FERNET_KEY)
+
+import argparse
+import asyncio
+import time
+from contextlib import contextmanager
+
+from redis.asyncio.connection import AbstractConnection
+
+from benchmarks.common import print_table
+from redis_client import (
+    REDIS_BATCH_SIZE, _workflow_index_key, workflow_key, delete_user_workflow,
+    get_redis_binary_client, get_redis_client, get_user_workflows, mget_in_batches, save_user_workflow,
+)
+
+PAGE_SIZE = 50
+# A small React Flow graph, about the size of a 5-node workflow saved from the editor
+SAMPLE_GRAPH = {
+    "nodes": [
+        {"id": str(i), "type": "custom", "position": {"x": i * 200, "y": 100},
+         "data": {"title": f"Node {i}", "node_id": f"node-{i}", "additional_input": {f"Node {i}": "some input " * 5}}}
+        for i in range(5)
+    ],
+    "edges": [{"id": f"e{i}", "source": str(i), "target": str(i + 1)} for i in range(4)],
+}
+
+_round_trips = 0
+
+
+@contextmanager
+def count_round_trips():
+    """Count packets sent to Redis: one per command, one per pipeline."""
+    global _round_trips
+    original = AbstractConnection.send_packed_command
+
+    async def send_packed_command(self, command, check_health=True):
+        global _round_trips
+        _round_trips += 1
+        return await original(self, command, check_health)
+
+    AbstractConnection.send_packed_command = send_packed_command
+    _round_trips = 0
+    try:
+        yield
+    finally:
+        AbstractConnection.send_packed_command = original
+
+
+async def list_per_key(user_id: str) -> int:
+    client = await get_redis_binary_client()
+    ids = await client.smembers(f"workflows:{user_id}")
+    blobs = [await client.get(workflow_key(user_id, workflow_id.decode())) for workflow_id in ids]
+    return len(blobs)
+
+
+async def list_mget(user_id: str) -> int:
+    client = await get_redis_binary_client()
+    ids = await client.smembers(f"workflows:{user_id}")
+    blobs = await mget_in_batches(client, [workflow_key(user_id, workflow_id.decode()) for workflow_id in ids])
+    return len(blobs)
+
+
+async def list_first_page(user_id: str) -> int:
+    return len((await get_user_workflows(user_id, limit=PAGE_SIZE))["workflows"])
+
+
+async def list_all_pages(user_id: str) -> int:
+    listed, cursor = 0, None
+    while True:
+        page = await get_user_workflows(user_id, limit=PAGE_SIZE, cursor=cursor)
+        listed += len(page["workflows"])
+        cursor = page["next_cursor"]
+        if not cursor:
+            return listed
+
+
+async def measure(listing, user_id: str, repeat: int) -> list:
+    await listing(user_id)  # warm up connections and the lazy index backfill
+    durations = []
+    for _ in range(repeat):
+        with count_round_trips():
+            started = time.perf_counter()
+            await listing(user_id)
+            durations.append(time.perf_counter() - started)
+            round_trips = _round_trips
+    durations.sort()
+    return [round_trips, round(durations[len(durations) // 2] * 1000, 2)]
+
+
+async def seed(user_id: str, count: int) -> list:
+    ids = []
+    for start in range(0, count, 100):
+        ids += await asyncio.gather(*(
+            save_user_workflow(user_id, f"Workflow {i}", SAMPLE_GRAPH) for i in range(start, min(count, start + 100))
+        ))
+    return ids
+
+
+async def cleanup(user_id: str, ids: list):
+    for start in range(0, len(ids), 100):
+        await asyncio.gather(*(delete_user_workflow(user_id, workflow_id) for workflow_id in ids[start:start + 100]))
+    client = await get_redis_client()
+    await client.delete(f"workflows:{user_id}", _workflow_index_key(user_id))
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Workflow listing round trips and latency by workflow count")
+    parser.add_argument("--counts", type=int, nargs="+", default=[10, 100, 500, 2000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    listings = [list_per_key, list_mget, list_first_page, list_all_pages]
+    rows = []
+    for count in args.counts:
+        user_id = f"bench_listing_{count}"
+        ids = await seed(user_id, count)
+        try:
+            row = [count]
+            for listing in listings:
+                row += await measure(listing, user_id, args.repeat)
+            rows.append(row)
+        finally:
+            await cleanup(user_id, ids)
+
+    print(f"MGET batch size {REDIS_BATCH_SIZE}, page size {PAGE_SIZE}")
+    headers = ["workflows"]
+    for name in ("GET each", "MGET", "first page", "all pages"):
+        headers += [f"{name} trips", f"{name} ms"]
+    print_table(headers, rows)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,39 @@
+"""
+Shared setup for the scripts in this directory. Run them from WebApi/, e.g.
+
+    python -m benchmarks.bench_graph_cache
+
+Import this module before anything that imports redis_client: it loads .env and, for
+benchmarks that never decrypt anything, falls back to a throwaway FERNET_KEY.
+"""
+import os
+import statistics
+import time
+from typing import Callable, List, Sequence
+
+from cryptography.fernet import Fernet
+from dotenv import load_dotenv
+
+load_dotenv()
+os.environ.setdefault("FERNET_KEY", Fernet.generate_key().decode())
+
+
+def time_calls(fn: Callable, repeat: int) -> List[float]:
+    """Call fn() repeat times and return each call's duration in seconds."""
+    durations = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        durations.append(time.perf_counter() - started)
+    return durations
+
+
+def median_ms(durations: Sequence[float]) -> float:
+    return round(statistics.median(durations) * 1000, 3)
+
+
+def print_table(headers: Sequence[str], rows: Sequence[Sequence]):
+    widths = [max(len(str(value)) for value in column) for column in zip(headers, *rows)]
+    print("  ".join(str(header).ljust(width) for header, width in zip(headers, widths)))
+    for row in rows:
+        print("  ".join(str(value).ljust(width) for value, width in zip(row, widths)))
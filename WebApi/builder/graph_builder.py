@@ -1,34 +1,308 @@
+import asyncio
+import contextvars
+import functools
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from langgraph.graph import StateGraph, START, END
-from typing_extensions import TypedDict
+from langchain_core.runnables import RunnableLambda
+from typing_extensions import Annotated, TypedDict
 from mapping.node_mapping import function_map, node_functions
+from services.node_metrics import collect_node_metrics
+
+# Thread pool used to run the (blocking) sync node functions off the event loop
+NODE_THREADPOOL_SIZE = int(os.getenv("NODE_THREADPOOL_SIZE", "32"))
+node_executor = ThreadPoolExecutor(max_workers=NODE_THREADPOOL_SIZE, thread_name_prefix="flowly-node")
+
+# Max number of compiled graphs kept in the LRU cache
+GRAPH_CACHE_SIZE = int(os.getenv("GRAPH_CACHE_SIZE", "128"))
+
+# Prefix of the synthetic nodes inserted to join parallel branches
+MERGE_NODE_PREFIX = "merge__"
+
+def keep_last(current, update):
+    """Reducer: last write wins, so parallel branches writing the same key don't conflict."""
+    return update
+
+def merge_dicts(current, update):
+    """Reducer: union of the per-node result maps written by parallel branches."""
+    return {**(current or {}), **(update or {})}
 
 class State(TypedDict):
-    node_input: str
-    node_result: str
-    node_id: str
-    node_name: str
-    additional_input: list
+    node_input: Annotated[str, keep_last]
+    node_result: Annotated[str, keep_last]
+    node_id: Annotated[str, keep_last]
+    node_name: Annotated[str, keep_last]
+    additional_input: Annotated[list, keep_last]
+    user_id: Annotated[str, keep_last]
+    node_results: Annotated[dict, merge_dicts]
+    node_metrics: Annotated[dict, keep_last]
+    no_cache: Annotated[bool, keep_last]
+
+def record_node_result(node_name, node_fn):
+    """
+    Wrap a node so its node_result is also stored under node_results[node_name] (which is
+    what merge nodes read when joining parallel branches) and its timing under node_metrics.
+    """
+    if asyncio.iscoroutinefunction(node_fn):
+        async def async_wrapper(state):
+            with collect_node_metrics() as metrics:
+                result = await node_fn(state)
+            if isinstance(result, dict):
+                result["node_results"] = {node_name: result.get("node_result")}
+                result["node_metrics"] = metrics
+            return result
+        return async_wrapper
 
-def with_user_id(node_fn, user_id):
     def wrapper(state):
-        if "user_id" not in state and user_id is not None:
-            state["user_id"] = user_id
-        return node_fn(state)
+        with collect_node_metrics() as metrics:
+            result = node_fn(state)
+        if isinstance(result, dict):
+            result["node_results"] = {node_name: result.get("node_result")}
+            result["node_metrics"] = metrics
+        return result
     return wrapper
 
-def build_graph_from_user_input(user_input_steps: list[dict], user_id=None) -> StateGraph:
-    graph_builder = StateGraph(State)
-    ordered_nodes = [
+def merge_node(node_name, sources):
+    """
+    Fan-in step: combine the node_result of every source branch into a single node_result.
+    """
+    def merge(state):
+        results = state.get("node_results") or {}
+        parts = [str(results[source]) for source in sources if results.get(source)]
+        merged = "\n\n".join(parts)
+        return {"node_result": merged, "node_results": {node_name: merged}}
+    return merge
+
+def read_input_from(input_key, node_fn):
+    """
+    DAG mode: run the node on its own predecessor's result (node_results[input_key], a
+    source node or the merge node in front of it) instead of the shared node_result, which
+    holds whichever parallel branch wrote last. Nodes without predecessors get no result
+    and fall back to node_input.
+    """
+    def select_input(state):
+        results = state.get("node_results") or {}
+        return {**state, "node_result": results.get(input_key) if input_key else None}
+
+    if asyncio.iscoroutinefunction(node_fn):
+        async def async_wrapper(state):
+            return await node_fn(select_input(state))
+        return async_wrapper
+
+    def wrapper(state):
+        return node_fn(select_input(state))
+    return wrapper
+
+def offload_to_thread(node_fn):
+    """
+    Wrap a sync node so that, when the graph runs with ainvoke/astream, it executes
+    in the node thread pool instead of blocking the event loop.
+    """
+    async def wrapper(state):
+        loop = asyncio.get_running_loop()
+        ctx = contextvars.copy_context()
+        return await loop.run_in_executor(node_executor, functools.partial(ctx.run, node_fn, state))
+    return wrapper
+
+def as_graph_node(node_name, node_fn, dag_input_key=None, dag=False):
+    """
+    Build a runnable usable from both the sync (invoke/stream) and async (ainvoke/astream) paths.
+    Async node variants are awaited directly, sync nodes are offloaded to the node thread pool.
+    With dag=True the node reads its input from node_results[dag_input_key] (read_input_from).
+    """
+    if dag:
+        node_fn = read_input_from(dag_input_key, node_fn)
+    node_fn = record_node_result(node_name, node_fn)
+    if asyncio.iscoroutinefunction(node_fn):
+        return RunnableLambda(node_fn, name=node_name)
+    return RunnableLambda(node_fn, afunc=offload_to_thread(node_fn), name=node_name)
+
+def get_ordered_node_names(user_input_steps: list[dict]) -> tuple:
+    return tuple(
         function_map[step["node_id"]]
         for step in sorted(user_input_steps, key=lambda x: x["seq"])
-    ]
+    )
+
+def get_edge_names(edges: list[dict] | None) -> tuple:
+    """
+    Convert request edges ({"source": node_id, "target": node_id}) into a sorted tuple of
+    (source_name, target_name) pairs, usable as part of the graph cache key.
+    """
+    if not edges:
+        return ()
+    edge_names = set()
+    for edge in edges:
+        source, target = edge.get("source"), edge.get("target")
+        if source not in function_map or target not in function_map:
+            raise ValueError(f"Unknown node_id in edge: {source} -> {target}")
+        edge_names.add((function_map[source], function_map[target]))
+    return tuple(sorted(edge_names))
+
+def build_graph_from_user_input(user_input_steps: list[dict], edges: list[dict] | None = None) -> StateGraph:
+    return build_graph_from_node_names(get_ordered_node_names(user_input_steps), get_edge_names(edges))
+
+def build_graph_from_node_names(ordered_nodes: tuple, edges: tuple = ()) -> StateGraph:
+    graph_builder = StateGraph(State)
+    predecessors = get_dag_predecessors(ordered_nodes, edges)[0] if edges else {}
     for node_name in ordered_nodes:
         if node_name in node_functions:
-            graph_builder.add_node(node_name, with_user_id(node_functions[node_name], user_id))
+            input_key = dag_input_key(node_name, predecessors.get(node_name, []))
+            graph_builder.add_node(node_name, as_graph_node(node_name, node_functions[node_name], input_key, dag=bool(edges)))
         else:
             raise ValueError(f"Unknown node_id: {node_name}")
-    graph_builder.add_edge(START, ordered_nodes[0])
-    for i in range(len(ordered_nodes) - 1):
-        graph_builder.add_edge(ordered_nodes[i], ordered_nodes[i + 1])
-    graph_builder.add_edge(ordered_nodes[-1], END)
-    return graph_builder 
\ No newline at end of file
+    if not edges:
+        # No explicit edges: strictly linear chain in seq order
+        graph_builder.add_edge(START, ordered_nodes[0])
+        for i in range(len(ordered_nodes) - 1):
+            graph_builder.add_edge(ordered_nodes[i], ordered_nodes[i + 1])
+        graph_builder.add_edge(ordered_nodes[-1], END)
+        return graph_builder
+    add_dag_edges(graph_builder, ordered_nodes, edges)
+    return graph_builder
+
+def add_dag_edges(graph_builder: StateGraph, ordered_nodes: tuple, edges: tuple):
+    """
+    Wire an explicit DAG: nodes without predecessors start in parallel from START, a node
+    with several predecessors waits for all of them behind a merge node, and several sinks
+    are joined by a final merge node before END.
+    """
+    predecessors, successors = get_dag_predecessors(ordered_nodes, edges)
+    for node_name in ordered_nodes:
+        sources = predecessors[node_name]
+        if not sources:
+            graph_builder.add_edge(START, node_name)
+        elif len(sources) == 1:
+            graph_builder.add_edge(sources[0], node_name)
+        else:
+            merge_name = dag_input_key(node_name, sources)
+            graph_builder.add_node(merge_name, merge_node(merge_name, sources))
+            graph_builder.add_edge(sources, merge_name)
+            graph_builder.add_edge(merge_name, node_name)
+
+    sinks = [node_name for node_name in ordered_nodes if not successors[node_name]]
+    if len(sinks) == 1:
+        graph_builder.add_edge(sinks[0], END)
+    else:
+        merge_name = f"{MERGE_NODE_PREFIX}end"
+        graph_builder.add_node(merge_name, merge_node(merge_name, sinks))
+        graph_builder.add_edge(sinks, merge_name)
+        graph_builder.add_edge(merge_name, END)
+
+def get_dag_predecessors(ordered_nodes: tuple, edges: tuple) -> tuple:
+    """
+    Validate the edges and return ({node: predecessors in seq order}, {node: successors}).
+    Predecessors are sorted so merged results are deterministic.
+    """
+    predecessors = {node_name: [] for node_name in ordered_nodes}
+    successors = {node_name: [] for node_name in ordered_nodes}
+    for source, target in edges:
+        if source not in predecessors or target not in predecessors:
+            raise ValueError(f"Edge references a node that is not in the workflow: {source} -> {target}")
+        predecessors[target].append(source)
+        successors[source].append(target)
+    check_acyclic(ordered_nodes, successors)
+    position = {node_name: index for index, node_name in enumerate(ordered_nodes)}
+    return {node_name: sorted(sources, key=position.get) for node_name, sources in predecessors.items()}, successors
+
+def dag_input_key(node_name: str, sources: list):
+    """Key of node_results a DAG node reads: its only predecessor, or the merge node joining several."""
+    if not sources:
+        return None
+    if len(sources) == 1:
+        return sources[0]
+    return f"{MERGE_NODE_PREFIX}{node_name}"
+
+def check_acyclic(ordered_nodes: tuple, successors: dict):
+    # Kahn's algorithm: every node must be reachable in topological order
+    in_degree = {node_name: 0 for node_name in ordered_nodes}
+    for targets in successors.values():
+        for target in targets:
+            in_degree[target] += 1
+    ready = [node_name for node_name, degree in in_degree.items() if degree == 0]
+    visited = 0
+    while ready:
+        node_name = ready.pop()
+        visited += 1
+        for target in successors[node_name]:
+            in_degree[target] -= 1
+            if in_degree[target] == 0:
+                ready.append(target)
+    if visited != len(ordered_nodes):
+        raise ValueError("Workflow edges contain a cycle")
+
+
+class CompiledGraphCache:
+    """
+    Thread-safe LRU cache of compiled graphs keyed by workflow shape (the ordered tuple of
+    function_map names plus the explicit edges, if any). Graphs hold no per-user data (user_id travels in the run state),
+    so one compiled graph is shared by every user running the same node sequence.
+    """
+
+    def __init__(self, max_size: int = GRAPH_CACHE_SIZE):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._graphs = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, user_input_steps: list[dict], edges: list[dict] | None = None):
+        return self.get_by_key(get_graph_key(user_input_steps, edges))
+
+    def get_by_key(self, key: tuple):
+        with self._lock:
+            graph = self._graphs.get(key)
+            if graph is not None:
+                self._graphs.move_to_end(key)
+                self.hits += 1
+                return graph
+            self.misses += 1
+        # Build outside the lock; a concurrent miss for the same key just compiles twice
+        graph = build_graph_from_node_names(*key).compile()
+        with self._lock:
+            self._graphs[key] = graph
+            self._graphs.move_to_end(key)
+            while len(self._graphs) > self.max_size:
+                self._graphs.popitem(last=False)
+        return graph
+
+    def clear(self):
+        with self._lock:
+            self._graphs.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self._graphs),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / total, 4) if total else 0.0,
+            }
+
+def get_graph_key(user_input_steps: list[dict], edges: list[dict] | None = None) -> tuple:
+    """
+    Cache key of a workflow shape: (ordered node names, edge names). Precomputed by saved
+    workflow plans so runs skip resolving the steps again.
+    """
+    return (get_ordered_node_names(user_input_steps), get_edge_names(edges))
+
+graph_cache = CompiledGraphCache()
+
+def get_compiled_graph(user_input_steps: list[dict], edges: list[dict] | None = None):
+    """
+    Return the compiled graph for the given workflow steps (and optional DAG edges),
+    building it on first use.
+    """
+    return graph_cache.get(user_input_steps, edges)
+
+def get_compiled_graph_by_key(key: tuple):
+    """
+    Return the compiled graph for a key built by get_graph_key.
+    """
+    return graph_cache.get_by_key(key)
+
+def get_graph_cache_stats() -> dict:
+    return graph_cache.stats()
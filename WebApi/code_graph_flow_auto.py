@@ -1,14 +1,12 @@
 import json
-from typing_extensions import TypedDict
-from builder.graph_builder import build_graph_from_user_input
+from builder.graph_builder import get_compiled_graph, get_compiled_graph_by_key
 from mapping.node_mapping import function_map, node_functions
+from services.stream_events import STREAM_TOKENS_KEY
+from services.workflow_plans import apply_input_overrides, graph_key_of
 
-class State(TypedDict):
-    node_input: str
-    node_result: str
-    node_id: str
-    node_name: str
-    additional_input: list
+# Run config for the streaming endpoints: LLM nodes forward their tokens as custom events
+STREAM_RUN_CONFIG = {"configurable": {STREAM_TOKENS_KEY: True}}
+STREAM_MODES = ["updates", "custom"]
 
 def execute_graph_flow_test(workflow_input, additional_input=None):
     state = {
@@ -22,14 +20,13 @@ def execute_graph_flow_test(workflow_input, additional_input=None):
         if "node_input" in step:
             state["node_input"] = step["node_input"]
             break
-    graph_builder = build_graph_from_user_input(workflow_input)
-    graph = graph_builder.compile()
+    graph = get_compiled_graph(workflow_input)
     result = graph.invoke(state)
     print("✅ Final result:", result)
     return result
 
 
-def execute_graph_flow(workflow_input, additional_input=None, user_id=None):
+def _initial_state(workflow_input, additional_input=None, user_id=None, no_cache=False):
     state = {
          "node_input": None,
          "node_result": None,
@@ -37,39 +34,17 @@ def execute_graph_flow(workflow_input, additional_input=None, user_id=None):
          "node_name": None,
          "additional_input": additional_input or [],
          "user_id": user_id,
+         "node_results": {},
+         "no_cache": no_cache,
     }
     for step in workflow_input:
         if "node_input" in step:
             state["node_input"] = step["node_input"]
             break
-    graph_builder = build_graph_from_user_input(workflow_input, user_id=user_id)
-    graph = graph_builder.compile()
-    result_stream = graph.stream(state)
-    results = []
-    for node_input_config, node_output_state in zip(workflow_input, result_stream):
-        # Patch: Ensure user_id is always present in node_output_state
-        if "user_id" in state and (isinstance(node_output_state, dict) and "user_id" not in node_output_state):
-            node_output_state["user_id"] = state["user_id"]
-        # Robust flattening: find function name key and flatten even if extra keys exist
-        function_keys = [k for k in node_output_state.keys() if k in function_map.values() or k in function_map.keys()]
-        if function_keys:
-            key = function_keys[0]
-            inner = node_output_state[key]
-            if isinstance(inner, dict):
-                inner["node_id"] = node_input_config["node_id"]
-                inner["node_name"] = node_input_config.get("node_name", "")
-                if "user_id" in state and "user_id" not in inner:
-                    inner["user_id"] = state["user_id"]
-                results.append(inner)
-                continue
-        node_output_state["node_id"] = node_input_config["node_id"]
-        node_output_state["node_name"] = node_input_config.get("node_name", "")
-        results.append(node_output_state)
-    # print("✅ All states:", results)
-    return {"results": results, "additional_input": state["additional_input"]}
+    return state
 
 
-def execute_graph_flow_stream(workflow_input, additional_input=None, user_id=None):
+def _initial_stream_state(workflow_input, additional_input=None, user_id=None, no_cache=False):
     state = {
          "node_input": None,
          "node_result": None,
@@ -77,6 +52,8 @@ def execute_graph_flow_stream(workflow_input, additional_input=None, user_id=Non
          "node_name": "",
          "additional_input": additional_input or [],
          "user_id": user_id,
+         "node_results": {},
+         "no_cache": no_cache,
     }
     for node_input_config in workflow_input:
         if "node_input" in node_input_config:
@@ -84,27 +61,119 @@ def execute_graph_flow_stream(workflow_input, additional_input=None, user_id=Non
             state["node_id"] = node_input_config["node_id"]
             state["node_name"] = function_map.get(node_input_config["node_id"], "")
             break
-    graph_builder = build_graph_from_user_input(workflow_input, user_id=user_id)
-    graph = graph_builder.compile()
-    result_stream = graph.stream(state)
-    for node_input_config, node_output_state in zip(workflow_input, result_stream):
-        # Robust flattening: find function name key and flatten even if extra keys exist
-        function_keys = [k for k in node_output_state.keys() if k in function_map.values() or k in function_map.keys()]
-        if function_keys:
-            key = function_keys[0]
-            inner = node_output_state[key]
-            if isinstance(inner, dict):
-                inner["node_id"] = node_input_config["node_id"]
-                inner["node_name"] = node_input_config.get("node_name", "")
-                if "user_id" in state and "user_id" not in inner:
-                    inner["user_id"] = state["user_id"]
-                yield json.dumps({"results": inner, "additional_input": additional_input or []}) + "\n"
-                continue
-        if "user_id" in state and "user_id" not in node_output_state:
-            node_output_state["user_id"] = state["user_id"]
-        node_output_state["node_id"] = node_input_config["node_id"]
-        node_output_state["node_name"] = node_input_config.get("node_name", "")
-        yield json.dumps({"results": node_output_state, "additional_input": additional_input or []}) + "\n"
+    return state
+
+
+def _steps_by_name(workflow_input):
+    return {function_map[step["node_id"]]: step for step in workflow_input if step.get("node_id") in function_map}
+
+
+def _flatten_chunk(chunk, steps_by_name, state):
+    """
+    Flatten one graph stream chunk ({function_name: node_state}) into the per-node results
+    returned to the client, tagged with the node_id/node_name from the request. Parallel
+    branches finish in any order, so steps are matched by function name rather than by
+    position; merge nodes (not part of the request) are skipped.
+    """
+    results = []
+    for key, inner in chunk.items():
+        node_input_config = steps_by_name.get(key)
+        if node_input_config is None or not isinstance(inner, dict):
+            continue
+        inner.pop("node_results", None)
+        inner["node_id"] = node_input_config["node_id"]
+        inner["node_name"] = node_input_config.get("node_name", "")
+        if "user_id" in state and "user_id" not in inner:
+            inner["user_id"] = state["user_id"]
+        results.append(inner)
+    return results
+
+
+def _format_delta(event, steps_by_name):
+    """
+    Turn a custom {"type": "delta", "node": ..., "delta": ...} stream event into an NDJSON
+    line tagged with the node_id of the step that produced it.
+    """
+    if not isinstance(event, dict) or event.get("type") != "delta":
+        return None
+    node_input_config = steps_by_name.get(event.get("node"))
+    if node_input_config is None:
+        return None
+    return json.dumps({"type": "delta", "node_id": node_input_config["node_id"], "delta": event.get("delta", "")}) + "\n"
+
+
+def execute_graph_flow(workflow_input, additional_input=None, user_id=None, edges=None, no_cache=False):
+    state = _initial_state(workflow_input, additional_input, user_id, no_cache)
+    graph = get_compiled_graph(workflow_input, edges)
+    steps_by_name = _steps_by_name(workflow_input)
+    results = []
+    for chunk in graph.stream(state):
+        results.extend(_flatten_chunk(chunk, steps_by_name, state))
+    # print("✅ All states:", results)
+    return {"results": results, "additional_input": state["additional_input"]}
+
+
+def execute_graph_flow_stream(workflow_input, additional_input=None, user_id=None, edges=None, no_cache=False):
+    state = _initial_stream_state(workflow_input, additional_input, user_id, no_cache)
+    graph = get_compiled_graph(workflow_input, edges)
+    steps_by_name = _steps_by_name(workflow_input)
+    for mode, chunk in graph.stream(state, config=STREAM_RUN_CONFIG, stream_mode=STREAM_MODES):
+        if mode == "custom":
+            line = _format_delta(chunk, steps_by_name)
+            if line:
+                yield line
+            continue
+        for inner in _flatten_chunk(chunk, steps_by_name, state):
+            yield json.dumps({"results": inner, "additional_input": additional_input or []}) + "\n"
+
+
+async def execute_graph_flow_async(workflow_input, additional_input=None, user_id=None, edges=None, no_cache=False):
+    """
+    Async version of execute_graph_flow. Runs the graph with astream so sync nodes are
+    offloaded to the node thread pool and the event loop stays free for other requests.
+    """
+    state = _initial_state(workflow_input, additional_input, user_id, no_cache)
+    graph = get_compiled_graph(workflow_input, edges)
+    steps_by_name = _steps_by_name(workflow_input)
+    results = []
+    async for chunk in graph.astream(state):
+        results.extend(_flatten_chunk(chunk, steps_by_name, state))
+    return {"results": results, "additional_input": state["additional_input"]}
+
+
+async def execute_graph_flow_stream_async(workflow_input, additional_input=None, user_id=None, edges=None, no_cache=False):
+    """
+    Async version of execute_graph_flow_stream, yielding one NDJSON line per finished node.
+    LLM nodes also stream their tokens as {"type": "delta", "node_id", "delta"} lines
+    before their final result line.
+    """
+    state = _initial_stream_state(workflow_input, additional_input, user_id, no_cache)
+    graph = get_compiled_graph(workflow_input, edges)
+    steps_by_name = _steps_by_name(workflow_input)
+    async for mode, chunk in graph.astream(state, config=STREAM_RUN_CONFIG, stream_mode=STREAM_MODES):
+        if mode == "custom":
+            line = _format_delta(chunk, steps_by_name)
+            if line:
+                yield line
+            continue
+        for inner in _flatten_chunk(chunk, steps_by_name, state):
+            yield json.dumps({"results": inner, "additional_input": additional_input or []}) + "\n"
+
+
+async def execute_workflow_plan_async(plan, user_id=None, inputs=None, no_cache=False):
+    """
+    Run a saved workflow's precomputed plan (services/workflow_plans.py). The steps are
+    already resolved and ordered and the compiled graph is looked up by the plan's key,
+    so nothing is parsed or rebuilt per run. inputs ({node_id: value}) override node inputs.
+    """
+    workflow_input, additional_input = apply_input_overrides(plan, inputs)
+    state = _initial_state(workflow_input, additional_input, user_id, no_cache)
+    graph = get_compiled_graph_by_key(graph_key_of(plan))
+    steps_by_name = _steps_by_name(workflow_input)
+    results = []
+    async for chunk in graph.astream(state):
+        results.extend(_flatten_chunk(chunk, steps_by_name, state))
+    return {"results": results, "additional_input": state["additional_input"]}
 
 
 # execute_graph_flow([
@@ -1,21 +1,52 @@
 from fastapi import FastAPI, Request, HTTPException, Depends, Body
 from pydantic import BaseModel
-from typing import List, Optional
+from typing import Dict, List, Optional
 from fastapi.middleware.cors import CORSMiddleware
-from code_graph_flow_auto import execute_graph_flow, execute_graph_flow_stream
+from code_graph_flow_auto import execute_graph_flow_async, execute_graph_flow_stream_async, execute_workflow_plan_async
+from builder.graph_builder import get_graph_cache_stats
+from services.feed_cache import get_feed_cache_stats
+from services.llm_gateway import get_llm_gateway_stats
+from services.llm_cache import get_llm_cache_stats
+from services.page_cache import get_page_cache_stats
+from services.search_service import get_search_stats
+from services.news_digest import refresh_news_digests_forever, get_news_digest_stats
+from services.html_parser import get_html_parser_stats, shutdown_html_process_pool
+from services.job_queue import enqueue_run, get_run_status, get_run_result, get_job_queue_stats, RUN_COMPLETED, RUN_FAILED
+from services.workflow_plans import get_workflow_plan, get_workflow_plan_stats, WorkflowNotFoundError
 from fastapi.responses import StreamingResponse
 import json
 import os
 from dotenv import load_dotenv
 from user_profile import get_user_profile, UserProfileRequest
 from jwt_utils import get_current_user
-from redis_client import save_openai_key, save_user_workflow, get_user_workflows, delete_user_workflow, save_user_theme, get_user_theme
-from fastapi import Path
+from redis_client import save_openai_key, save_user_workflow, get_user_workflows, get_user_workflow, delete_user_workflow, save_user_theme, get_user_theme
+from redis_client import init_sync_redis_pool, close_sync_redis_pool, get_sync_redis_pool_stats, redis_health_check
+from redis_client import listen_for_openai_key_invalidations, get_openai_key_cache_stats
+from fastapi import Path, Query
 from fastapi import UploadFile
+from fastapi.concurrency import run_in_threadpool
+from contextlib import asynccontextmanager, suppress
+import asyncio
 
 load_dotenv()
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Create the shared sync Redis pool once, before any node needs it
+    init_sync_redis_pool()
+    # Evict cached OpenAI keys when another worker saves or deletes one
+    key_invalidation_task = asyncio.create_task(listen_for_openai_key_invalidations())
+    # Rebuild the shared news digests on a schedule (one worker at a time, via a Redis lock)
+    news_digest_task = asyncio.create_task(refresh_news_digests_forever())
+    yield
+    for task in (key_invalidation_task, news_digest_task):
+        task.cancel()
+        with suppress(asyncio.CancelledError):
+            await task
+    close_sync_redis_pool()
+    shutdown_html_process_pool()
+
+app = FastAPI(lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -36,13 +67,45 @@ class AdditionalInput(BaseModel):
     node_id: str
     node_input: Optional[str] = None
 
+class EdgeInput(BaseModel):
+    source: str
+    target: str
+
 class GraphFlowRequest(BaseModel):
     graph_flowData: List[NodeInput]
     additional_input: List[AdditionalInput]
+    edges: Optional[List[EdgeInput]] = None
+    no_cache: bool = False
+
+class RunWorkflowRequest(BaseModel):
+    # Optional node input overrides, keyed by node_id
+    inputs: Optional[Dict[str, str]] = None
+    no_cache: bool = False
 
 @app.get("/health")
-def health_check():
-    return {"status": "ok"}
+async def health_check():
+    redis_ok = await run_in_threadpool(redis_health_check)
+    return {"status": "ok", "redis": "ok" if redis_ok else "unavailable"}
+
+@app.get("/metrics")
+async def metrics():
+    """
+    Cache and pool counters for the workflow engine
+    """
+    return {
+        "graph_cache": get_graph_cache_stats(),
+        "feed_cache": get_feed_cache_stats(),
+        "redis_pool": get_sync_redis_pool_stats(),
+        "openai_key_cache": get_openai_key_cache_stats(),
+        "llm_gateway": get_llm_gateway_stats(),
+        "llm_cache": get_llm_cache_stats(),
+        "page_cache": get_page_cache_stats(),
+        "search": get_search_stats(),
+        "news_digest": get_news_digest_stats(),
+        "html_parser": get_html_parser_stats(),
+        "workflow_plans": get_workflow_plan_stats(),
+        "job_queue": await get_job_queue_stats(),
+    }
 
 @app.post("/user-profile")
 async def get_user_profile_endpoint(request: UserProfileRequest):
@@ -52,16 +115,83 @@ async def get_user_profile_endpoint(request: UserProfileRequest):
     return await get_user_profile(request)
 
 @app.post("/run-graph")
-async def run_graph(request: Request, current_user: dict = Depends(get_current_user)):
+async def run_graph(
+    request: Request,
+    run_async: bool = Query(False, alias="async"),
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Run a workflow graph. With ?async=true (or "async": true in the body) the run is queued
+    for the worker processes (worker.py) and a run_id is returned immediately; poll
+    /runs/{run_id} and fetch /runs/{run_id}/result.
+    """
     try:
         content_type = request.headers.get("content-type", "")
         payload = await request.json()
         user_input = payload["graph_flowData"]
         additional_input = payload["additional_input"]
+        edges = payload.get("edges")
+        no_cache = bool(payload.get("no_cache", False))
         user_id = current_user.get("id") if current_user else None                  
         if not user_input:
             raise ValueError("Missing 'graph_flowData' in request body")
-        result = execute_graph_flow([item for item in user_input], [item for item in additional_input], user_id=user_id)
+        if run_async or payload.get("async"):
+            run_id = await enqueue_run(user_id, {"graph_flowData": user_input, "additional_input": additional_input, "edges": edges, "no_cache": no_cache})
+            return {"status": "queued", "run_id": run_id}
+        result = await execute_graph_flow_async([item for item in user_input], [item for item in additional_input], user_id=user_id, edges=edges, no_cache=no_cache)
+        return {"status": "completed", "result": result}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+async def _get_user_run(run_id: str, user_id: str) -> dict:
+    status = await get_run_status(run_id)
+    # Runs of other users are reported as unknown
+    if not status or status.get("user_id") != (user_id or ""):
+        raise HTTPException(status_code=404, detail="Run not found")
+    return status
+
+@app.get("/runs/{run_id}")
+async def run_status(run_id: str = Path(...), current_user: dict = Depends(get_current_user)):
+    """
+    Status of a queued run: queued, running, completed or failed (with error)
+    """
+    return await _get_user_run(run_id, current_user.get("id"))
+
+@app.get("/runs/{run_id}/result")
+async def run_result(run_id: str = Path(...), current_user: dict = Depends(get_current_user)):
+    """
+    Result of a completed queued run, in the same shape as /run-graph returns it
+    """
+    status = await _get_user_run(run_id, current_user.get("id"))
+    if status["status"] == RUN_FAILED:
+        raise HTTPException(status_code=500, detail=status.get("error") or "Run failed")
+    if status["status"] != RUN_COMPLETED:
+        raise HTTPException(status_code=409, detail=f"Run is {status['status']}")
+    result = await get_run_result(run_id)
+    if result is None:
+        raise HTTPException(status_code=404, detail="Run result expired")
+    return {"status": "completed", "result": result}
+
+@app.post("/run-workflow/{workflow_id}")
+async def run_workflow(
+    workflow_id: str = Path(...),
+    payload: Optional[RunWorkflowRequest] = Body(None),
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Run a saved workflow by id from its cached execution plan; the body only carries
+    optional input overrides ({"inputs": {node_id: value}, "no_cache": bool})
+    """
+    payload = payload or RunWorkflowRequest()
+    user_id = current_user["id"]
+    try:
+        plan = await get_workflow_plan(user_id, workflow_id)
+    except WorkflowNotFoundError:
+        raise HTTPException(status_code=404, detail="Workflow not found")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    try:
+        result = await execute_workflow_plan_async(plan, user_id=user_id, inputs=payload.inputs, no_cache=payload.no_cache)
         return {"status": "completed", "result": result}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -71,10 +201,11 @@ async def run_graph_stream(payload: GraphFlowRequest, current_user: dict = Depen
     try:
         user_input = payload.graph_flowData
         additional_input = payload.additional_input
+        edges = [edge.model_dump() for edge in payload.edges] if payload.edges else None
         user_id = current_user.get("id") if current_user else None
         if not user_input:
             raise ValueError("Missing 'graph_flowData' in request body")
-        return StreamingResponse(execute_graph_flow_stream([item.model_dump() for item in user_input], [item.model_dump() for item in additional_input], user_id=user_id), media_type="application/json")
+        return StreamingResponse(execute_graph_flow_stream_async([item.model_dump() for item in user_input], [item.model_dump() for item in additional_input], user_id=user_id, edges=edges, no_cache=payload.no_cache), media_type="application/json")
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -114,13 +245,37 @@ async def save_workflow(
     return {"success": True, "workflow_id": workflow_id}
 
 @app.get("/user/list-workflows")
-async def list_workflows(current_user: dict = Depends(get_current_user)):
+async def list_workflows(
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = None,
+    q: Optional[str] = Query(None, max_length=200),
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    List the authenticated user's workflows, newest first, as summaries
+    (workflow_id, name, created_at, node_count, byte_size). q keeps only names containing
+    it (case-insensitive). Pass next_cursor back as cursor, with the same q, to get the
+    next page; fetch full data with /user/workflow/{workflow_id}.
+    """
+    user_id = current_user["id"]
+    try:
+        return await get_user_workflows(user_id, limit, cursor, q)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@app.get("/user/workflow/{workflow_id}")
+async def get_workflow(
+    workflow_id: str = Path(...),
+    current_user: dict = Depends(get_current_user)
+):
     """
-    List all workflows for the authenticated user
+    Get one saved workflow, including its full data
     """
     user_id = current_user["id"]
-    workflows = await get_user_workflows(user_id)
-    return {"workflows": workflows}
+    workflow = await get_user_workflow(user_id, workflow_id)
+    if not workflow:
+        raise HTTPException(status_code=404, detail="Workflow not found")
+    return workflow
 
 @app.delete("/user/delete-workflow/{workflow_id}")
 async def delete_workflow(
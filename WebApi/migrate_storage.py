@@ -0,0 +1,144 @@
+"""
+Rewrite legacy JSON values in Redis with the storage codec (zstd-compressed msgpack).
+
+    python migrate_storage.py --dry-run
+    python migrate_storage.py --batch-size 200 --sample-size 100
+
+Keys are walked with SCAN and rewritten in batches. A key is only replaced if it still
+holds the value that was read, so concurrent saves are never overwritten. MEMORY USAGE is
+sampled before and after the rewrite to report the memory saved per key type.
+"""
+import argparse
+import time
+from typing import Any, Dict, List
+
+from redis_client import get_sync_redis_binary_client, REDIS_BATCH_SIZE
+from services.storage_codec import encode_value, decode_value, is_encoded
+
+# Key type -> SCAN pattern of the values stored with the codec
+MIGRATED_KEY_TYPES = {
+    "workflow": "workflow:*",
+}
+
+# Replace KEYS[1] with ARGV[2] only if it still holds ARGV[1]; its TTL is kept
+REPLACE_IF_UNCHANGED_LUA = """
+if redis.call('GET', KEYS[1]) ~= ARGV[1] then
+    return 0
+end
+local ttl = redis.call('PTTL', KEYS[1])
+redis.call('SET', KEYS[1], ARGV[2])
+if ttl > 0 then
+    redis.call('PEXPIRE', KEYS[1], ttl)
+end
+return 1
+"""
+
+
+def _scan_batches(client, pattern: str, batch_size: int):
+    batch = []
+    for key in client.scan_iter(match=pattern, count=batch_size):
+        batch.append(key)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _memory_usage(client, keys: List[bytes]) -> List[int]:
+    pipe = client.pipeline(transaction=False)
+    for key in keys:
+        pipe.memory_usage(key)
+    return [usage or 0 for usage in pipe.execute()]
+
+
+def migrate_key_type(client, key_type: str, pattern: str, batch_size: int, sample_size: int, dry_run: bool) -> Dict[str, Any]:
+    replace_script = client.register_script(REPLACE_IF_UNCHANGED_LUA)
+    report = {
+        "scanned": 0,
+        "already_encoded": 0,
+        "rewritten": 0,
+        "changed_concurrently": 0,
+        "errors": 0,
+        "value_bytes_before": 0,
+        "value_bytes_after": 0,
+        "sampled": 0,
+        "memory_before": 0,
+        "memory_after": 0,
+    }
+    for keys in _scan_batches(client, pattern, batch_size):
+        report["scanned"] += len(keys)
+        rewrites = []
+        for key, value in zip(keys, client.mget(keys)):
+            if value is None:
+                continue
+            if is_encoded(value):
+                report["already_encoded"] += 1
+                continue
+            try:
+                encoded = encode_value(decode_value(value))
+            except Exception as e:
+                report["errors"] += 1
+                print(f"❌ Could not re-encode {key!r}: {e}")
+                continue
+            report["value_bytes_before"] += len(value)
+            report["value_bytes_after"] += len(encoded)
+            rewrites.append((key, value, encoded))
+        if not rewrites:
+            continue
+
+        # Sample MEMORY USAGE on the first keys of each type, before and after the rewrite
+        sampled = [key for key, _, _ in rewrites[:max(0, sample_size - report["sampled"])]]
+        if sampled:
+            report["memory_before"] += sum(_memory_usage(client, sampled))
+        if dry_run:
+            report["sampled"] += len(sampled)
+            continue
+
+        pipe = client.pipeline(transaction=False)
+        for key, value, encoded in rewrites:
+            replace_script(keys=[key], args=[value, encoded], client=pipe)
+        for replaced in pipe.execute():
+            report["rewritten" if replaced else "changed_concurrently"] += 1
+        if sampled:
+            report["memory_after"] += sum(_memory_usage(client, sampled))
+            report["sampled"] += len(sampled)
+        print(f"🔄 {key_type}: {report['rewritten']} rewritten, {report['scanned']} scanned")
+    return report
+
+
+def print_report(key_type: str, report: Dict[str, Any], dry_run: bool):
+    print(f"📊 {key_type}: scanned {report['scanned']}, already encoded {report['already_encoded']}, "
+          f"rewritten {report['rewritten']}, changed concurrently {report['changed_concurrently']}, errors {report['errors']}")
+    if report["value_bytes_before"]:
+        ratio = report["value_bytes_after"] / report["value_bytes_before"]
+        print(f"   value bytes: {report['value_bytes_before']} -> {report['value_bytes_after']} ({ratio:.1%} of original)")
+    if report["sampled"]:
+        before = report["memory_before"] / report["sampled"]
+        print(f"   MEMORY USAGE sample ({report['sampled']} keys): {before:.0f} bytes/key before", end="")
+        if dry_run:
+            print(" (dry run, nothing rewritten)")
+        else:
+            after = report["memory_after"] / report["sampled"]
+            print(f", {after:.0f} bytes/key after, {before - after:.0f} bytes/key saved ({1 - after / before:.1%})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rewrite legacy JSON values in Redis with the storage codec")
+    parser.add_argument("--key-type", choices=sorted(MIGRATED_KEY_TYPES), action="append",
+                        help="Key type to migrate (repeatable; default: all)")
+    parser.add_argument("--batch-size", type=int, default=REDIS_BATCH_SIZE, help="Keys per SCAN/MGET/rewrite batch")
+    parser.add_argument("--sample-size", type=int, default=100, help="Keys per type sampled with MEMORY USAGE")
+    parser.add_argument("--dry-run", action="store_true", help="Only report the expected savings")
+    args = parser.parse_args()
+
+    client = get_sync_redis_binary_client()
+    for key_type in args.key_type or sorted(MIGRATED_KEY_TYPES):
+        started = time.perf_counter()
+        report = migrate_key_type(client, key_type, MIGRATED_KEY_TYPES[key_type], args.batch_size, args.sample_size, args.dry_run)
+        print_report(key_type, report, args.dry_run)
+        print(f"   done in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,48 +1,69 @@
 import os
 import json
-from langchain.tools.ddg_search import DuckDuckGoSearchRun
-from openai import OpenAI
+import contextvars
+from concurrent.futures import ThreadPoolExecutor, as_completed
 # from dotenv import load_dotenv
-import requests
-from bs4 import BeautifulSoup, Tag
-import time
 import asyncio
 from redis_client import get_user_openai_key_sync
+from services.llm_cache import cached_chat_completion
+from services.node_metrics import record_node_metric
+from services.page_cache import get_page
+from services.search_service import search
+from services.stream_events import get_delta_emitter
+from services.text_chunking import truncate_to_tokens
 
 # load_dotenv()
 
-def fetch_first_duckduckgo_result(query):
-    url = "https://html.duckduckgo.com/html/"
-    params = {"q": query}
-    headers = {"User-Agent": "Mozilla/5.0"}
+# Token budget for each page (reference blog, search result) included in the prompt
+BLOG_RESEARCH_CONTENT_TOKENS = int(os.getenv("BLOG_RESEARCH_CONTENT_TOKENS", "500"))
+# Number of search results fetched in parallel; the first one with content is used
+BLOG_SEARCH_RESULTS = int(os.getenv("BLOG_SEARCH_RESULTS", "3"))
+
+research_executor = ThreadPoolExecutor(max_workers=int(os.getenv("BLOG_RESEARCH_WORKERS", "16")), thread_name_prefix="flowly-research")
+
+def _submit(fn, *args):
+    # Run in the research pool with the node's context, so page metrics are attributed to this node
+    ctx = contextvars.copy_context()
+    return research_executor.submit(ctx.run, fn, *args)
+
+def fetch_search_result_urls(query, limit=BLOG_SEARCH_RESULTS):
     try:
-        response = requests.post(url, data=params, headers=headers, timeout=10)
-        soup = BeautifulSoup(response.text, "html.parser")
-        results = soup.find_all('a', class_='result__a')
-        if results:
-            first_link = results[0]
-            if isinstance(first_link, Tag):
-                href = first_link.get('href')
-                return href
-            else:
-                return None
+        return [result["link"] for result in search(query, limit)]
     except Exception as e:
-        pass
-    return None
+        print(f"❌ Search failed: {e}")
+    return []
 
-def fetch_page_content(url):
+def _get_page_or_none(url, polite=False):
     try:
-        response = requests.get(url, timeout=10)
-        soup = BeautifulSoup(response.text, "html.parser")
-        article = soup.find('article')
-        if article:
-            return article.get_text(separator='\n', strip=True)
-        body = soup.find('body')
-        if body:
-            return body.get_text(separator='\n', strip=True)
-        return soup.get_text(separator='\n', strip=True)
+        return get_page(url, polite=polite)
     except Exception as e:
+        print(f"❌ Error fetching {url}: {e}")
+        return None
+
+def _record_page_metrics(extracted):
+    record_node_metric("html_original_chars", extracted["original_chars"])
+    record_node_metric("html_extracted_chars", extracted["extracted_chars"])
+
+def fetch_page_content(url):
+    extracted = _get_page_or_none(url)
+    if not extracted:
         return ""
+    _record_page_metrics(extracted)
+    return extracted["text"]
+
+def fetch_first_good_page(urls):
+    """
+    Fetch all urls in parallel and return (url, content) for the first one that comes back
+    with content, or (None, '') if none does. Slower fetches keep running and warm the page cache.
+    """
+    # Search results often share a host: these downloads respect the per-host limits
+    futures = {research_executor.submit(_get_page_or_none, url, True): url for url in urls}
+    for future in as_completed(futures):
+        extracted = future.result()
+        if extracted and extracted["text"]:
+            _record_page_metrics(extracted)
+            return futures[future], extracted["text"]
+    return None, ''
 
 def blog_researcher(state: dict) -> dict:
     """
@@ -61,17 +82,11 @@ def blog_researcher(state: dict) -> dict:
         state['node_result'] = 'No topic provided.'
         return state
 
-    # Fetch reference blog content if provided
-    ref_content = ''
-    if ref_url:
-        ref_content = fetch_page_content(ref_url)
-
-    # DuckDuckGo HTML scrape for first result
-    first_url = fetch_first_duckduckgo_result(topic)
-    time.sleep(2)  # Be polite to DuckDuckGo
-    search_content = fetch_page_content(first_url) if first_url else ''
-    if not isinstance(search_content, str) or search_content is None:
-        search_content = ''
+    # Fetch the reference blog (if provided) while searching and fetching the top results
+    ref_future = _submit(fetch_page_content, ref_url) if ref_url else None
+    result_urls = fetch_search_result_urls(topic)
+    first_url, search_content = fetch_first_good_page(result_urls)
+    ref_content = ref_future.result() if ref_future else ''
     if not first_url or not search_content:
         state['node_result'] = 'No content found from search.'
         return state
@@ -82,9 +97,9 @@ def blog_researcher(state: dict) -> dict:
         You are a research assistant for blog writers. Given the following web page content and a reference blog, extract and summarize the most important facts, trends, and insights relevant to the topic: '{topic}'.
         Use the reference blog as a style and structure guide.
         Reference Blog Content:
-        {ref_content[:2000]}
+        {truncate_to_tokens(ref_content, BLOG_RESEARCH_CONTENT_TOKENS)}
         Web Page Content:
-        {search_content[:2000]}
+        {truncate_to_tokens(search_content, BLOG_RESEARCH_CONTENT_TOKENS)}
         Organize the output as:
         - Try to match the tone and structure of the reference blog.
         """
@@ -92,7 +107,7 @@ def blog_researcher(state: dict) -> dict:
         SYSTEM_PROMPT = f"""
         You are a research assistant for blog writers. Given the following web page content, extract and summarize the most important facts, trends, and insights relevant to the topic: '{topic}'.
         Web Page Content:
-        {search_content[:2000]}
+        {truncate_to_tokens(search_content, BLOG_RESEARCH_CONTENT_TOKENS)}
         Organize the output as:
         - Brief Introduction
         - Key Findings (bullet points)
@@ -104,16 +119,19 @@ def blog_researcher(state: dict) -> dict:
     if not openai_key:
         state["node_result"] = "Error: OpenAI key not found for user."
         return state
-    client = OpenAI(api_key=openai_key)
     try:
-        response = client.chat.completions.create(
+        summary = cached_chat_completion(
+            openai_key,
+            user_id=user_id,
+            node_name="blog_researcher",
+            no_cache=bool(state.get("no_cache")),
+            on_delta=get_delta_emitter(),
             model="gpt-4.1-mini",
             messages=[
                 {"role": "system", "content": SYSTEM_PROMPT}
             ],
             timeout=30
         )
-        summary = response.choices[0].message.content
         state['node_result'] = summary
     except Exception as e:
         state['node_result'] = f'Error during summarization: {str(e)}'
@@ -1,10 +1,10 @@
 from pydantic import BaseModel
 from typing import Literal
-from openai import OpenAI
 import os
 # from dotenv import load_dotenv
 import asyncio
 from redis_client import get_user_openai_key_sync
+from services.llm_gateway import parse_chat_completion
 
 # load_dotenv()
 
@@ -42,8 +42,9 @@ def classify_query(state: dict) -> dict:
     if not openai_key:
         state["node_result"] = "Error: OpenAI key not found for user."
         return state
-    client = OpenAI(api_key=openai_key)
-    response = client.beta.chat.completions.parse(
+    response = parse_chat_completion(
+        openai_key,
+        user_id=user_id,
         model="gpt-4.1-nano",
         messages=[
             {"role": "system", "content": SYSTEM_PROMPT},
@@ -1,6 +1,7 @@
 import json
-import requests
-from bs4 import BeautifulSoup
+from services.page_cache import get_page, PageFetchError
+from services.page_fetcher import TRUNCATION_MARKER
+from services.node_metrics import record_node_metric
 
 def fetch_html_content(state: dict) -> dict:
     print("🌐 fetch_html_content...")
@@ -11,11 +12,18 @@ def fetch_html_content(state: dict) -> dict:
     try:
         if not url.startswith("http"):
             url = "http://" + url
-        response = requests.get(url, timeout=10)
-        response.raise_for_status()
-        soup = BeautifulSoup(response.text, "html.parser")
-        text = soup.get_text(separator="\n", strip=True)
-        state["node_result"] = text
+        # Downloaded, extracted and cached once per URL for all users
+        extracted = get_page(url)
+        record_node_metric("html_bytes_read", extracted["bytes_read"])
+        record_node_metric("html_original_chars", extracted["original_chars"])
+        record_node_metric("html_extracted_chars", extracted["extracted_chars"])
+        print(f"🧹 Extracted {extracted['extracted_chars']} of {extracted['original_chars']} chars ({extracted['method']})")
+        state["node_result"] = extracted["text"]
+        if extracted["truncated"]:
+            state["node_result"] += TRUNCATION_MARKER
+    except PageFetchError as e:
+        print(f"❌ Error fetching HTML: {e}")
+        state["node_result"] = f"Error fetching the content: {e}"
     except Exception as e:
         print(f"❌ Error fetching HTML: {e}")
         state["node_result"] = "Error fetching the content."
@@ -1,5 +1,8 @@
 import os
-from langchain.tools.ddg_search import DuckDuckGoSearchRun
+from services.search_service import search
+
+# Number of search results included in node_result
+TOPIC_SEARCH_RESULTS = int(os.getenv("TOPIC_SEARCH_RESULTS", "5"))
 
 def get_topic_content(state: dict) -> dict:
     """
@@ -11,11 +14,12 @@ def get_topic_content(state: dict) -> dict:
         state['node_result'] = 'No topic provided.'
         return state
 
-    search = DuckDuckGoSearchRun()
     try:
-        results = search.run(topic)
-        # results is a string summary of the top results
-        state['node_result'] = results
+        # Cached, coalesced and rate limited by the shared search service
+        results = search(topic, TOPIC_SEARCH_RESULTS)
+        state['node_result'] = "\n\n".join(
+            f"{result['title']}\n{result['snippet']}\n{result['link']}" for result in results
+        ) or 'No search results found.'
     except Exception as e:
         state['node_result'] = f'Error during search: {str(e)}'
     return state 
\ No newline at end of file
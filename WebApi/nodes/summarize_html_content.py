@@ -1,11 +1,64 @@
-from openai import OpenAI
 import os
 # from dotenv import load_dotenv
 import asyncio
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
 from redis_client import get_user_openai_key_sync
+from services.llm_cache import cached_chat_completion
+from services.node_metrics import record_node_metric
+from services.stream_events import get_delta_emitter
+from services.text_chunking import estimate_tokens, split_into_token_chunks
 
 # load_dotenv()
 
+# Token budget for summarization: content above SUMMARY_SINGLE_PASS_TOKENS is summarized
+# map-reduce style in chunks of SUMMARY_CHUNK_TOKENS, using at most SUMMARY_MAX_INPUT_TOKENS
+SUMMARY_SINGLE_PASS_TOKENS = int(os.getenv("SUMMARY_SINGLE_PASS_TOKENS", "8000"))
+SUMMARY_CHUNK_TOKENS = int(os.getenv("SUMMARY_CHUNK_TOKENS", "3000"))
+SUMMARY_CHUNK_OVERLAP_TOKENS = int(os.getenv("SUMMARY_CHUNK_OVERLAP_TOKENS", "100"))
+SUMMARY_MAX_INPUT_TOKENS = int(os.getenv("SUMMARY_MAX_INPUT_TOKENS", "60000"))
+SUMMARY_MAP_WORKERS = int(os.getenv("SUMMARY_MAP_WORKERS", "8"))
+
+summary_executor = ThreadPoolExecutor(max_workers=SUMMARY_MAP_WORKERS, thread_name_prefix="flowly-summary")
+
+SYSTEM_PROMPT = """
+    You are a helpful assistant. Summarize the following text into a few key points:
+    add some desc or key point if content not found some meaning full.
+    give result should be in max 200 words.
+    """
+
+CHUNK_SYSTEM_PROMPT = """
+    You are a helpful assistant. The following text is one part of a longer page.
+    Summarize the key points of this part in max 150 words. Keep facts, names and numbers.
+    """
+
+def summarize_chunks(openai_key, user_id, no_cache, content):
+    """
+    Map step: summarize token-bounded chunks of content concurrently, in page order.
+    """
+    chunks = split_into_token_chunks(content, SUMMARY_CHUNK_TOKENS, SUMMARY_CHUNK_OVERLAP_TOKENS)
+    max_chunks = max(1, SUMMARY_MAX_INPUT_TOKENS // SUMMARY_CHUNK_TOKENS)
+    record_node_metric("summary_chunks", len(chunks[:max_chunks]))
+    if len(chunks) > max_chunks:
+        record_node_metric("summary_chunks_dropped", len(chunks) - max_chunks)
+        chunks = chunks[:max_chunks]
+
+    def summarize_chunk(chunk):
+        return cached_chat_completion(
+            openai_key,
+            user_id=user_id,
+            node_name="summarize_html_content",
+            no_cache=no_cache,
+            model="gpt-4.1-mini",
+            messages=[
+                {"role": "system", "content": CHUNK_SYSTEM_PROMPT},
+                {"role": "user", "content": chunk}
+            ]
+        )
+    # Each chunk runs with a copy of the node's context, so its llm_cache metrics reach this node
+    futures = [summary_executor.submit(contextvars.copy_context().run, summarize_chunk, chunk) for chunk in chunks]
+    return [future.result() for future in futures]
+
 def summarize_html_content(state: dict) -> dict:
     print("📝 summarize_html_content...")
     content = state.get("node_result") or state.get("node_input")
@@ -18,23 +71,27 @@ def summarize_html_content(state: dict) -> dict:
     if not openai_key:
         state["node_result"] = "Error: OpenAI key not found for user."
         return state
-    client = OpenAI(api_key=openai_key)
-    SYSTEM_PROMPT = """
-    You are a helpful assistant. Summarize the following text into a few key points:
-    add some desc or key point if content not found some meaning full.
-    give result should be in max 200 words.
-    """
+    no_cache = bool(state.get("no_cache"))
     try:
-        response = client.chat.completions.create(
+        input_tokens = estimate_tokens(content)
+        record_node_metric("summary_input_tokens_est", input_tokens)
+        if input_tokens > SUMMARY_SINGLE_PASS_TOKENS:
+            # Reduce step works on the chunk summaries instead of the full page
+            content = "\n\n".join(summarize_chunks(openai_key, user_id, no_cache, content))
+        summary = cached_chat_completion(
+            openai_key,
+            user_id=user_id,
+            node_name="summarize_html_content",
+            no_cache=no_cache,
+            on_delta=get_delta_emitter(),
             model="gpt-4.1-mini",
             messages=[
                 {"role": "system", "content": SYSTEM_PROMPT},
                 {"role": "user", "content": content}
             ]
         )
-        summary = response.choices[0].message.content
     except Exception as e:
         print("❌ LLM error:", e)
         summary = "Error while summarizing content."
     state["node_result"] = summary
-    return state 
\ No newline at end of file
+    return state
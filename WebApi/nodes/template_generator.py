@@ -1,10 +1,11 @@
 import os
 import json
 from datetime import datetime
-from openai import OpenAI
 # from dotenv import load_dotenv
 import asyncio
 from redis_client import get_user_openai_key_sync
+from services.llm_cache import cached_chat_completion
+from services.stream_events import get_delta_emitter
 import base64
 import re
 
@@ -78,14 +79,17 @@ Return the complete HTML page.
         if not openai_key:
             state["node_result"] = "Error: OpenAI key not found for user."
             return state
-        client = OpenAI(api_key=openai_key)
         try:
-            response = client.chat.completions.create(
+            filled_html = cached_chat_completion(
+                openai_key,
+                user_id=user_id,
+                node_name="template_generator",
+                no_cache=bool(state.get("no_cache")),
+                on_delta=get_delta_emitter(),
                 model="gpt-4.1-mini",
                 messages=[{"role": "system", "content": SYSTEM_PROMPT}],
                 timeout=30
             )
-            filled_html = response.choices[0].message.content
             state['node_result'] = filled_html
         except Exception as e:
             state['node_result'] = f"<p>Error generating HTML from template (LLM): {e}</p>"
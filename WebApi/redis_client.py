@@ -2,12 +2,19 @@ import redis  # sync client
 import redis.asyncio as aioredis  # async client
 import os
 import json
+import math
+import threading
 import time
 from datetime import datetime
 from typing import Optional, Dict, Any
 from dotenv import load_dotenv
 from cryptography.fernet import Fernet
 import uuid
+import xxhash
+import asyncio
+from services.cache_utils import TTLCache
+from services.storage_codec import encode_value, decode_value
+from services.node_metrics import record_node_metric
 
 load_dotenv()
 
@@ -28,6 +35,16 @@ REDIS_HOST = os.getenv("REDIS_HOST") or "localhost"
 REDIS_PORT = int(os.getenv("REDIS_PORT", "6379"))
 REDIS_PASSWORD = os.getenv("REDIS_PASSWORD")
 REDIS_DB = int(os.getenv("REDIS_DB", "0"))  # Always an int fallback
+REDIS_MAX_CONNECTIONS = int(os.getenv("REDIS_MAX_CONNECTIONS", "50"))  # Sync pool size
+REDIS_POOL_TIMEOUT = float(os.getenv("REDIS_POOL_TIMEOUT", "5"))  # Max seconds to wait for a free connection
+REDIS_HEALTH_CHECK_INTERVAL = int(os.getenv("REDIS_HEALTH_CHECK_INTERVAL", "30"))
+
+# Decrypted OpenAI keys are cached in process memory only (never written back to Redis)
+OPENAI_KEY_CACHE_TTL = float(os.getenv("OPENAI_KEY_CACHE_TTL", "300"))
+OPENAI_KEY_CACHE_SIZE = int(os.getenv("OPENAI_KEY_CACHE_SIZE", "1024"))
+OPENAI_KEY_INVALIDATION_CHANNEL = "openai_key_invalidate"
+# Keys per MGET / SCAN step when reading many keys at once
+REDIS_BATCH_SIZE = int(os.getenv("REDIS_BATCH_SIZE", "200"))
 
 # Debug logging
 print(f"🔧 Redis Configuration:")
@@ -35,9 +52,11 @@ print(f"   Host: {REDIS_HOST}")
 print(f"   Port: {REDIS_PORT}")
 print(f"   Password: {'***' if REDIS_PASSWORD else 'None'}")
 print(f"   DB: {REDIS_DB}")
+print(f"   Max connections (sync pool): {REDIS_MAX_CONNECTIONS}")
 
-# Global Redis client
+# Global Redis clients; the binary one returns raw bytes (for codec-encoded values)
 redis_client: Optional[aioredis.Redis] = None
+redis_binary_client: Optional[aioredis.Redis] = None
 
 async def get_redis_client() -> aioredis.Redis:
     """
@@ -60,6 +79,147 @@ async def get_redis_client() -> aioredis.Redis:
             raise
     return redis_client
 
+async def get_redis_binary_client() -> aioredis.Redis:
+    """
+    Get or create the async Redis client that does not decode responses
+    """
+    global redis_binary_client
+    if redis_binary_client is None:
+        try:
+            redis_binary_client = aioredis.Redis(
+                host=REDIS_HOST,
+                port=REDIS_PORT,
+                password=REDIS_PASSWORD,
+                db=REDIS_DB,
+            )
+            print(f"✅ Redis binary client created successfully")
+        except Exception as e:
+            print(f"❌ Error creating Redis binary client: {e}")
+            raise
+    return redis_binary_client
+
+async def mget_in_batches(client: aioredis.Redis, keys: list) -> list:
+    """
+    MGET many keys in batches of REDIS_BATCH_SIZE: one round trip per batch instead of one
+    per key, without building a single huge reply. Values are returned in key order.
+    """
+    values = []
+    for start in range(0, len(keys), REDIS_BATCH_SIZE):
+        values.extend(await client.mget(keys[start:start + REDIS_BATCH_SIZE]))
+    return values
+
+class InstrumentedConnectionPool(redis.BlockingConnectionPool):
+    """
+    Blocking sync connection pool that records how long callers wait to acquire a connection.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._stats_lock = threading.Lock()
+        self.acquired = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def get_connection(self, command_name, *keys, **options):
+        started = time.perf_counter()
+        connection = super().get_connection(command_name, *keys, **options)
+        waited = time.perf_counter() - started
+        with self._stats_lock:
+            self.acquired += 1
+            self.total_wait += waited
+            self.max_wait = max(self.max_wait, waited)
+        return connection
+
+    def stats(self) -> Dict[str, Any]:
+        idle = sum(1 for connection in list(self.pool.queue) if connection is not None)
+        created = len(self._connections)
+        with self._stats_lock:
+            avg_wait = self.total_wait / self.acquired if self.acquired else 0.0
+            return {
+                "max_connections": self.max_connections,
+                "created": created,
+                "in_use": created - idle,
+                "idle": idle,
+                "acquired": self.acquired,
+                "avg_wait_ms": round(avg_wait * 1000, 3),
+                "max_wait_ms": round(self.max_wait * 1000, 3),
+            }
+
+# Global sync connection pools (for node code running in worker threads). The binary pool
+# does not decode responses and is used for compressed cache values.
+sync_redis_pool: Optional[InstrumentedConnectionPool] = None
+sync_redis_binary_pool: Optional[InstrumentedConnectionPool] = None
+_sync_pool_lock = threading.Lock()
+
+def _create_sync_pool(decode_responses: bool) -> InstrumentedConnectionPool:
+    connection_kwargs = {"decode_responses": True, "encoding": "utf-8"} if decode_responses else {}
+    return InstrumentedConnectionPool(
+        max_connections=REDIS_MAX_CONNECTIONS,
+        timeout=REDIS_POOL_TIMEOUT,
+        host=REDIS_HOST,
+        port=REDIS_PORT,
+        password=REDIS_PASSWORD,
+        db=REDIS_DB,
+        health_check_interval=REDIS_HEALTH_CHECK_INTERVAL,
+        socket_connect_timeout=REDIS_POOL_TIMEOUT,
+        **connection_kwargs,
+    )
+
+def init_sync_redis_pool() -> InstrumentedConnectionPool:
+    """
+    Create the shared sync connection pools. Called once at startup; safe to call again.
+    """
+    global sync_redis_pool, sync_redis_binary_pool
+    with _sync_pool_lock:
+        if sync_redis_pool is None:
+            sync_redis_pool = _create_sync_pool(decode_responses=True)
+            print(f"✅ Sync Redis connection pool created (max {REDIS_MAX_CONNECTIONS})")
+        if sync_redis_binary_pool is None:
+            sync_redis_binary_pool = _create_sync_pool(decode_responses=False)
+    return sync_redis_pool
+
+def close_sync_redis_pool():
+    global sync_redis_pool, sync_redis_binary_pool
+    with _sync_pool_lock:
+        for pool in (sync_redis_pool, sync_redis_binary_pool):
+            if pool is not None:
+                pool.disconnect()
+        sync_redis_pool = None
+        sync_redis_binary_pool = None
+
+def get_sync_redis_client() -> redis.Redis:
+    """
+    Get a sync Redis client backed by the shared connection pool
+    """
+    pool = sync_redis_pool or init_sync_redis_pool()
+    return redis.Redis(connection_pool=pool)
+
+def get_sync_redis_binary_client() -> redis.Redis:
+    """
+    Get a sync Redis client that returns raw bytes (for compressed values)
+    """
+    if sync_redis_binary_pool is None:
+        init_sync_redis_pool()
+    return redis.Redis(connection_pool=sync_redis_binary_pool)
+
+def get_sync_redis_pool_stats() -> Dict[str, Any]:
+    if sync_redis_pool is None:
+        return {}
+    stats = sync_redis_pool.stats()
+    if sync_redis_binary_pool is not None:
+        stats["binary"] = sync_redis_binary_pool.stats()
+    return stats
+
+def redis_health_check() -> bool:
+    """
+    Ping Redis through the shared sync pool
+    """
+    try:
+        return bool(get_sync_redis_client().ping())
+    except Exception as e:
+        print(f"❌ Redis health check failed: {e}")
+        return False
+
 async def store_user_profile(user_id: str, user_data: Dict[str, Any]) -> bool:
     try:
         client = await get_redis_client()
@@ -169,13 +329,9 @@ async def get_all_api_keys(user_id: str) -> list:
     try:
         client = await get_redis_client()
         pattern = f"api_key:{user_id}:*"
-        keys = await client.keys(pattern)
-        api_keys = []
-        for key in keys:
-            data = await client.get(key)
-            if data:
-                api_keys.append(json.loads(data))
-        return api_keys
+        # SCAN instead of KEYS so the lookup never blocks the server
+        keys = [key async for key in client.scan_iter(match=pattern, count=REDIS_BATCH_SIZE)]
+        return [json.loads(data) for data in await mget_in_batches(client, keys) if data]
     except Exception as e:
         print(f"❌ Error retrieving API keys from Redis: {e}")
         return []
@@ -188,6 +344,8 @@ async def delete_api_key(user_id: str, service_name: str) -> bool:
         client = await get_redis_client()
         key = f"api_key:{user_id}:{service_name}"
         await client.delete(key)
+        if service_name == "openai":
+            await publish_openai_key_invalidation(user_id)
         print(f"✅ API key deleted from Redis for user: {user_id}, service: {service_name}")
         return True
     except Exception as e:
@@ -206,6 +364,7 @@ async def save_openai_key(user_id: str, openai_key: str) -> bool:
             "created_at": str(int(time.time()))
         }
         await client.set(key, json.dumps(data))
+        await publish_openai_key_invalidation(user_id)
         print(f"✅ OpenAI key (encrypted) saved for user: {user_id}")
         return True
     except Exception as e:
@@ -227,19 +386,137 @@ async def delete_openai_key(user_id: str) -> bool:
         client = await get_redis_client()
         key = f"api_key:{user_id}:openai"
         await client.delete(key)
+        await publish_openai_key_invalidation(user_id)
         print(f"✅ OpenAI key deleted for user: {user_id}")
         return True
     except Exception as e:
         print(f"❌ Error deleting OpenAI key: {e}")
         return False
 
+openai_key_cache = TTLCache(OPENAI_KEY_CACHE_SIZE, OPENAI_KEY_CACHE_TTL)
+# Bumped by every invalidation. A lookup captures the generation before reading Redis and
+# only caches what it read if nothing was invalidated meanwhile, so a key rotated or
+# revoked during the lookup is never cached. The epoch covers clearing everything.
+_openai_key_lock = threading.Lock()
+_openai_key_generations: Dict[str, int] = {}
+_openai_key_epoch = 0
+# Moving average of an uncached lookup (Redis GET + JSON parse + decrypt), used to report savings
+_openai_key_miss_ms = 0.0
+
+def _record_openai_key_miss(started: float):
+    global _openai_key_miss_ms
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    _openai_key_miss_ms = elapsed_ms if not _openai_key_miss_ms else 0.8 * _openai_key_miss_ms + 0.2 * elapsed_ms
+    record_node_metric("openai_key_cache", "miss")
+    record_node_metric("openai_key_lookup_ms", round(elapsed_ms, 3))
+
+def _cached_openai_key(user_id: str) -> Optional[str]:
+    started = time.perf_counter()
+    api_key = openai_key_cache.get(user_id)
+    if api_key is not None:
+        hit_ms = (time.perf_counter() - started) * 1000
+        record_node_metric("openai_key_cache", "hit")
+        record_node_metric("openai_key_lookup_saved_ms", round(max(0.0, _openai_key_miss_ms - hit_ms), 3))
+    return api_key
+
+def _openai_key_generation(user_id: str) -> tuple:
+    with _openai_key_lock:
+        return _openai_key_epoch, _openai_key_generations.get(user_id, 0)
+
+def _cache_openai_key(user_id: str, api_key: str, generation: tuple) -> bool:
+    """
+    Cache a decrypted key read at `generation`, unless it was invalidated since
+    """
+    with _openai_key_lock:
+        if generation != (_openai_key_epoch, _openai_key_generations.get(user_id, 0)):
+            return False
+        openai_key_cache.set(user_id, api_key)
+        return True
+
+def get_openai_key_cache_stats() -> Dict[str, Any]:
+    return {
+        "size": len(openai_key_cache),
+        "max_size": openai_key_cache.max_size,
+        "ttl_seconds": openai_key_cache.ttl,
+        "avg_uncached_lookup_ms": round(_openai_key_miss_ms, 3),
+    }
+
+def invalidate_cached_openai_key(user_id: str):
+    """
+    Drop the decrypted key for user_id from this worker's cache
+    """
+    global _openai_key_epoch
+    with _openai_key_lock:
+        if user_id not in _openai_key_generations and len(_openai_key_generations) >= OPENAI_KEY_CACHE_SIZE:
+            # Keep the counters bounded: forgetting them is safe once the epoch moves on
+            _openai_key_generations.clear()
+            _openai_key_epoch += 1
+        _openai_key_generations[user_id] = _openai_key_generations.get(user_id, 0) + 1
+        openai_key_cache.delete(user_id)
+
+def invalidate_all_cached_openai_keys():
+    """
+    Drop every cached key in this worker, including lookups still in flight
+    """
+    global _openai_key_epoch
+    with _openai_key_lock:
+        _openai_key_generations.clear()
+        _openai_key_epoch += 1
+        openai_key_cache.clear()
+
+async def publish_openai_key_invalidation(user_id: str):
+    """
+    Tell every worker to drop its cached key for user_id (only the user_id is published)
+    """
+    invalidate_cached_openai_key(user_id)
+    try:
+        client = await get_redis_client()
+        await client.publish(OPENAI_KEY_INVALIDATION_CHANNEL, user_id)
+    except Exception as e:
+        print(f"❌ Error publishing OpenAI key invalidation: {e}")
+
+async def listen_for_openai_key_invalidations():
+    """
+    Background task: evict cached keys when any worker saves or deletes a user's OpenAI key.
+    Reconnects after errors; cancel the task to stop it.
+    """
+    while True:
+        pubsub = None
+        try:
+            client = await get_redis_client()
+            pubsub = client.pubsub(ignore_subscribe_messages=True)
+            await pubsub.subscribe(OPENAI_KEY_INVALIDATION_CHANNEL)
+            async for message in pubsub.listen():
+                if message.get("type") == "message":
+                    invalidate_cached_openai_key(message["data"])
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"❌ OpenAI key invalidation listener error: {e}")
+            # The cache may have missed invalidations while disconnected
+            invalidate_all_cached_openai_keys()
+            await asyncio.sleep(5)
+        finally:
+            if pubsub is not None:
+                try:
+                    await pubsub.aclose()
+                except Exception:
+                    pass
+
 async def get_user_openai_key(user_id: str) -> Optional[str]:
     """
     Fetch and decrypt the OpenAI API key for a given user_id from Redis.
     Returns the decrypted key as a string, or None if not found.
     """
+    api_key = _cached_openai_key(user_id)
+    if api_key is not None:
+        return api_key
+    started = time.perf_counter()
+    generation = _openai_key_generation(user_id)
     obj = await get_api_key(user_id, "openai")
     if obj and obj.get("api_key"):
+        _cache_openai_key(user_id, obj["api_key"], generation)
+        _record_openai_key_miss(started)
         return obj["api_key"]
     return None
 
@@ -248,15 +525,13 @@ def get_user_openai_key_sync(user_id: str) -> Optional[str]:
     Synchronous version: Fetch and decrypt the OpenAI API key for a given user_id from Redis.
     Returns the decrypted key as a string, or None if not found.
     """
+    api_key = _cached_openai_key(user_id)
+    if api_key is not None:
+        return api_key
     try:
-        client = redis.Redis(
-            host=REDIS_HOST,
-            port=REDIS_PORT,
-            password=REDIS_PASSWORD,
-            db=REDIS_DB,
-            decode_responses=True,
-            encoding="utf-8"
-        )
+        started = time.perf_counter()
+        generation = _openai_key_generation(user_id)
+        client = get_sync_redis_client()
         key = f"api_key:{user_id}:openai"
         data = client.get(key)  # This should be a string, not a coroutine
         if data:
@@ -267,52 +542,191 @@ def get_user_openai_key_sync(user_id: str) -> Optional[str]:
                 except Exception as e:
                     print(f"❌ Error decrypting API key: {e}")
                     obj["api_key"] = None
+            if obj["api_key"]:
+                _cache_openai_key(user_id, obj["api_key"], generation)
+                _record_openai_key_miss(started)
             return obj["api_key"]
         return None
     except Exception as e:
         print(f"❌ Error retrieving OpenAI key (sync) from Redis: {e}")
         return None
 
+def workflow_key(user_id: str, workflow_id: str) -> str:
+    # Full workflow blob (storage codec)
+    return f"workflow:{user_id}:{workflow_id}"
+
+def _workflow_summary_key(user_id: str, workflow_id: str) -> str:
+    return f"workflow_summary:{user_id}:{workflow_id}"
+
+def workflow_plan_key(user_id: str, workflow_id: str) -> str:
+    # Precomputed execution plan (services/workflow_plans.py); dropped on save and delete
+    return f"workflow_plan:{user_id}:{workflow_id}"
+
+def _workflow_index_key(user_id: str) -> str:
+    # Sorted set of workflow ids scored by created_at
+    return f"workflows_by_created:{user_id}"
+
+def _workflow_summary(workflow: dict, byte_size: int) -> dict:
+    """
+    Lightweight projection of a saved workflow, used for listing
+    """
+    data = workflow.get("data")
+    nodes = data.get("nodes") if isinstance(data, dict) else None
+    return {
+        "workflow_id": workflow["workflow_id"],
+        "name": workflow.get("name", ""),
+        "created_at": workflow.get("created_at", ""),
+        "node_count": len(nodes) if isinstance(nodes, list) else 0,
+        "byte_size": byte_size,
+    }
+
+def _workflow_score(workflow_id: str, created_at: float) -> float:
+    # created_at has one-second resolution; a fraction derived from the id keeps workflows
+    # saved in the same second at distinct scores, so score cursors never skip any
+    return int(created_at) + (xxhash.xxh32_intdigest(workflow_id) % 100000) / 1e6
+
 async def save_user_workflow(user_id: str, name: str, data: dict) -> str:
     """
     Save a workflow for a user. Returns the workflow_id.
+    The full blob (storage codec: zstd-compressed msgpack), its summary and both indexes
+    are written in one transaction.
     """
     try:
         client = await get_redis_client()
         workflow_id = str(uuid.uuid4())
-        key = f"workflow:{user_id}:{workflow_id}"
+        created_at = int(time.time())
         workflow_data = {
             "workflow_id": workflow_id,
             "user_id": user_id,
             "name": name,
             "data": data,
-            "created_at": str(int(time.time()))
+            "created_at": str(created_at)
         }
-        await client.set(key, json.dumps(workflow_data))
-        # Add workflow_id to user's workflow set for listing
-        await client.sadd(f"workflows:{user_id}", workflow_id)
+        blob = encode_value(workflow_data)
+        summary = _workflow_summary(workflow_data, len(blob))
+        async with client.pipeline(transaction=True) as pipe:
+            pipe.set(workflow_key(user_id, workflow_id), blob)
+            pipe.set(_workflow_summary_key(user_id, workflow_id), json.dumps(summary))
+            pipe.zadd(_workflow_index_key(user_id), {workflow_id: _workflow_score(workflow_id, created_at)})
+            # Legacy set, still kept so older readers and the backfill check stay consistent
+            pipe.sadd(f"workflows:{user_id}", workflow_id)
+            pipe.delete(workflow_plan_key(user_id, workflow_id))
+            await pipe.execute()
         return workflow_id
     except Exception as e:
         print(f"❌ Error saving workflow: {e}")
         return ""
 
-async def get_user_workflows(user_id: str) -> list:
+async def _backfill_workflow_index(client: aioredis.Redis, user_id: str):
+    """
+    Lazily index workflows saved before the sorted-set index existed: any id in the legacy
+    set but not in the index gets a summary and an index entry.
+    """
+    index_key = _workflow_index_key(user_id)
+    async with client.pipeline(transaction=False) as pipe:
+        pipe.zcard(index_key)
+        pipe.scard(f"workflows:{user_id}")
+        indexed_count, legacy_count = await pipe.execute()
+    if legacy_count <= indexed_count:
+        return
+    legacy_ids = list(await client.smembers(f"workflows:{user_id}"))
+    async with client.pipeline(transaction=False) as pipe:
+        for workflow_id in legacy_ids:
+            pipe.zscore(index_key, workflow_id)
+        scores = await pipe.execute()
+    missing_ids = [workflow_id for workflow_id, score in zip(legacy_ids, scores) if score is None]
+    binary_client = await get_redis_binary_client()
+    blobs = await mget_in_batches(binary_client, [workflow_key(user_id, workflow_id) for workflow_id in missing_ids])
+    async with client.pipeline(transaction=False) as pipe:
+        for workflow_id, blob in zip(missing_ids, blobs):
+            if not blob:
+                # Blob is gone: drop the dangling legacy entry
+                pipe.srem(f"workflows:{user_id}", workflow_id)
+                continue
+            workflow = decode_value(blob)
+            summary = _workflow_summary(workflow, len(blob))
+            pipe.set(_workflow_summary_key(user_id, workflow_id), json.dumps(summary))
+            pipe.zadd(index_key, {workflow_id: _workflow_score(workflow_id, float(workflow.get("created_at") or 0))})
+        await pipe.execute()
+    print(f"✅ Indexed {len(missing_ids)} legacy workflows for user: {user_id}")
+
+def _workflow_page_max_score(cursor: Optional[str]) -> str:
     """
-    Get all workflows for a user.
+    ZREVRANGEBYSCORE max for a page cursor (the score of the last item returned; the next
+    page starts strictly below it). Raises ValueError for anything but a finite score.
     """
+    if not cursor:
+        return "+inf"
+    try:
+        score = float(cursor)
+    except ValueError:
+        score = math.nan
+    if not math.isfinite(score):
+        raise ValueError(f"Invalid cursor: {cursor}")
+    return f"({score!r}"
+
+async def _search_workflow_summaries(client: aioredis.Redis, user_id: str, max_score: str, needle: str, count: int) -> list:
+    """
+    Walk the index newest first, in batches of REDIS_BATCH_SIZE, collecting up to `count`
+    (score, summary) pairs whose lowercased name contains needle.
+    """
+    matches = []
+    while len(matches) < count:
+        entries = await client.zrevrangebyscore(_workflow_index_key(user_id), max_score, "-inf", start=0, num=REDIS_BATCH_SIZE, withscores=True)
+        summaries = await mget_in_batches(client, [_workflow_summary_key(user_id, workflow_id) for workflow_id, _ in entries])
+        for (_, score), summary in zip(entries, summaries):
+            if summary:
+                workflow = json.loads(summary)
+                if needle in workflow.get("name", "").lower():
+                    matches.append((score, workflow))
+        if len(entries) < REDIS_BATCH_SIZE:
+            break
+        max_score = f"({entries[-1][1]!r}"
+    return matches[:count]
+
+async def get_user_workflows(user_id: str, limit: int = 50, cursor: Optional[str] = None, query: Optional[str] = None) -> dict:
+    """
+    List a user's workflows, newest first, as summaries (id, name, created_at, node_count,
+    byte_size). Returns {"workflows": [...], "next_cursor": str or None}; pass next_cursor
+    back to get the following page. With a query, only workflows whose name contains it
+    (case-insensitive) are listed. Raises ValueError for a malformed cursor.
+    """
+    max_score = _workflow_page_max_score(cursor)
+    needle = (query or "").strip().lower()
     try:
         client = await get_redis_client()
-        workflow_ids = await client.smembers(f"workflows:{user_id}")
-        workflows = []
-        for workflow_id in workflow_ids:
-            key = f"workflow:{user_id}:{workflow_id}"
-            data = await client.get(key)
-            if data:
-                workflows.append(json.loads(data))
-        return workflows
+        if cursor is None:
+            await _backfill_workflow_index(client, user_id)
+        if needle:
+            matches = await _search_workflow_summaries(client, user_id, max_score, needle, limit + 1)
+            page = matches[:limit]
+            return {
+                "workflows": [workflow for _, workflow in page],
+                "next_cursor": repr(page[-1][0]) if len(matches) > limit else None,
+            }
+        entries = await client.zrevrangebyscore(_workflow_index_key(user_id), max_score, "-inf", start=0, num=limit + 1, withscores=True)
+        page = entries[:limit]
+        summaries = await mget_in_batches(client, [_workflow_summary_key(user_id, workflow_id) for workflow_id, _ in page])
+        next_cursor = repr(page[-1][1]) if len(entries) > limit else None
+        return {
+            "workflows": [json.loads(summary) for summary in summaries if summary],
+            "next_cursor": next_cursor,
+        }
     except Exception as e:
         print(f"❌ Error retrieving workflows: {e}")
-        return []
+        return {"workflows": [], "next_cursor": None}
+
+async def get_user_workflow(user_id: str, workflow_id: str) -> Optional[dict]:
+    """
+    Get one workflow's full data (including the React Flow graph).
+    """
+    try:
+        client = await get_redis_binary_client()
+        # Reads both codec-encoded and legacy JSON blobs
+        return decode_value(await client.get(workflow_key(user_id, workflow_id)))
+    except Exception as e:
+        print(f"❌ Error retrieving workflow: {e}")
+        return None
 
 async def delete_user_workflow(user_id: str, workflow_id: str) -> bool:
     """
@@ -320,9 +734,11 @@ async def delete_user_workflow(user_id: str, workflow_id: str) -> bool:
     """
     try:
         client = await get_redis_client()
-        key = f"workflow:{user_id}:{workflow_id}"
-        await client.delete(key)
-        await client.srem(f"workflows:{user_id}", workflow_id)
+        async with client.pipeline(transaction=True) as pipe:
+            pipe.delete(workflow_key(user_id, workflow_id), _workflow_summary_key(user_id, workflow_id), workflow_plan_key(user_id, workflow_id))
+            pipe.zrem(_workflow_index_key(user_id), workflow_id)
+            pipe.srem(f"workflows:{user_id}", workflow_id)
+            await pipe.execute()
         print(f"✅ Workflow deleted: {workflow_id} for user: {user_id}")
         return True
     except Exception as e:
@@ -0,0 +1,103 @@
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+
+
+class TTLCache:
+    """
+    Small thread-safe in-process LRU cache with a per-entry TTL.
+
+    get() only returns fresh values. With keep_stale=True, expired entries stay in the cache
+    (until evicted by size) so get_entry() can still hand them out, e.g. for conditional
+    revalidation with ETag/Last-Modified.
+    """
+
+    def __init__(self, max_size: int, ttl: float, keep_stale: bool = False):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.keep_stale = keep_stale
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        entry = self.get_entry(key)
+        if entry is None or entry["expires_at"] <= time.monotonic():
+            return default
+        return entry["value"]
+
+    def get_entry(self, key):
+        """
+        Return {"value", "stored_at", "expires_at"} for key, including stale entries when
+        keep_stale is set, or None.
+        """
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            if entry["expires_at"] <= time.monotonic() and not self.keep_stale:
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return entry
+
+    def set(self, key, value, ttl: float | None = None):
+        now = time.monotonic()
+        with self._lock:
+            self._data[key] = {
+                "value": value,
+                "stored_at": now,
+                "expires_at": now + (self.ttl if ttl is None else ttl),
+            }
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def keys(self) -> list:
+        with self._lock:
+            return list(self._data.keys())
+
+    def __len__(self):
+        with self._lock:
+            return len(self._data)
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent calls for the same key: the first caller runs the function, every
+    caller that arrives while it is in flight waits for and shares its result (or exception).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self.coalesced = 0
+
+    def do(self, key, fn, *args, **kwargs):
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = self._calls[key] = Future()
+            else:
+                self.coalesced += 1
+        if not leader:
+            return future.result()
+        try:
+            result = fn(*args, **kwargs)
+            future.set_result(result)
+            return result
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
@@ -0,0 +1,154 @@
+import os
+import re
+from bs4 import BeautifulSoup, Tag
+from services.html_parser import parse_html, run_parse_task
+
+# Minimum text length for an <article> (or best-scoring block) to be trusted as main content
+EXTRACT_MIN_CONTENT_CHARS = int(os.getenv("EXTRACT_MIN_CONTENT_CHARS", "250"))
+
+# Elements that never carry main content
+BOILERPLATE_TAGS = ["script", "style", "noscript", "template", "svg", "iframe", "form", "nav", "header", "footer", "aside", "button"]
+
+# class/id hints for boilerplate blocks (menus, cookie banners, share bars, ...) and for content blocks
+BOILERPLATE_HINTS = re.compile(
+    r"nav|menu|footer|header|sidebar|cookie|consent|banner|gdpr|promo|advert|\bads?\b|share|social|"
+    r"comment|related|breadcrumb|subscribe|newsletter|popup|modal|widget|sponsor",
+    re.IGNORECASE,
+)
+CONTENT_HINTS = re.compile(r"article|content|main|post|entry|story|body|text", re.IGNORECASE)
+
+# Blocks scored as main-content candidates
+SCORED_TAGS = ("div", "section", "main", "td", "article", "body")
+PARAGRAPH_TAGS = ["p", "pre", "blockquote"]
+# A hinted element holding more than this share of the page's paragraph text is kept
+# (e.g. <div class="page-wrapper has-sidebar"> around the whole page)
+PROTECTED_TEXT_SHARE = 0.5
+BLANK_LINES = re.compile(r"\n\s*\n+")
+
+
+def _hint_text(element: Tag) -> str:
+    classes = element.get("class") or []
+    return " ".join(classes) + " " + (element.get("id") or "")
+
+
+def _paragraph_chars(element: Tag) -> int:
+    return sum(len(paragraph.get_text(" ", strip=True)) for paragraph in element.find_all(PARAGRAPH_TAGS))
+
+
+def _strip_boilerplate_tags(soup: BeautifulSoup):
+    for element in soup.find_all(BOILERPLATE_TAGS):
+        element.decompose()
+
+
+def _strip_boilerplate_hints(soup: BeautifulSoup):
+    """
+    Remove elements whose class/id looks like boilerplate, except the ones wrapping the
+    best-scoring block or most of the page's paragraph text.
+    """
+    best = _find_best_block(soup)
+    protected = {id(parent) for parent in best.parents} | {id(best)} if best is not None else set()
+    total_chars = _paragraph_chars(soup)
+    for element in soup.find_all(True):
+        # decompose() of an ancestor leaves already-collected descendants detached
+        if element.decomposed or element.name in ("html", "body", "article", "main") or id(element) in protected:
+            continue
+        hints = _hint_text(element)
+        if not BOILERPLATE_HINTS.search(hints) or CONTENT_HINTS.search(hints):
+            continue
+        if total_chars and _paragraph_chars(element) > total_chars * PROTECTED_TEXT_SHARE:
+            continue
+        element.decompose()
+
+
+def _link_density(element: Tag, text_length: int) -> float:
+    if not text_length:
+        return 1.0
+    link_length = sum(len(link.get_text(strip=True)) for link in element.find_all("a"))
+    return min(link_length / text_length, 1.0)
+
+
+def _find_best_block(soup: BeautifulSoup):
+    """
+    Readability-style scoring: every paragraph-like element adds points to its parent (and
+    half to its grandparent) based on its length and comma count, a cheap proxy for prose.
+    Candidates with content hints are boosted and the result is penalised by link density.
+    """
+    # Keyed by id(): Tag hashing/equality compares markup, which is slow and merges identical blocks
+    scores, elements = {}, {}
+    for paragraph in soup.find_all(PARAGRAPH_TAGS):
+        text = paragraph.get_text(" ", strip=True)
+        if len(text) < 25:
+            continue
+        points = 1 + text.count(",") + min(len(text) // 100, 3)
+        parent = paragraph.parent
+        grandparent = parent.parent if parent is not None else None
+        for element, share in ((parent, 1.0), (grandparent, 0.5)):
+            if isinstance(element, Tag) and element.name in SCORED_TAGS:
+                elements[id(element)] = element
+                scores[id(element)] = scores.get(id(element), 0.0) + points * share
+    best, best_score = None, 0.0
+    for key, score in scores.items():
+        element = elements[key]
+        if CONTENT_HINTS.search(_hint_text(element)):
+            score *= 1.25
+        score *= 1 - _link_density(element, len(element.get_text(" ", strip=True)))
+        if score > best_score:
+            best, best_score = element, score
+    return best
+
+
+def _get_text(element: Tag) -> str:
+    return BLANK_LINES.sub("\n", element.get_text(separator="\n", strip=True))
+
+
+def _extract(soup: BeautifulSoup, strip_hints: bool) -> tuple:
+    _strip_boilerplate_tags(soup)
+    if strip_hints:
+        _strip_boilerplate_hints(soup)
+
+    text, method = "", "body"
+    articles = [_get_text(article) for article in soup.find_all("article")]
+    articles = [article for article in articles if len(article) >= EXTRACT_MIN_CONTENT_CHARS]
+    if articles:
+        text, method = max(articles, key=len), "article"
+    else:
+        best = _find_best_block(soup)
+        if best is not None:
+            candidate = _get_text(best)
+            if len(candidate) >= EXTRACT_MIN_CONTENT_CHARS:
+                text, method = candidate, "density"
+    if not text:
+        root = soup.find("body") or soup
+        text = _get_text(root)
+    return text, method
+
+
+def _extract_main_content(html: str) -> dict:
+    soup = parse_html(html)
+    original_chars = len(soup.get_text(separator="\n", strip=True))
+    text, method = _extract(soup, strip_hints=True)
+    if len(text) < EXTRACT_MIN_CONTENT_CHARS:
+        # Hint stripping may have removed the content itself: retry without it, like readability
+        retry_text, retry_method = _extract(parse_html(html), strip_hints=False)
+        if len(retry_text) > len(text):
+            text, method = retry_text, retry_method
+
+    return {
+        "text": text,
+        "method": method,
+        "original_chars": original_chars,
+        "extracted_chars": len(text),
+    }
+
+
+def extract_main_content(html: str) -> dict:
+    """
+    Strip navigation, footers, cookie banners and scripts from an HTML page and return its
+    main content as text. Prefers an <article> element, then the block with the best
+    text-density score, then the whole body.
+
+    Returns {"text", "method", "original_chars", "extracted_chars"}; original_chars is the
+    length of the naive get_text() of the full page, so the two sizes show the savings.
+    """
+    # Large pages are parsed in the HTML process pool
+    return run_parse_task(_extract_main_content, html or "")
@@ -0,0 +1,180 @@
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Dict, Any
+
+import xxhash
+
+from redis_client import get_sync_redis_client
+from services.cache_utils import TTLCache, SingleFlight
+from services.feed_fetcher import FEED_FETCH_TIMEOUT, FEED_HOST_MIN_INTERVAL, download_feed, parse_feed_entries
+
+# Feed cache configuration
+FEED_CACHE_TTL = float(os.getenv("FEED_CACHE_TTL", "300"))  # seconds a feed is served without revalidation
+FEED_CACHE_MAX_FEEDS = int(os.getenv("FEED_CACHE_MAX_FEEDS", "256"))
+FEED_CACHE_REDIS = os.getenv("FEED_CACHE_REDIS", "false").lower() in ("1", "true", "yes")
+FEED_CACHE_REDIS_TTL = int(os.getenv("FEED_CACHE_REDIS_TTL", "86400"))  # kept longer so ETags can be reused
+FEED_FETCH_WORKERS = int(os.getenv("FEED_FETCH_WORKERS", "16"))
+
+feed_executor = ThreadPoolExecutor(max_workers=FEED_FETCH_WORKERS, thread_name_prefix="flowly-feed")
+
+# Stale entries are kept so their ETag/Last-Modified can be used to revalidate
+_memory_cache = TTLCache(FEED_CACHE_MAX_FEEDS, FEED_CACHE_TTL, keep_stale=True)
+_inflight = SingleFlight()
+_stats_lock = threading.Lock()
+_stats = {
+    "hits": 0,
+    "redis_hits": 0,
+    "revalidated": 0,
+    "misses": 0,
+    "stale_served": 0,
+    "errors": 0,
+}
+
+
+def _count(stat: str):
+    with _stats_lock:
+        _stats[stat] += 1
+
+
+def _redis_key(url: str) -> str:
+    return f"feed_cache:{xxhash.xxh64_hexdigest(url)}"
+
+
+def _is_fresh(record: Dict[str, Any]) -> bool:
+    return time.time() - record["validated_at"] < FEED_CACHE_TTL
+
+
+def _read_redis(url: str):
+    if not FEED_CACHE_REDIS:
+        return None
+    try:
+        data = get_sync_redis_client().get(_redis_key(url))
+        return json.loads(data) if data else None
+    except Exception as e:
+        print(f"❌ Error reading feed cache from Redis: {e}")
+        return None
+
+
+def _write_redis(url: str, record: Dict[str, Any]):
+    if not FEED_CACHE_REDIS:
+        return
+    try:
+        get_sync_redis_client().set(_redis_key(url), json.dumps(record), ex=FEED_CACHE_REDIS_TTL)
+    except Exception as e:
+        print(f"❌ Error writing feed cache to Redis: {e}")
+
+
+def _store(url: str, record: Dict[str, Any]):
+    _memory_cache.set(url, record)
+    _write_redis(url, record)
+
+
+def _load_feed(url: str, timeout: float) -> Dict[str, Any]:
+    """
+    Cache miss path (run once per URL even under concurrent misses): try the shared Redis
+    tier, then revalidate or download the feed.
+    """
+    entry = _memory_cache.get_entry(url)
+    record = entry["value"] if entry else None
+    redis_record = _read_redis(url)
+    if redis_record and (record is None or redis_record["validated_at"] > record["validated_at"]):
+        record = redis_record
+        if _is_fresh(record):
+            _memory_cache.set(url, record)
+            _count("redis_hits")
+            return record
+
+    try:
+        response = download_feed(
+            url,
+            timeout,
+            etag=record.get("etag") if record else None,
+            modified=record.get("modified") if record else None,
+        )
+    except Exception:
+        if record is not None:
+            # Serve the last good copy rather than nothing when the source is down
+            _count("stale_served")
+            return record
+        _count("errors")
+        raise
+
+    now = time.time()
+    if response["status"] == 304 and record is not None:
+        record = {**record, "etag": response["etag"], "modified": response["modified"], "validated_at": now}
+        _count("revalidated")
+    else:
+        record = {
+            "url": url,
+            "entries": parse_feed_entries(response["content"]),
+            "etag": response["etag"],
+            "modified": response["modified"],
+            "fetched_at": now,
+            "validated_at": now,
+        }
+        _count("misses")
+    _store(url, record)
+    return record
+
+
+def get_feed(url: str, timeout: float = FEED_FETCH_TIMEOUT) -> Dict[str, Any]:
+    """
+    Return the cached feed record for url ({"entries": [...], "fetched_at", "validated_at", ...}),
+    fetching or revalidating it when it is older than FEED_CACHE_TTL. Shared by every user.
+    """
+    entry = _memory_cache.get_entry(url)
+    if entry is not None and _is_fresh(entry["value"]):
+        _count("hits")
+        return entry["value"]
+    return _inflight.do(url, _load_feed, url, timeout)
+
+
+def fetch_feeds(sources: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Get all feeds concurrently (through the cache).
+
+    sources maps a source name to {"url": ..., "timeout": optional seconds}. Returns a dict
+    with the same keys holding either the feed record or the exception raised for that source,
+    so one slow or broken feed never fails the others.
+    """
+    futures = {}
+    for source_name, source_info in sources.items():
+        timeout = source_info.get("timeout", FEED_FETCH_TIMEOUT)
+        futures[source_name] = (feed_executor.submit(get_feed, source_info["url"], timeout), timeout)
+
+    feeds = {}
+    started = time.monotonic()
+    for source_name, (future, timeout) in futures.items():
+        # Politeness delays can push a start back a little, so allow one extra interval of slack
+        remaining = max(0.0, started + timeout + FEED_HOST_MIN_INTERVAL - time.monotonic())
+        try:
+            feeds[source_name] = future.result(timeout=remaining)
+        except FutureTimeoutError:
+            feeds[source_name] = TimeoutError(f"Timed out after {timeout}s")
+        except Exception as e:
+            feeds[source_name] = e
+    return feeds
+
+
+def get_feed_cache_stats() -> Dict[str, Any]:
+    with _stats_lock:
+        stats = dict(_stats)
+    lookups = stats["hits"] + stats["redis_hits"] + stats["revalidated"] + stats["misses"] + stats["stale_served"] + stats["errors"]
+    stats["hit_ratio"] = round((stats["hits"] + stats["redis_hits"]) / lookups, 4) if lookups else 0.0
+    stats["coalesced"] = _inflight.coalesced
+    now = time.time()
+    feeds = {}
+    for url in _memory_cache.keys():
+        entry = _memory_cache.get_entry(url)
+        if entry is not None:
+            record = entry["value"]
+            feeds[url] = {
+                "age_seconds": round(now - record["fetched_at"], 1),
+                "since_validated_seconds": round(now - record["validated_at"], 1),
+                "entries": len(record["entries"]),
+            }
+    stats["feeds"] = feeds
+    return stats
@@ -0,0 +1,52 @@
+import os
+from typing import Dict, Any, List, Optional
+
+import requests
+
+from services.feed_parser import parse_feed
+from services.rate_limiter import HostRateLimiter
+
+# Feed fetching configuration
+FEED_FETCH_TIMEOUT = float(os.getenv("FEED_FETCH_TIMEOUT", "10"))
+FEED_HOST_MAX_CONCURRENT = int(os.getenv("FEED_HOST_MAX_CONCURRENT", "2"))
+FEED_HOST_MIN_INTERVAL = float(os.getenv("FEED_HOST_MIN_INTERVAL", "0.5"))
+# Only the first entries of a feed are ever used by the news nodes
+FEED_MAX_ENTRIES = int(os.getenv("FEED_MAX_ENTRIES", "30"))
+FEED_USER_AGENT = "Mozilla/5.0 (compatible; Flowly/1.0; +feedparser)"
+
+feed_host_limiter = HostRateLimiter(FEED_HOST_MAX_CONCURRENT, FEED_HOST_MIN_INTERVAL)
+
+
+def download_feed(url: str, timeout: float = FEED_FETCH_TIMEOUT, etag: Optional[str] = None, modified: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Download a single feed, respecting the per-host politeness limits. When etag/modified are
+    given the request is conditional and an unchanged feed comes back as status 304 with no content.
+    """
+    headers = {"User-Agent": FEED_USER_AGENT}
+    if etag:
+        headers["If-None-Match"] = etag
+    if modified:
+        headers["If-Modified-Since"] = modified
+    with feed_host_limiter.limit(url):
+        response = requests.get(url, timeout=timeout, headers=headers)
+    if response.status_code == 304:
+        return {
+            "status": 304,
+            "content": None,
+            "etag": response.headers.get("ETag", etag),
+            "modified": response.headers.get("Last-Modified", modified),
+        }
+    response.raise_for_status()
+    return {
+        "status": response.status_code,
+        "content": response.content,
+        "etag": response.headers.get("ETag"),
+        "modified": response.headers.get("Last-Modified"),
+    }
+
+
+def parse_feed_entries(content: bytes, limit: int = FEED_MAX_ENTRIES) -> List[Dict[str, str]]:
+    """
+    Parse feed bytes and keep only the fields the news nodes use, stopping after `limit` entries.
+    """
+    return parse_feed(content, limit)
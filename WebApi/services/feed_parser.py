@@ -0,0 +1,140 @@
+import email.utils
+import re
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+from xml.etree.ElementTree import XMLPullParser, ParseError
+
+import feedparser
+
+# Precompiled once; used for every entry of every feed
+WHITESPACE = re.compile(r"\s+")
+NAMESPACE = re.compile(r"^\{[^}]*\}")
+
+DATE_FORMATS = ["%Y-%m-%d %H:%M:%S", "%Y-%m-%dT%H:%M:%S", "%Y-%m-%d"]
+ENTRY_TAGS = ("item", "entry")
+TITLE_TAGS = ("title",)
+SUMMARY_TAGS = ("description", "summary")
+CONTENT_TAGS = ("encoded", "content")  # content:encoded (RSS), content (Atom)
+PUBLISHED_TAGS = ("pubDate", "published", "date", "issued")
+UPDATED_TAGS = ("updated", "modified")
+FEED_CHUNK_SIZE = 16 * 1024
+
+
+def clean_text(text: Optional[str]) -> str:
+    """Collapse runs of whitespace into single spaces."""
+    return WHITESPACE.sub(" ", text).strip() if text else ""
+
+
+def parse_date(date_string: Optional[str]) -> Optional[datetime]:
+    """Parse the date formats found in RSS/Atom feeds; naive dates are assumed to be UTC."""
+    if not date_string:
+        return None
+    try:
+        # RFC 2822 (most common in RSS)
+        return email.utils.parsedate_to_datetime(date_string)
+    except (TypeError, ValueError):
+        pass
+    try:
+        # ISO 8601 (Atom)
+        parsed_date = datetime.fromisoformat(date_string.replace("Z", "+00:00"))
+        return parsed_date if parsed_date.tzinfo else parsed_date.replace(tzinfo=timezone.utc)
+    except ValueError:
+        pass
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(date_string, fmt).replace(tzinfo=timezone.utc)
+        except ValueError:
+            continue
+    return None
+
+
+def is_recent_article(pub_date: Optional[datetime], threshold_date: datetime) -> bool:
+    """Articles without a date count as recent; naive datetimes are treated as UTC."""
+    if not pub_date:
+        return True
+    if threshold_date.tzinfo is None:
+        threshold_date = threshold_date.replace(tzinfo=timezone.utc)
+    if pub_date.tzinfo is None:
+        pub_date = pub_date.replace(tzinfo=timezone.utc)
+    return pub_date >= threshold_date
+
+
+def _local_name(tag: str) -> str:
+    return NAMESPACE.sub("", tag)
+
+
+def _entry_from_element(element) -> Dict[str, str]:
+    fields = {}
+    link = ""
+    for child in element:
+        name = _local_name(child.tag)
+        text = (child.text or "").strip()
+        if name == "link":
+            # RSS: <link>url</link>; Atom: <link rel="alternate" href="url"/>
+            href = child.get("href")
+            if href is None:
+                link = link or text
+            elif child.get("rel", "alternate") == "alternate" and not link:
+                link = href
+        elif name not in fields and text:
+            fields[name] = text
+    return {
+        "title": _first(fields, TITLE_TAGS),
+        "summary": _first(fields, SUMMARY_TAGS) or _first(fields, CONTENT_TAGS),
+        "link": link,
+        "published": _first(fields, PUBLISHED_TAGS) or _first(fields, UPDATED_TAGS),
+    }
+
+
+def _first(fields: Dict[str, str], names) -> str:
+    for name in names:
+        if fields.get(name):
+            return fields[name]
+    return ""
+
+
+def stream_feed_entries(content: bytes, limit: int) -> List[Dict[str, str]]:
+    """
+    Incrementally parse RSS/Atom bytes and stop as soon as `limit` entries are read.
+    Raises ParseError (from ElementTree) on malformed XML.
+    """
+    parser = XMLPullParser(events=("end",))
+    entries = []
+    for offset in range(0, len(content), FEED_CHUNK_SIZE):
+        parser.feed(content[offset:offset + FEED_CHUNK_SIZE])
+        for _, element in parser.read_events():
+            if _local_name(element.tag) not in ENTRY_TAGS:
+                continue
+            entries.append(_entry_from_element(element))
+            if len(entries) >= limit:
+                return entries
+            element.clear()
+    parser.close()
+    return entries
+
+
+def parse_feed_with_feedparser(content: bytes, limit: int) -> List[Dict[str, str]]:
+    feed = feedparser.parse(content)
+    return [
+        {
+            "title": entry.get("title", ""),
+            "summary": entry.get("summary", ""),
+            "link": entry.get("link", ""),
+            "published": entry.get("published", ""),
+        }
+        for entry in feed.entries[:limit]
+    ]
+
+
+def parse_feed(content: bytes, limit: int) -> List[Dict[str, str]]:
+    """
+    Parse the first `limit` entries of a feed with the streaming parser, falling back to
+    feedparser for malformed feeds (or anything the streaming parser finds no entries in).
+    """
+    try:
+        entries = stream_feed_entries(content or b"", limit)
+        if entries or not content:
+            return entries
+    except ParseError as e:
+        print(f"⚠️ Streaming feed parse failed, falling back to feedparser: {e}")
+    return parse_feed_with_feedparser(content, limit)
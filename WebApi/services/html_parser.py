@@ -0,0 +1,98 @@
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from bs4 import BeautifulSoup
+
+# Parser backend: "auto" picks lxml when it is installed, otherwise the pure-Python "html.parser"
+HTML_PARSER_BACKEND = os.getenv("HTML_PARSER_BACKEND", "auto")
+
+# Documents larger than this (in chars) are parsed in the process pool so they don't hold the GIL
+HTML_PROCESS_POOL_THRESHOLD = int(os.getenv("HTML_PROCESS_POOL_THRESHOLD", "500000"))
+HTML_PROCESS_POOL_SIZE = int(os.getenv("HTML_PROCESS_POOL_SIZE", "2"))
+# Never "fork": the request worker runs several thread pools and Redis pools, and forking a
+# multi-threaded process can deadlock the child on a lock held by another thread
+HTML_PROCESS_START_METHOD = os.getenv("HTML_PROCESS_START_METHOD", "forkserver")
+
+
+def _resolve_backend(backend: str) -> str:
+    if backend != "auto":
+        return backend
+    try:
+        import lxml  # noqa: F401
+        return "lxml"
+    except ImportError:
+        return "html.parser"
+
+
+PARSER_BACKEND = _resolve_backend(HTML_PARSER_BACKEND)
+
+_pool = None
+_pool_lock = threading.Lock()
+_stats_lock = threading.Lock()
+_stats = {"inline": 0, "offloaded": 0, "offload_failures": 0}
+
+
+def parse_html(html: str) -> BeautifulSoup:
+    """Parse a document with the configured backend."""
+    return BeautifulSoup(html or "", PARSER_BACKEND)
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(
+                max_workers=HTML_PROCESS_POOL_SIZE,
+                mp_context=multiprocessing.get_context(HTML_PROCESS_START_METHOD),
+            )
+        return _pool
+
+
+def _count(name: str):
+    with _stats_lock:
+        _stats[name] += 1
+
+
+def run_parse_task(fn, html: str, *args):
+    """
+    Run fn(html, *args) - a module-level function that parses the document and returns plain
+    (picklable) data - inline for small documents and in the process pool for large ones.
+    Falls back to running inline if the pool is unavailable.
+    """
+    if HTML_PROCESS_POOL_SIZE <= 0 or len(html or "") <= HTML_PROCESS_POOL_THRESHOLD:
+        _count("inline")
+        return fn(html, *args)
+    try:
+        result = _get_pool().submit(fn, html, *args).result()
+        _count("offloaded")
+        return result
+    except BrokenProcessPool as e:
+        print(f"⚠️ HTML process pool unavailable, parsing inline: {e}")
+        _reset_pool()
+        _count("offload_failures")
+        return fn(html, *args)
+
+
+def _reset_pool():
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def shutdown_html_process_pool():
+    _reset_pool()
+
+
+def get_html_parser_stats() -> dict:
+    with _stats_lock:
+        return {
+            "backend": PARSER_BACKEND,
+            "process_pool_threshold": HTML_PROCESS_POOL_THRESHOLD,
+            "process_pool_size": HTML_PROCESS_POOL_SIZE,
+            "process_start_method": HTML_PROCESS_START_METHOD,
+            **_stats,
+        }
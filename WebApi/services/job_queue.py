@@ -0,0 +1,158 @@
+import json
+import os
+import time
+import uuid
+from typing import Any, Dict, List, Optional
+
+import redis.exceptions
+
+from redis_client import get_redis_client, get_redis_binary_client
+from services.storage_codec import encode_value, decode_value
+
+# Background workflow runs: a Redis stream read by a consumer group of worker processes
+JOB_STREAM = os.getenv("JOB_STREAM", "workflow_runs")
+JOB_GROUP = os.getenv("JOB_GROUP", "workflow_workers")
+JOB_STREAM_MAXLEN = int(os.getenv("JOB_STREAM_MAXLEN", "10000"))
+JOB_RESULT_TTL = int(os.getenv("JOB_RESULT_TTL", "86400"))
+# A job a crashed worker left unacknowledged this long is claimed by another worker
+JOB_CLAIM_IDLE_MS = int(os.getenv("JOB_CLAIM_IDLE_MS", "600000"))
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+
+RUN_QUEUED = "queued"
+RUN_RUNNING = "running"
+RUN_COMPLETED = "completed"
+RUN_FAILED = "failed"
+
+
+def _run_key(run_id: str) -> str:
+    return f"job_run:{run_id}"
+
+
+def _result_key(run_id: str) -> str:
+    return f"job_result:{run_id}"
+
+
+async def ensure_job_group(client):
+    """Create the stream and consumer group if they don't exist yet."""
+    try:
+        await client.xgroup_create(JOB_STREAM, JOB_GROUP, id="0", mkstream=True)
+    except redis.exceptions.ResponseError as e:
+        if "BUSYGROUP" not in str(e):
+            raise
+
+
+async def enqueue_run(user_id: str, payload: Dict[str, Any]) -> str:
+    """
+    Queue a workflow run (the /run-graph payload) for the worker processes and return its
+    run_id. The status record is written in the same transaction as the stream entry.
+    """
+    client = await get_redis_client()
+    run_id = str(uuid.uuid4())
+    status = {
+        "run_id": run_id,
+        "user_id": user_id or "",
+        "status": RUN_QUEUED,
+        "attempts": 0,
+        "created_at": time.time(),
+    }
+    async with client.pipeline(transaction=True) as pipe:
+        pipe.hset(_run_key(run_id), mapping=status)
+        pipe.expire(_run_key(run_id), JOB_RESULT_TTL)
+        pipe.xadd(JOB_STREAM, {"run_id": run_id, "user_id": user_id or "", "payload": json.dumps(payload)}, maxlen=JOB_STREAM_MAXLEN, approximate=True)
+        await pipe.execute()
+    return run_id
+
+
+async def get_run_status(run_id: str) -> Optional[Dict[str, Any]]:
+    """
+    Status record of a run ({"run_id", "user_id", "status", "attempts", "created_at",
+    "started_at", "finished_at", "error"}), or None if unknown or expired.
+    """
+    client = await get_redis_client()
+    status = await client.hgetall(_run_key(run_id))
+    if not status:
+        return None
+    status["attempts"] = int(status.get("attempts", 0))
+    for field in ("created_at", "started_at", "finished_at"):
+        if field in status:
+            status[field] = float(status[field])
+    return status
+
+
+async def get_run_result(run_id: str) -> Optional[Dict[str, Any]]:
+    """Result of a completed run (as returned by execute_graph_flow_async), or None."""
+    client = await get_redis_binary_client()
+    return decode_value(await client.get(_result_key(run_id)))
+
+
+async def mark_run_started(run_id: str) -> int:
+    """Mark a run as running and return its attempt number."""
+    client = await get_redis_client()
+    async with client.pipeline(transaction=True) as pipe:
+        pipe.hincrby(_run_key(run_id), "attempts", 1)
+        pipe.hset(_run_key(run_id), mapping={"status": RUN_RUNNING, "started_at": time.time()})
+        attempts, _ = await pipe.execute()
+    return attempts
+
+
+async def complete_run(run_id: str, message_id: str, result: Dict[str, Any]):
+    """Store the result, mark the run completed and acknowledge its stream entry."""
+    client = await get_redis_client()
+    async with client.pipeline(transaction=True) as pipe:
+        pipe.set(_result_key(run_id), encode_value(result), ex=JOB_RESULT_TTL)
+        pipe.hset(_run_key(run_id), mapping={"status": RUN_COMPLETED, "finished_at": time.time()})
+        pipe.expire(_run_key(run_id), JOB_RESULT_TTL)
+        pipe.xack(JOB_STREAM, JOB_GROUP, message_id)
+        await pipe.execute()
+
+
+async def fail_run(run_id: str, message_id: str, error: str):
+    """Mark the run failed and acknowledge its stream entry so it is not retried."""
+    client = await get_redis_client()
+    async with client.pipeline(transaction=True) as pipe:
+        pipe.hset(_run_key(run_id), mapping={"status": RUN_FAILED, "error": error, "finished_at": time.time()})
+        pipe.expire(_run_key(run_id), JOB_RESULT_TTL)
+        pipe.xack(JOB_STREAM, JOB_GROUP, message_id)
+        await pipe.execute()
+
+
+async def read_jobs(consumer: str, count: int, block_ms: int) -> List[tuple]:
+    """
+    Read up to count new jobs for this consumer, blocking up to block_ms. Returns
+    [(message_id, {"run_id", "user_id", "payload"})].
+    """
+    client = await get_redis_client()
+    response = await client.xreadgroup(JOB_GROUP, consumer, {JOB_STREAM: ">"}, count=count, block=block_ms)
+    return [entry for _, entries in response or [] for entry in entries]
+
+
+async def claim_stale_jobs(consumer: str, count: int) -> List[tuple]:
+    """
+    Take over jobs another worker read but never acknowledged within JOB_CLAIM_IDLE_MS
+    (e.g. it crashed mid-run). Same shape as read_jobs.
+    """
+    client = await get_redis_client()
+    response = await client.xautoclaim(JOB_STREAM, JOB_GROUP, consumer, JOB_CLAIM_IDLE_MS, start_id="0-0", count=count)
+    # XAUTOCLAIM returns [next_start_id, entries, (deleted ids on Redis 7+)]; deleted entries come back as None
+    return [entry for entry in response[1] if entry and entry[1]]
+
+
+async def get_job_queue_stats() -> Dict[str, Any]:
+    empty = {"stream_length": 0, "pending": 0, "consumers": 0}
+    try:
+        client = await get_redis_client()
+        groups = await client.xinfo_groups(JOB_STREAM)
+        stream_length = await client.xlen(JOB_STREAM)
+    except redis.exceptions.ResponseError:
+        # Nothing was queued yet: no stream
+        return empty
+    except (redis.exceptions.ConnectionError, redis.exceptions.TimeoutError) as e:
+        print(f"⚠️ Job queue stats unavailable: {e}")
+        return {**empty, "error": "redis unavailable"}
+    group = next((group for group in groups if group["name"] == JOB_GROUP), {})
+    return {
+        "stream_length": stream_length,
+        "pending": group.get("pending", 0),
+        "consumers": group.get("consumers", 0),
+        "lag": group.get("lag"),
+    }
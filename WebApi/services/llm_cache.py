@@ -0,0 +1,111 @@
+import json
+import os
+import threading
+from typing import Any, Dict, Optional
+
+import xxhash
+import zstandard
+
+from redis_client import get_sync_redis_binary_client
+from services.llm_gateway import chat_completion, stream_chat_completion
+from services.node_metrics import record_node_metric
+
+# LLM response cache configuration (opt-in)
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "false").lower() in ("1", "true", "yes")
+LLM_CACHE_TTL = int(os.getenv("LLM_CACHE_TTL", "86400"))
+# Comma-separated node names that never use the cache, e.g. "template_generator"
+LLM_CACHE_DISABLED_NODES = {
+    name.strip() for name in os.getenv("LLM_CACHE_DISABLED_NODES", "").split(",") if name.strip()
+}
+LLM_CACHE_ZSTD_LEVEL = int(os.getenv("LLM_CACHE_ZSTD_LEVEL", "3"))
+
+_stats_lock = threading.Lock()
+_stats = {"hits": 0, "misses": 0, "bypassed": 0, "errors": 0}
+_node_stats = {}
+
+
+def _count(stat: str, node_name: Optional[str]):
+    with _stats_lock:
+        _stats[stat] += 1
+        node_stats = _node_stats.setdefault(node_name or "unknown", {"hits": 0, "misses": 0, "bypassed": 0, "errors": 0})
+        node_stats[stat] += 1
+
+
+def is_llm_cache_enabled(node_name: Optional[str] = None) -> bool:
+    return LLM_CACHE_ENABLED and node_name not in LLM_CACHE_DISABLED_NODES
+
+
+def llm_cache_key(model: str, messages: list) -> str:
+    """
+    Content address of a chat completion: hash of the model and the full prompt
+    (system prompt and user content).
+    """
+    digest = xxhash.xxh3_128()
+    digest.update(model.encode())
+    digest.update(b"\0")
+    digest.update(json.dumps(messages, sort_keys=True, ensure_ascii=False).encode())
+    return f"llm_cache:{digest.hexdigest()}"
+
+
+def _get_cached(key: str) -> Optional[str]:
+    data = get_sync_redis_binary_client().get(key)
+    if data is None:
+        return None
+    return zstandard.decompress(data).decode("utf-8")
+
+
+def _set_cached(key: str, content: str):
+    get_sync_redis_binary_client().set(key, zstandard.compress(content.encode("utf-8"), LLM_CACHE_ZSTD_LEVEL), ex=LLM_CACHE_TTL)
+
+
+def cached_chat_completion(api_key: str, user_id: Optional[str] = None, node_name: Optional[str] = None, no_cache: bool = False, on_delta=None, **kwargs) -> str:
+    """
+    Chat completion through the gateway, returning the message content. When the cache is
+    enabled for node_name and the request did not set no_cache, identical prompts are
+    answered from Redis instead of calling the model again. With on_delta the completion is
+    streamed and on_delta(text) receives the tokens (a cached answer arrives as one delta).
+    """
+    use_cache = is_llm_cache_enabled(node_name) and not no_cache
+    key = None
+    if use_cache:
+        key = llm_cache_key(kwargs.get("model", ""), kwargs.get("messages", []))
+        try:
+            cached = _get_cached(key)
+        except Exception as e:
+            print(f"❌ Error reading LLM cache: {e}")
+            _count("errors", node_name)
+            cached = None
+        if cached is not None:
+            _count("hits", node_name)
+            record_node_metric("llm_cache", "hit")
+            if on_delta is not None:
+                on_delta(cached)
+            return cached
+        _count("misses", node_name)
+        record_node_metric("llm_cache", "miss")
+    else:
+        _count("bypassed", node_name)
+
+    if on_delta is not None:
+        content = stream_chat_completion(api_key, on_delta, user_id=user_id, **kwargs)
+    else:
+        response = chat_completion(api_key, user_id=user_id, **kwargs)
+        content = response.choices[0].message.content
+    if use_cache and content:
+        try:
+            _set_cached(key, content)
+        except Exception as e:
+            print(f"❌ Error writing LLM cache: {e}")
+            _count("errors", node_name)
+    return content
+
+
+def get_llm_cache_stats() -> Dict[str, Any]:
+    with _stats_lock:
+        stats = dict(_stats)
+        stats["nodes"] = {name: dict(node_stats) for name, node_stats in _node_stats.items()}
+    lookups = stats["hits"] + stats["misses"]
+    stats["enabled"] = LLM_CACHE_ENABLED
+    stats["disabled_nodes"] = sorted(LLM_CACHE_DISABLED_NODES)
+    stats["hit_ratio"] = round(stats["hits"] / lookups, 4) if lookups else 0.0
+    return stats
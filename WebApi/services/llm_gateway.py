@@ -0,0 +1,224 @@
+import asyncio
+import hashlib
+import os
+import random
+import threading
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any, Dict, Optional
+
+from openai import AsyncOpenAI, OpenAI, RateLimitError
+
+# LLM gateway configuration
+LLM_BASE_URL = os.getenv("LLM_BASE_URL") or None  # e.g. a local OpenAI-compatible server for testing
+LLM_CLIENT_CACHE_SIZE = int(os.getenv("LLM_CLIENT_CACHE_SIZE", "256"))
+LLM_GLOBAL_CONCURRENCY = int(os.getenv("LLM_GLOBAL_CONCURRENCY", "32"))
+LLM_USER_CONCURRENCY = int(os.getenv("LLM_USER_CONCURRENCY", "4"))
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "4"))
+LLM_RETRY_BASE_DELAY = float(os.getenv("LLM_RETRY_BASE_DELAY", "1.0"))
+LLM_RETRY_MAX_DELAY = float(os.getenv("LLM_RETRY_MAX_DELAY", "30"))
+
+_clients_lock = threading.Lock()
+_sync_clients = OrderedDict()
+_async_clients = OrderedDict()
+
+_global_semaphore = threading.BoundedSemaphore(LLM_GLOBAL_CONCURRENCY)
+# user_id -> [semaphore, callers holding or waiting for it]; dropped when the count reaches 0
+_user_semaphores = {}
+_async_global_semaphore: Optional[asyncio.Semaphore] = None
+_async_user_semaphores = {}
+
+_stats_lock = threading.Lock()
+_stats = {
+    "requests": 0,
+    "in_flight": 0,
+    "retries": 0,
+    "rate_limited": 0,
+    "client_cache_hits": 0,
+    "client_cache_misses": 0,
+}
+
+
+def _count(stat: str, delta: int = 1):
+    with _stats_lock:
+        _stats[stat] += delta
+
+
+def _client_key(api_key: str) -> str:
+    # Clients are looked up by a digest so the cache keys are not the raw API keys
+    return hashlib.sha256(api_key.encode()).hexdigest()
+
+
+def _get_cached_client(clients: OrderedDict, api_key: str, factory):
+    key = _client_key(api_key)
+    with _clients_lock:
+        client = clients.get(key)
+        if client is not None:
+            clients.move_to_end(key)
+            _count("client_cache_hits")
+            return client
+        _count("client_cache_misses")
+        # Retries are handled by the gateway (with backoff on 429), not by the SDK
+        client = clients[key] = factory(api_key=api_key, base_url=LLM_BASE_URL, max_retries=0)
+        while len(clients) > LLM_CLIENT_CACHE_SIZE:
+            # Not closed: another thread may still be using it. Its connection pool is
+            # closed when the last reference goes away.
+            clients.popitem(last=False)
+        return client
+
+
+def get_openai_client(api_key: str) -> OpenAI:
+    """
+    Pooled sync client for api_key (one httpx connection pool per key, LRU-bounded).
+    """
+    return _get_cached_client(_sync_clients, api_key, OpenAI)
+
+
+def get_async_openai_client(api_key: str) -> AsyncOpenAI:
+    """
+    Pooled async client for api_key. Async clients are bound to the app's event loop.
+    """
+    return _get_cached_client(_async_clients, api_key, AsyncOpenAI)
+
+
+def _retry_delay(error: RateLimitError, attempt: int) -> float:
+    retry_after = None
+    try:
+        retry_after = float(error.response.headers.get("retry-after"))
+    except (AttributeError, TypeError, ValueError):
+        pass
+    if retry_after is None:
+        retry_after = LLM_RETRY_BASE_DELAY * (2 ** attempt) * (0.5 + random.random())
+    return min(retry_after, LLM_RETRY_MAX_DELAY)
+
+
+@contextmanager
+def _limits(user_id: Optional[str]):
+    with _clients_lock:
+        entry = _user_semaphores.get(user_id)
+        if entry is None:
+            entry = _user_semaphores[user_id] = [threading.BoundedSemaphore(LLM_USER_CONCURRENCY), 0]
+        entry[1] += 1
+    try:
+        with entry[0], _global_semaphore:
+            _count("in_flight")
+            try:
+                yield
+            finally:
+                _count("in_flight", -1)
+    finally:
+        with _clients_lock:
+            entry[1] -= 1
+            if entry[1] == 0:
+                del _user_semaphores[user_id]
+
+
+@asynccontextmanager
+async def _async_limits(user_id: Optional[str]):
+    global _async_global_semaphore
+    if _async_global_semaphore is None:
+        _async_global_semaphore = asyncio.Semaphore(LLM_GLOBAL_CONCURRENCY)
+    # Only touched from the event loop, so no lock is needed
+    entry = _async_user_semaphores.get(user_id)
+    if entry is None:
+        entry = _async_user_semaphores[user_id] = [asyncio.Semaphore(LLM_USER_CONCURRENCY), 0]
+    entry[1] += 1
+    try:
+        async with entry[0], _async_global_semaphore:
+            _count("in_flight")
+            try:
+                yield
+            finally:
+                _count("in_flight", -1)
+    finally:
+        entry[1] -= 1
+        if entry[1] == 0:
+            del _async_user_semaphores[user_id]
+
+
+def _call(user_id: Optional[str], fn, **kwargs):
+    _count("requests")
+    for attempt in range(LLM_MAX_RETRIES + 1):
+        try:
+            with _limits(user_id):
+                return fn(**kwargs)
+        except RateLimitError as e:
+            _count("rate_limited")
+            if attempt == LLM_MAX_RETRIES:
+                raise
+            _count("retries")
+            # Sleep outside of the concurrency slots so other callers can proceed
+            time.sleep(_retry_delay(e, attempt))
+
+
+async def _acall(user_id: Optional[str], fn, **kwargs):
+    _count("requests")
+    for attempt in range(LLM_MAX_RETRIES + 1):
+        try:
+            async with _async_limits(user_id):
+                return await fn(**kwargs)
+        except RateLimitError as e:
+            _count("rate_limited")
+            if attempt == LLM_MAX_RETRIES:
+                raise
+            _count("retries")
+            await asyncio.sleep(_retry_delay(e, attempt))
+
+
+def chat_completion(api_key: str, user_id: Optional[str] = None, **kwargs):
+    """
+    client.chat.completions.create through the gateway (pooled client, limits, 429 retries).
+    """
+    client = get_openai_client(api_key)
+    return _call(user_id, client.chat.completions.create, **kwargs)
+
+
+def parse_chat_completion(api_key: str, user_id: Optional[str] = None, **kwargs):
+    """
+    client.beta.chat.completions.parse (structured output) through the gateway.
+    """
+    client = get_openai_client(api_key)
+    return _call(user_id, client.beta.chat.completions.parse, **kwargs)
+
+
+def stream_chat_completion(api_key: str, on_delta, user_id: Optional[str] = None, **kwargs) -> str:
+    """
+    Streaming chat completion through the gateway: on_delta(text) is called for every token
+    chunk as it arrives, and the full message content is returned at the end.
+    """
+    client = get_openai_client(api_key)
+
+    def create_and_consume(**create_kwargs):
+        # Consume inside the concurrency slot; a 429 is raised by create(), before any token
+        parts = []
+        for chunk in client.chat.completions.create(stream=True, **create_kwargs):
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta.content
+            if delta:
+                parts.append(delta)
+                on_delta(delta)
+        return "".join(parts)
+
+    return _call(user_id, create_and_consume, **kwargs)
+
+
+async def achat_completion(api_key: str, user_id: Optional[str] = None, **kwargs):
+    """
+    Async client.chat.completions.create through the gateway.
+    """
+    client = get_async_openai_client(api_key)
+    return await _acall(user_id, client.chat.completions.create, **kwargs)
+
+
+def get_llm_gateway_stats() -> Dict[str, Any]:
+    with _stats_lock:
+        stats = dict(_stats)
+    with _clients_lock:
+        stats["sync_clients"] = len(_sync_clients)
+        stats["async_clients"] = len(_async_clients)
+        stats["user_semaphores"] = len(_user_semaphores)
+    stats["global_concurrency"] = LLM_GLOBAL_CONCURRENCY
+    stats["user_concurrency"] = LLM_USER_CONCURRENCY
+    return stats
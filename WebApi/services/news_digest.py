@@ -0,0 +1,153 @@
+import asyncio
+import json
+import os
+import threading
+import time
+import uuid
+from typing import Any, Callable, Dict, Optional
+
+from redis_client import get_sync_redis_client
+from services.cache_utils import SingleFlight
+from services.node_metrics import record_node_metric
+
+# News digest precomputation: one background refresh per interval for all users
+NEWS_DIGEST_ENABLED = os.getenv("NEWS_DIGEST_ENABLED", "true").lower() in ("1", "true", "yes")
+NEWS_DIGEST_REFRESH_INTERVAL = float(os.getenv("NEWS_DIGEST_REFRESH_INTERVAL", "300"))
+# Digests older than this are treated as stale and nodes fetch live instead
+NEWS_DIGEST_MAX_AGE = float(os.getenv("NEWS_DIGEST_MAX_AGE", "900"))
+NEWS_DIGEST_LOCK_TTL = int(os.getenv("NEWS_DIGEST_LOCK_TTL", "120"))
+NEWS_DIGEST_REDIS_TTL = int(os.getenv("NEWS_DIGEST_REDIS_TTL", "86400"))
+
+# Bump when the stored record layout changes so old records are ignored
+DIGEST_FORMAT = 1
+
+# Delete the lock only if this worker still holds it
+RELEASE_LOCK_LUA = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+_builders: Dict[str, Callable[[], str]] = {}
+_inflight = SingleFlight()
+_stats_lock = threading.Lock()
+_stats: Dict[str, Dict[str, Any]] = {}
+
+
+def register_news_digest(name: str, builder: Callable[[], str]):
+    """Register a digest builder (a function returning the formatted digest text)."""
+    _builders[name] = builder
+
+
+def _count(name: str, stat: str):
+    with _stats_lock:
+        stats = _stats.setdefault(name, {"precomputed": 0, "live": 0, "refreshed": 0, "refresh_skipped": 0, "refresh_errors": 0})
+        stats[stat] += 1
+
+
+def _digest_key(name: str) -> str:
+    return f"news_digest:{name}"
+
+
+def _read_digest(name: str) -> Optional[Dict[str, Any]]:
+    try:
+        data = get_sync_redis_client().get(_digest_key(name))
+        record = json.loads(data) if data else None
+    except Exception as e:
+        print(f"❌ Error reading news digest {name} from Redis: {e}")
+        return None
+    if not record or record.get("format") != DIGEST_FORMAT:
+        return None
+    return record
+
+
+def _write_digest(name: str, digest: str) -> Optional[Dict[str, Any]]:
+    try:
+        client = get_sync_redis_client()
+        record = {
+            "format": DIGEST_FORMAT,
+            "version": client.incr(f"{_digest_key(name)}:version"),
+            "generated_at": time.time(),
+            "digest": digest,
+        }
+        client.set(_digest_key(name), json.dumps(record), ex=NEWS_DIGEST_REDIS_TTL)
+        return record
+    except Exception as e:
+        print(f"❌ Error writing news digest {name} to Redis: {e}")
+        return None
+
+
+def refresh_news_digest(name: str, force: bool = False) -> bool:
+    """
+    Rebuild one digest and store it in Redis. A SET NX lock makes sure only one worker
+    rebuilds it per interval; returns False if another worker holds the lock or the stored
+    digest is still recent.
+    """
+    client = get_sync_redis_client()
+    lock_key = f"{_digest_key(name)}:lock"
+    token = uuid.uuid4().hex
+    if not client.set(lock_key, token, nx=True, ex=NEWS_DIGEST_LOCK_TTL):
+        _count(name, "refresh_skipped")
+        return False
+    try:
+        record = _read_digest(name)
+        if not force and record and time.time() - record["generated_at"] < NEWS_DIGEST_REFRESH_INTERVAL / 2:
+            # Another worker refreshed it moments ago
+            _count(name, "refresh_skipped")
+            return False
+        _write_digest(name, _builders[name]())
+        _count(name, "refreshed")
+        return True
+    finally:
+        client.eval(RELEASE_LOCK_LUA, 1, lock_key, token)
+
+
+async def refresh_news_digests_forever():
+    """
+    Background task started from the app lifespan: rebuild every registered digest each
+    NEWS_DIGEST_REFRESH_INTERVAL seconds. Feed downloads run in a worker thread.
+    """
+    if not NEWS_DIGEST_ENABLED:
+        return
+    while True:
+        for name in list(_builders):
+            try:
+                if await asyncio.to_thread(refresh_news_digest, name):
+                    print(f"📰 News digest {name} refreshed")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                _count(name, "refresh_errors")
+                print(f"❌ Error refreshing news digest {name}: {e}")
+        await asyncio.sleep(NEWS_DIGEST_REFRESH_INTERVAL)
+
+
+def _build_live(name: str) -> str:
+    digest = _builders[name]()
+    if NEWS_DIGEST_ENABLED:
+        _write_digest(name, digest)
+    return digest
+
+
+def get_news_digest(name: str) -> str:
+    """
+    Return the precomputed digest when it is fresh enough, otherwise build it live (once per
+    process for concurrent callers) and store the result for the next runs.
+    """
+    record = _read_digest(name) if NEWS_DIGEST_ENABLED else None
+    if record is not None:
+        age = time.time() - record["generated_at"]
+        if age <= NEWS_DIGEST_MAX_AGE:
+            _count(name, "precomputed")
+            record_node_metric("news_digest_age_seconds", round(age, 1))
+            record_node_metric("news_digest_version", record["version"])
+            return record["digest"]
+    _count(name, "live")
+    record_node_metric("news_digest_live", 1)
+    return _inflight.do(name, _build_live, name)
+
+
+def get_news_digest_stats() -> Dict[str, Any]:
+    with _stats_lock:
+        return {name: dict(stats) for name, stats in _stats.items()}
@@ -0,0 +1,36 @@
+import contextvars
+import time
+from contextlib import contextmanager
+
+# Metrics of the node currently running in this context (None outside of a node)
+_current_metrics: contextvars.ContextVar = contextvars.ContextVar("node_metrics", default=None)
+
+
+@contextmanager
+def collect_node_metrics():
+    """
+    Collect metrics for one node run. Yields the dict that record_node_metric() writes to;
+    duration_ms is filled in when the block exits.
+    """
+    metrics = {}
+    token = _current_metrics.set(metrics)
+    started = time.perf_counter()
+    try:
+        yield metrics
+    finally:
+        metrics["duration_ms"] = round((time.perf_counter() - started) * 1000, 2)
+        _current_metrics.reset(token)
+
+
+def record_node_metric(name: str, value):
+    """
+    Attach a metric to the running node's timing output. Numeric values recorded more than
+    once under the same name are summed. No-op when called outside of a node.
+    """
+    metrics = _current_metrics.get()
+    if metrics is None:
+        return
+    if isinstance(value, (int, float)) and isinstance(metrics.get(name), (int, float)):
+        metrics[name] = round(metrics[name] + value, 3)
+    else:
+        metrics[name] = value
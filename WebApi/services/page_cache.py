@@ -0,0 +1,176 @@
+import json
+import os
+import threading
+import time
+from typing import Dict, Any
+
+import xxhash
+import zstandard
+
+from redis_client import get_sync_redis_binary_client
+from services.cache_utils import TTLCache, SingleFlight
+from services.content_extractor import extract_main_content
+from services.page_fetcher import download_page
+
+# URL content cache configuration
+PAGE_CACHE_TTL = float(os.getenv("PAGE_CACHE_TTL", "900"))  # seconds a page is served without revalidation
+PAGE_CACHE_NEGATIVE_TTL = float(os.getenv("PAGE_CACHE_NEGATIVE_TTL", "120"))  # seconds a failed fetch is remembered
+PAGE_CACHE_MAX_PAGES = int(os.getenv("PAGE_CACHE_MAX_PAGES", "256"))
+PAGE_CACHE_REDIS = os.getenv("PAGE_CACHE_REDIS", "false").lower() in ("1", "true", "yes")
+PAGE_CACHE_REDIS_TTL = int(os.getenv("PAGE_CACHE_REDIS_TTL", "86400"))  # kept longer so ETags can be reused
+PAGE_CACHE_ZSTD_LEVEL = int(os.getenv("PAGE_CACHE_ZSTD_LEVEL", "3"))
+
+# Stale entries are kept so their ETag/Last-Modified can be used to revalidate
+_memory_cache = TTLCache(PAGE_CACHE_MAX_PAGES, PAGE_CACHE_TTL, keep_stale=True)
+_inflight = SingleFlight()
+_stats_lock = threading.Lock()
+_stats = {
+    "hits": 0,
+    "redis_hits": 0,
+    "negative_hits": 0,
+    "revalidated": 0,
+    "misses": 0,
+    "stale_served": 0,
+    "errors": 0,
+}
+
+
+class PageFetchError(Exception):
+    """Raised when a page can't be fetched; also raised for failures remembered by the negative cache."""
+
+
+def _count(stat: str):
+    with _stats_lock:
+        _stats[stat] += 1
+
+
+def _redis_key(url: str) -> str:
+    return f"page_cache:{xxhash.xxh64_hexdigest(url)}"
+
+
+def _is_fresh(record: Dict[str, Any]) -> bool:
+    if "error" in record:
+        return time.time() - record["failed_at"] < PAGE_CACHE_NEGATIVE_TTL
+    return time.time() - record["validated_at"] < PAGE_CACHE_TTL
+
+
+def _read_redis(url: str):
+    if not PAGE_CACHE_REDIS:
+        return None
+    try:
+        data = get_sync_redis_binary_client().get(_redis_key(url))
+        return json.loads(zstandard.decompress(data)) if data else None
+    except Exception as e:
+        print(f"❌ Error reading page cache from Redis: {e}")
+        return None
+
+
+def _write_redis(url: str, record: Dict[str, Any], ttl: float):
+    if not PAGE_CACHE_REDIS:
+        return
+    try:
+        data = zstandard.compress(json.dumps(record).encode("utf-8"), PAGE_CACHE_ZSTD_LEVEL)
+        get_sync_redis_binary_client().set(_redis_key(url), data, ex=max(1, int(ttl)))
+    except Exception as e:
+        print(f"❌ Error writing page cache to Redis: {e}")
+
+
+def _store(url: str, record: Dict[str, Any]):
+    ttl = PAGE_CACHE_NEGATIVE_TTL if "error" in record else PAGE_CACHE_REDIS_TTL
+    _memory_cache.set(url, record)
+    _write_redis(url, record, ttl)
+
+
+def _record_time(record: Dict[str, Any]) -> float:
+    return record.get("failed_at") or record["validated_at"]
+
+
+def _checked(record: Dict[str, Any]) -> Dict[str, Any]:
+    if "error" in record:
+        raise PageFetchError(record["error"])
+    return record
+
+
+def _load_page(url: str, polite: bool = False) -> Dict[str, Any]:
+    """
+    Cache miss path (run once per URL even under concurrent misses): try the shared Redis
+    tier, then revalidate or download and extract the page.
+    """
+    entry = _memory_cache.get_entry(url)
+    record = entry["value"] if entry else None
+    redis_record = _read_redis(url)
+    if redis_record and (record is None or _record_time(redis_record) > _record_time(record)):
+        record = redis_record
+        if _is_fresh(record):
+            _memory_cache.set(url, record)
+            _count("negative_hits" if "error" in record else "redis_hits")
+            return _checked(record)
+
+    # Only a good copy can be revalidated or served stale
+    previous = record if record is not None and "error" not in record else None
+    try:
+        page = download_page(
+            url,
+            etag=previous.get("etag") if previous else None,
+            modified=previous.get("modified") if previous else None,
+            polite=polite,
+        )
+    except Exception as e:
+        if previous is not None:
+            # Serve the last good copy rather than nothing when the source is down
+            _count("stale_served")
+            return previous
+        _count("errors")
+        _store(url, {"url": url, "error": str(e) or type(e).__name__, "failed_at": time.time()})
+        raise PageFetchError(str(e) or type(e).__name__) from e
+
+    now = time.time()
+    if page["status"] == 304 and previous is not None:
+        record = {**previous, "etag": page["etag"], "modified": page["modified"], "validated_at": now}
+        _count("revalidated")
+    else:
+        extracted = extract_main_content(page["text"])
+        record = {
+            "url": url,
+            "text": extracted["text"],
+            "method": extracted["method"],
+            "original_chars": extracted["original_chars"],
+            "extracted_chars": extracted["extracted_chars"],
+            "bytes_read": page["bytes_read"],
+            "truncated": page["truncated"],
+            "etag": page["etag"],
+            "modified": page["modified"],
+            "fetched_at": now,
+            "validated_at": now,
+        }
+        _count("misses")
+    _store(url, record)
+    return record
+
+
+def get_page(url: str, polite: bool = False) -> Dict[str, Any]:
+    """
+    Return the main-content record for url ({"text", "method", "original_chars",
+    "extracted_chars", "bytes_read", "truncated", ...}), downloading or revalidating it when
+    it is older than PAGE_CACHE_TTL. Shared by every user and workflow.
+
+    Raises PageFetchError when the page can't be fetched; failures (timeouts, 4xx/5xx,
+    binary content) are remembered for PAGE_CACHE_NEGATIVE_TTL so a dead host isn't retried
+    on every run. polite=True downloads wait for the per-host politeness limits
+    (see download_page); cache hits never wait.
+    """
+    entry = _memory_cache.get_entry(url)
+    if entry is not None and _is_fresh(entry["value"]):
+        _count("negative_hits" if "error" in entry["value"] else "hits")
+        return _checked(entry["value"])
+    return _inflight.do(url, _load_page, url, polite)
+
+
+def get_page_cache_stats() -> Dict[str, Any]:
+    with _stats_lock:
+        stats = dict(_stats)
+    lookups = sum(stats.values())
+    stats["hit_ratio"] = round((stats["hits"] + stats["redis_hits"]) / lookups, 4) if lookups else 0.0
+    stats["coalesced"] = _inflight.coalesced
+    stats["size"] = len(_memory_cache)
+    return stats
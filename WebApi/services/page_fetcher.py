@@ -0,0 +1,131 @@
+import codecs
+import os
+import re
+import time
+from typing import Dict, Any, Optional
+
+import requests
+
+from services.rate_limiter import HostRateLimiter
+
+# Page download limits: memory per fetch stays bounded whatever URL a workflow points at
+PAGE_MAX_BYTES = int(os.getenv("PAGE_MAX_BYTES", str(2 * 1024 * 1024)))
+PAGE_FETCH_TIMEOUT = float(os.getenv("PAGE_FETCH_TIMEOUT", "10"))
+# Total time budget for one download, so slow endless responses can't hold a worker
+PAGE_FETCH_DEADLINE = float(os.getenv("PAGE_FETCH_DEADLINE", "20"))
+PAGE_CHUNK_SIZE = 16 * 1024
+PAGE_USER_AGENT = "Mozilla/5.0 (compatible; Flowly/1.0)"
+# Politeness limits for polite=True downloads (the blog researcher's search-result fan-out)
+PAGE_HOST_MAX_CONCURRENT = int(os.getenv("PAGE_HOST_MAX_CONCURRENT", "2"))
+PAGE_HOST_MIN_INTERVAL = float(os.getenv("PAGE_HOST_MIN_INTERVAL", "0.5"))
+
+page_host_limiter = HostRateLimiter(PAGE_HOST_MAX_CONCURRENT, PAGE_HOST_MIN_INTERVAL)
+
+# Appended by callers to results built from a truncated download
+TRUNCATION_MARKER = "\n\n[... content truncated ...]"
+
+TEXT_CONTENT_TYPES = ("text/", "application/xhtml", "application/xml", "application/json", "application/rss", "application/atom")
+META_CHARSET = re.compile(rb"""<meta[^>]+charset=["']?([\w-]+)""", re.IGNORECASE)
+
+
+class UnsupportedContentError(ValueError):
+    """Raised when a URL serves content that isn't text (images, PDFs, archives, ...)."""
+
+
+def _is_text_content_type(content_type: str) -> bool:
+    return not content_type or content_type.startswith(TEXT_CONTENT_TYPES)
+
+
+def _detect_encoding(content_type_header: str, first_chunk: bytes) -> str:
+    # charset from the Content-Type header, then from a <meta> tag, then UTF-8
+    for param in content_type_header.split(";")[1:]:
+        name, _, value = param.strip().partition("=")
+        if name.lower() == "charset" and value:
+            encoding = value.strip("\"' ")
+            break
+    else:
+        match = META_CHARSET.search(first_chunk[:4096])
+        encoding = match.group(1).decode("ascii", "ignore") if match else "utf-8"
+    try:
+        codecs.lookup(encoding)
+        return encoding
+    except LookupError:
+        return "utf-8"
+
+
+def download_page(url: str, max_bytes: int = PAGE_MAX_BYTES, timeout: float = PAGE_FETCH_TIMEOUT, deadline: float = PAGE_FETCH_DEADLINE,
+                  etag: Optional[str] = None, modified: Optional[str] = None, polite: bool = False) -> Dict[str, Any]:
+    """
+    Stream a page and decode it incrementally, stopping at max_bytes (of decoded body) or
+    after `deadline` seconds. Binary content types are rejected from the headers, before
+    the body is read. With polite=True the request waits for the per-host politeness
+    limits (used when fanning out over search results; a user's own URL is fetched right
+    away). When etag/modified are given the request is conditional and an unchanged page
+    comes back as status 304 with no text.
+
+    Returns {"status", "text", "truncated", "bytes_read", "content_type", "encoding", "etag", "modified"}.
+    """
+    headers = {"User-Agent": PAGE_USER_AGENT}
+    if etag:
+        headers["If-None-Match"] = etag
+    if modified:
+        headers["If-Modified-Since"] = modified
+    if not polite:
+        return _stream_page(url, max_bytes, timeout, deadline, headers)
+    with page_host_limiter.limit(url):
+        return _stream_page(url, max_bytes, timeout, deadline, headers)
+
+
+def _stream_page(url: str, max_bytes: int, timeout: float, deadline: float, headers: Dict[str, str]) -> Dict[str, Any]:
+    started = time.monotonic()
+    with requests.get(url, timeout=timeout, stream=True, headers=headers) as response:
+        if response.status_code == 304:
+            return {
+                "status": 304,
+                "text": None,
+                "etag": response.headers.get("ETag", headers.get("If-None-Match")),
+                "modified": response.headers.get("Last-Modified", headers.get("If-Modified-Since")),
+            }
+        response.raise_for_status()
+        content_type_header = response.headers.get("Content-Type", "")
+        content_type = content_type_header.split(";")[0].strip().lower()
+        if not _is_text_content_type(content_type):
+            raise UnsupportedContentError(f"Unsupported content type: {content_type}")
+
+        decoder, encoding = None, None
+        parts = []
+        bytes_read = 0
+        truncated = False
+        while True:
+            if time.monotonic() - started > deadline:
+                truncated = True
+                break
+            # read1 returns whatever is available, so a slow trickle still reaches the deadline check
+            chunk = response.raw.read1(PAGE_CHUNK_SIZE, decode_content=True)
+            if not chunk:
+                break
+            if decoder is None:
+                if not content_type and b"\x00" in chunk[:1024]:
+                    raise UnsupportedContentError("Unsupported content: binary data")
+                encoding = _detect_encoding(content_type_header, chunk)
+                decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+            if bytes_read + len(chunk) > max_bytes:
+                chunk = chunk[:max_bytes - bytes_read]
+                truncated = True
+            bytes_read += len(chunk)
+            parts.append(decoder.decode(chunk))
+            if truncated:
+                break
+        if decoder is not None:
+            parts.append(decoder.decode(b"", final=not truncated))
+
+    return {
+        "status": response.status_code,
+        "text": "".join(parts),
+        "truncated": truncated,
+        "bytes_read": bytes_read,
+        "content_type": content_type,
+        "encoding": encoding or "utf-8",
+        "etag": response.headers.get("ETag"),
+        "modified": response.headers.get("Last-Modified"),
+    }
@@ -0,0 +1,36 @@
+import threading
+import time
+from contextlib import contextmanager
+from urllib.parse import urlparse
+
+
+class HostRateLimiter:
+    """
+    Per-host politeness limiter: caps concurrent requests to the same host and spaces
+    request starts to that host by at least min_interval seconds. Requests to different
+    hosts never wait on each other.
+    """
+
+    def __init__(self, max_concurrent: int = 2, min_interval: float = 0.5):
+        self.max_concurrent = max_concurrent
+        self.min_interval = min_interval
+        self._lock = threading.Lock()
+        self._semaphores = {}
+        self._next_slot = {}
+
+    @contextmanager
+    def limit(self, url: str):
+        host = urlparse(url).netloc.lower()
+        with self._lock:
+            semaphore = self._semaphores.get(host)
+            if semaphore is None:
+                semaphore = self._semaphores[host] = threading.BoundedSemaphore(self.max_concurrent)
+            # Reserve the next start slot for this host, then wait for it outside the lock
+            now = time.monotonic()
+            slot = max(now, self._next_slot.get(host, 0.0))
+            self._next_slot[host] = slot + self.min_interval
+        delay = slot - now
+        if delay > 0:
+            time.sleep(delay)
+        with semaphore:
+            yield
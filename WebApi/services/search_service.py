@@ -0,0 +1,288 @@
+import json
+import os
+import re
+import threading
+import time
+from typing import Any, Dict, List, Optional
+from urllib.parse import urlparse, parse_qs
+
+import requests
+from bs4 import Tag
+
+from redis_client import get_sync_redis_client
+from services.cache_utils import TTLCache, SingleFlight
+from services.html_parser import parse_html, run_parse_task
+
+# Search service configuration
+SEARCH_BACKEND = os.getenv("SEARCH_BACKEND", "ddg_html")
+SEARCH_CACHE_TTL = float(os.getenv("SEARCH_CACHE_TTL", "3600"))
+# Empty result lists are often a throttled backend, so they are kept briefly and only in memory
+SEARCH_CACHE_EMPTY_TTL = float(os.getenv("SEARCH_CACHE_EMPTY_TTL", "60"))
+SEARCH_CACHE_MAX_QUERIES = int(os.getenv("SEARCH_CACHE_MAX_QUERIES", "1024"))
+SEARCH_CACHE_REDIS = os.getenv("SEARCH_CACHE_REDIS", "false").lower() in ("1", "true", "yes")
+SEARCH_MAX_RESULTS = int(os.getenv("SEARCH_MAX_RESULTS", "10"))
+# Token bucket shared by all workers through Redis: SEARCH_RATE_PER_SEC refill, SEARCH_RATE_BURST capacity
+SEARCH_RATE_PER_SEC = float(os.getenv("SEARCH_RATE_PER_SEC", "1"))
+SEARCH_RATE_BURST = int(os.getenv("SEARCH_RATE_BURST", "3"))
+SEARCH_RATE_MAX_WAIT = float(os.getenv("SEARCH_RATE_MAX_WAIT", "15"))
+SEARCH_TIMEOUT = float(os.getenv("SEARCH_TIMEOUT", "10"))
+
+WHITESPACE = re.compile(r"\s+")
+
+# KEYS[1] = bucket key; ARGV = rate per second, burst. Returns 0 when a token was taken,
+# otherwise the milliseconds to wait before one is available.
+TOKEN_BUCKET_LUA = """
+local now = redis.call('TIME')
+local now_ms = tonumber(now[1]) * 1000 + math.floor(tonumber(now[2]) / 1000)
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or burst
+local ts = tonumber(state[2]) or now_ms
+tokens = math.min(burst, tokens + (now_ms - ts) * rate / 1000)
+local wait = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+else
+    wait = math.ceil((1 - tokens) * 1000 / rate)
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now_ms)
+redis.call('PEXPIRE', KEYS[1], math.ceil(burst * 1000 / rate) + 1000)
+return wait
+"""
+
+
+class SearchRateLimitError(Exception):
+    """Raised when no search token became available within SEARCH_RATE_MAX_WAIT."""
+
+
+class DuckDuckGoHtmlBackend:
+    """Scrapes the DuckDuckGo HTML endpoint; returns links and snippets."""
+
+    name = "ddg_html"
+    url = "https://html.duckduckgo.com/html/"
+
+    def search(self, query: str, limit: int) -> List[Dict[str, str]]:
+        response = requests.post(self.url, data={"q": query}, headers={"User-Agent": "Mozilla/5.0"}, timeout=SEARCH_TIMEOUT)
+        # Throttling/anomaly pages come back as 202 and similar, not as errors
+        if response.status_code != 200:
+            raise requests.HTTPError(f"DuckDuckGo returned status {response.status_code}", response=response)
+        results = []
+        for result in run_parse_task(extract_duckduckgo_results, response.text):
+            link = unwrap_duckduckgo_link(result["link"])
+            if link.startswith("http") and all(existing["link"] != link for existing in results):
+                results.append({**result, "link": link})
+        return results[:limit]
+
+
+class DuckDuckGoApiBackend:
+    """langchain's DuckDuckGo API wrapper (needs the duckduckgo-search package)."""
+
+    name = "ddg_api"
+
+    def __init__(self):
+        self._wrapper = None
+        self._lock = threading.Lock()
+
+    def search(self, query: str, limit: int) -> List[Dict[str, str]]:
+        with self._lock:
+            if self._wrapper is None:
+                # Built once instead of per call
+                from langchain_community.utilities import DuckDuckGoSearchAPIWrapper
+                self._wrapper = DuckDuckGoSearchAPIWrapper()
+        return [
+            {"title": result.get("title", ""), "link": result.get("link", ""), "snippet": result.get("snippet", "")}
+            for result in self._wrapper.results(query, max_results=limit)
+        ]
+
+
+def unwrap_duckduckgo_link(href: str) -> str:
+    # Result links can be DuckDuckGo redirects (//duckduckgo.com/l/?uddg=<target>)
+    if href.startswith("//"):
+        href = "https:" + href
+    parsed = urlparse(href)
+    if parsed.netloc.endswith("duckduckgo.com") and parsed.path.startswith("/l/"):
+        target = parse_qs(parsed.query).get("uddg")
+        if target:
+            return target[0]
+    return href
+
+
+def extract_duckduckgo_results(html: str) -> List[Dict[str, str]]:
+    soup = parse_html(html)
+    results = []
+    for block in soup.find_all(class_="result"):
+        link = block.find("a", class_="result__a")
+        if not isinstance(link, Tag) or not link.get("href"):
+            continue
+        snippet = block.find(class_="result__snippet")
+        results.append({
+            "title": link.get_text(" ", strip=True),
+            "link": link.get("href"),
+            "snippet": snippet.get_text(" ", strip=True) if snippet else "",
+        })
+    return results
+
+
+_backends = {
+    "ddg_html": DuckDuckGoHtmlBackend(),
+    "ddg_api": DuckDuckGoApiBackend(),
+}
+
+
+def register_search_backend(name: str, backend):
+    """Add or replace a backend: any object with search(query, limit) -> [{"title", "link", "snippet"}]."""
+    _backends[name] = backend
+
+
+def _get_backend(name: Optional[str]):
+    name = name or SEARCH_BACKEND
+    if name not in _backends:
+        raise ValueError(f"Unknown search backend: {name}")
+    return name, _backends[name]
+
+
+class LocalTokenBucket:
+    """In-process token bucket, used when Redis is unavailable."""
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self._lock = threading.Lock()
+        self._buckets = {}
+
+    def take(self, key: str) -> float:
+        with self._lock:
+            now = time.monotonic()
+            tokens, ts = self._buckets.get(key, (self.burst, now))
+            tokens = min(self.burst, tokens + (now - ts) * self.rate)
+            wait = 0.0
+            if tokens >= 1:
+                tokens -= 1
+            else:
+                wait = (1 - tokens) / self.rate
+            self._buckets[key] = (tokens, now)
+            return wait
+
+
+_local_bucket = LocalTokenBucket(SEARCH_RATE_PER_SEC, SEARCH_RATE_BURST)
+_token_bucket_script = None
+_memory_cache = TTLCache(SEARCH_CACHE_MAX_QUERIES, SEARCH_CACHE_TTL)
+_inflight = SingleFlight()
+_stats_lock = threading.Lock()
+_stats = {"hits": 0, "redis_hits": 0, "misses": 0, "empty": 0, "errors": 0, "throttled": 0, "throttle_wait_seconds": 0.0}
+
+
+def _count(stat: str, amount=1):
+    with _stats_lock:
+        _stats[stat] = round(_stats[stat] + amount, 3)
+
+
+def _take_token(backend_name: str) -> float:
+    """Try to take a search token; returns 0 on success or the seconds to wait."""
+    global _token_bucket_script
+    try:
+        client = get_sync_redis_client()
+        if _token_bucket_script is None:
+            _token_bucket_script = client.register_script(TOKEN_BUCKET_LUA)
+        wait_ms = _token_bucket_script(keys=[f"search_rate:{backend_name}"], args=[SEARCH_RATE_PER_SEC, SEARCH_RATE_BURST], client=client)
+        return int(wait_ms) / 1000
+    except Exception as e:
+        print(f"⚠️ Search rate limiter falling back to local bucket: {e}")
+        return _local_bucket.take(backend_name)
+
+
+def _acquire_token(backend_name: str):
+    waited = 0.0
+    while True:
+        wait = _take_token(backend_name)
+        if wait <= 0:
+            break
+        if waited + wait > SEARCH_RATE_MAX_WAIT:
+            raise SearchRateLimitError(f"Search rate limit: no token within {SEARCH_RATE_MAX_WAIT}s")
+        time.sleep(wait)
+        waited += wait
+    if waited:
+        _count("throttled")
+        _count("throttle_wait_seconds", waited)
+
+
+def normalize_query(query: str) -> str:
+    return WHITESPACE.sub(" ", query or "").strip().lower()
+
+
+def _redis_key(cache_key: str) -> str:
+    return f"search_cache:{cache_key}"
+
+
+def _read_redis(cache_key: str):
+    if not SEARCH_CACHE_REDIS:
+        return None
+    try:
+        data = get_sync_redis_client().get(_redis_key(cache_key))
+        return json.loads(data) if data else None
+    except Exception as e:
+        print(f"❌ Error reading search cache from Redis: {e}")
+        return None
+
+
+def _write_redis(cache_key: str, results: List[Dict[str, str]]):
+    if not SEARCH_CACHE_REDIS:
+        return
+    try:
+        get_sync_redis_client().set(_redis_key(cache_key), json.dumps(results), ex=int(SEARCH_CACHE_TTL))
+    except Exception as e:
+        print(f"❌ Error writing search cache to Redis: {e}")
+
+
+def _load_results(cache_key: str, backend_name: str, backend, query: str) -> List[Dict[str, str]]:
+    results = _read_redis(cache_key)
+    if results is not None:
+        _count("redis_hits")
+    else:
+        _acquire_token(backend_name)
+        try:
+            results = backend.search(query, SEARCH_MAX_RESULTS)
+        except Exception:
+            _count("errors")
+            raise
+        _count("misses")
+        if not results:
+            _count("empty")
+            _memory_cache.set(cache_key, results, ttl=SEARCH_CACHE_EMPTY_TTL)
+            return results
+        _write_redis(cache_key, results)
+    _memory_cache.set(cache_key, results)
+    return results
+
+
+def search(query: str, limit: int = 5, backend: Optional[str] = None) -> List[Dict[str, str]]:
+    """
+    Search the web through the configured backend and return up to `limit`
+    {"title", "link", "snippet"} results. Results are cached per normalized query,
+    identical in-flight queries are coalesced, and backend calls are throttled by a token
+    bucket shared across workers through Redis.
+    """
+    backend_name, search_backend = _get_backend(backend)
+    normalized = normalize_query(query)
+    if not normalized:
+        return []
+    # Always fetch SEARCH_MAX_RESULTS so callers asking for different limits share one entry
+    cache_key = f"{backend_name}:{normalized}"
+    results = _memory_cache.get(cache_key)
+    if results is not None:
+        _count("hits")
+    else:
+        results = _inflight.do(cache_key, _load_results, cache_key, backend_name, search_backend, normalized)
+    return results[:limit]
+
+
+def get_search_stats() -> Dict[str, Any]:
+    with _stats_lock:
+        stats = dict(_stats)
+    lookups = stats["hits"] + stats["redis_hits"] + stats["misses"] + stats["errors"]
+    stats["hit_ratio"] = round((stats["hits"] + stats["redis_hits"]) / lookups, 4) if lookups else 0.0
+    stats["coalesced"] = _inflight.coalesced
+    stats["size"] = len(_memory_cache)
+    stats["backend"] = SEARCH_BACKEND
+    return stats
@@ -0,0 +1,43 @@
+import json
+import os
+from typing import Any, Optional, Union
+
+import ormsgpack
+import zstandard
+
+# Values written by encode_value start with MAGIC followed by a one-byte format version.
+# 0xFF never starts a UTF-8 JSON document, so legacy JSON values are told apart unambiguously.
+MAGIC = b"\xffFL"
+CODEC_VERSION = 1
+STORAGE_ZSTD_LEVEL = int(os.getenv("STORAGE_ZSTD_LEVEL", "3"))
+
+
+def is_encoded(data: Union[bytes, str, None]) -> bool:
+    """True if data was written by encode_value (as opposed to legacy JSON)."""
+    return isinstance(data, bytes) and data.startswith(MAGIC)
+
+
+def encode_value(value: Any) -> bytes:
+    """
+    Serialize value for Redis as MAGIC + version + zstd(msgpack). Values msgpack can't
+    represent (e.g. ints beyond 64 bits) are stored as plain JSON, which decode_value
+    still reads.
+    """
+    try:
+        packed = ormsgpack.packb(value)
+    except ormsgpack.MsgpackEncodeError:
+        return json.dumps(value).encode("utf-8")
+    # One-shot compress: a shared ZstdCompressor is not thread-safe
+    return MAGIC + bytes([CODEC_VERSION]) + zstandard.compress(packed, STORAGE_ZSTD_LEVEL)
+
+
+def decode_value(data: Union[bytes, str, None]) -> Optional[Any]:
+    """Read a value written by encode_value, or a legacy JSON string/bytes value."""
+    if data is None:
+        return None
+    if not is_encoded(data):
+        return json.loads(data)
+    version = data[len(MAGIC)]
+    if version != CODEC_VERSION:
+        raise ValueError(f"Unsupported storage codec version: {version}")
+    return ormsgpack.unpackb(zstandard.decompress(data[len(MAGIC) + 1:]))
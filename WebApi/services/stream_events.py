@@ -0,0 +1,27 @@
+from typing import Callable, Optional
+
+from langgraph.config import get_config, get_stream_writer
+
+# Set in the run config ({"configurable": {STREAM_TOKENS_KEY: True}}) by the streaming endpoint
+STREAM_TOKENS_KEY = "stream_tokens"
+
+
+def get_delta_emitter() -> Optional[Callable[[str], None]]:
+    """
+    Return a callable that forwards a chunk of LLM output for the running node as a
+    {"type": "delta", "node": <function name>, "delta": <text>} custom stream event, or None
+    when the current run did not ask for token streaming.
+    """
+    try:
+        config = get_config()
+    except RuntimeError:
+        return None
+    if not config.get("configurable", {}).get(STREAM_TOKENS_KEY):
+        return None
+    node_name = config.get("metadata", {}).get("langgraph_node")
+    writer = get_stream_writer()
+
+    def emit(delta: str):
+        if delta:
+            writer({"type": "delta", "node": node_name, "delta": delta})
+    return emit
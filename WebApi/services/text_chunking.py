@@ -0,0 +1,30 @@
+from typing import List
+
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+# Rough token estimate for English text with OpenAI tokenizers (~4 characters per token)
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text: str) -> int:
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """
+    Cut text to roughly max_tokens tokens.
+    """
+    return text[:max_tokens * CHARS_PER_TOKEN]
+
+
+def split_into_token_chunks(text: str, chunk_tokens: int, overlap_tokens: int = 0) -> List[str]:
+    """
+    Split text into chunks of at most ~chunk_tokens tokens, preferring paragraph, line and
+    sentence boundaries.
+    """
+    splitter = RecursiveCharacterTextSplitter(
+        chunk_size=chunk_tokens,
+        chunk_overlap=overlap_tokens,
+        length_function=estimate_tokens,
+    )
+    return splitter.split_text(text)
@@ -0,0 +1,185 @@
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from builder.graph_builder import get_graph_key
+from mapping.node_mapping import function_map
+from redis_client import get_redis_client, get_user_workflow, workflow_key, workflow_plan_key
+from services.cache_utils import TTLCache
+
+# Execution plans of saved workflows (see /run-workflow/{workflow_id})
+WORKFLOW_PLAN_CACHE_TTL = float(os.getenv("WORKFLOW_PLAN_CACHE_TTL", "3600"))
+WORKFLOW_PLAN_CACHE_SIZE = int(os.getenv("WORKFLOW_PLAN_CACHE_SIZE", "512"))
+WORKFLOW_PLAN_REDIS_TTL = int(os.getenv("WORKFLOW_PLAN_REDIS_TTL", "86400"))
+
+# Bump when the plan layout changes so old plans in Redis are rebuilt
+PLAN_FORMAT = 2
+
+# Store a plan only while its workflow still exists, so a plan built just before a delete
+# isn't written back after the delete removed the old one
+SET_PLAN_IF_WORKFLOW_EXISTS_LUA = """
+if redis.call('EXISTS', KEYS[1]) == 1 then
+    redis.call('SET', KEYS[2], ARGV[1], 'EX', ARGV[2])
+    return 1
+end
+return 0
+"""
+
+_memory_cache = TTLCache(WORKFLOW_PLAN_CACHE_SIZE, WORKFLOW_PLAN_CACHE_TTL)
+_stats_lock = threading.Lock()
+_stats = {"hits": 0, "redis_hits": 0, "builds": 0}
+
+
+class WorkflowNotFoundError(Exception):
+    """Raised when the saved workflow a plan is requested for does not exist."""
+
+
+def _count(stat: str):
+    with _stats_lock:
+        _stats[stat] += 1
+
+
+def _node_input(node_data: dict):
+    return (node_data.get("additional_input") or {}).get(node_data.get("title"))
+
+
+def _linear_steps(nodes: List[dict], edges: List[dict]) -> List[dict]:
+    """
+    The steps the editor's run button sends (getOrderedNodeListWithSeq in WebApp/src/App.jsx).
+    Without edges every node runs in canvas order. With edges only the connected nodes run,
+    as one chain: nodes are keyed by node type, each keeps the last edge leaving and entering
+    it, and the chain starts at the first node with nothing entering it.
+    """
+    if not edges:
+        return [
+            {"node_id": node["data"]["node_id"], "node_name": node["data"].get("title"), "node_input": _node_input(node["data"])}
+            for node in nodes
+        ]
+    nodes_by_id = {node["id"]: node["data"] for node in nodes}
+    node_map, next_map, prev_map = {}, {}, {}
+    for edge in edges:
+        if edge.get("source") not in nodes_by_id or edge.get("target") not in nodes_by_id:
+            raise ValueError("Workflow edges reference a node that does not exist")
+        source, target = nodes_by_id[edge["source"]], nodes_by_id[edge["target"]]
+        node_map[source["node_id"]] = source
+        node_map[target["node_id"]] = target
+        next_map[source["node_id"]] = target["node_id"]
+        prev_map[target["node_id"]] = source["node_id"]
+
+    start_id = next((node_id for node_id in node_map if node_id not in prev_map), None)
+    steps, visited = [], set()
+    while start_id and start_id not in visited:
+        node_data = node_map[start_id]
+        steps.append({"node_id": node_data["node_id"], "node_name": (node_data.get("title") or "").replace(" ", "_"), "node_input": _node_input(node_data)})
+        visited.add(start_id)
+        start_id = next_map.get(start_id)
+    return steps
+
+
+def build_workflow_plan(workflow: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Convert a saved workflow (React Flow {"nodes", "edges"}) into the run-graph inputs the
+    editor would send: graph_flowData steps (one linear chain, see _linear_steps),
+    additional_input, no edges, and the compiled graph cache key. Raises ValueError for
+    unknown node types, invalid edges, or edges that leave nothing to run.
+    """
+    data = workflow.get("data") or {}
+    nodes = data.get("nodes") or []
+    edges = data.get("edges") or []
+    if not nodes:
+        raise ValueError("Workflow has no nodes")
+    for node in nodes:
+        if (node.get("data") or {}).get("node_id") not in function_map:
+            raise ValueError(f"Unknown node_id: {(node.get('data') or {}).get('node_id')}")
+
+    steps = []
+    for seq, linear_step in enumerate(_linear_steps(nodes, edges), start=1):
+        node_id, node_input = linear_step["node_id"], linear_step["node_input"]
+        step = {"node_id": node_id, "node_name": linear_step["node_name"] or function_map[node_id], "seq": seq, "node_result": ""}
+        if node_input:
+            step["node_input"] = node_input
+        steps.append(step)
+    if not steps:
+        raise ValueError("Workflow edges form a cycle with no start node")
+    additional_input = [
+        {"node_id": node["data"]["node_id"], "node_input": _node_input(node["data"]) or ""}
+        for node in nodes
+    ]
+    node_names, edge_names = get_graph_key(steps, None)
+    return {
+        "format": PLAN_FORMAT,
+        "workflow_id": workflow.get("workflow_id"),
+        "steps": steps,
+        "additional_input": additional_input,
+        # The editor never sends edges: the steps run as a chain in seq order
+        "edges": None,
+        "graph_key": [list(node_names), [list(edge) for edge in edge_names]],
+        "built_at": time.time(),
+    }
+
+
+def graph_key_of(plan: Dict[str, Any]) -> tuple:
+    node_names, edge_names = plan["graph_key"]
+    return tuple(node_names), tuple(tuple(edge) for edge in edge_names)
+
+
+def apply_input_overrides(plan: Dict[str, Any], inputs: Optional[Dict[str, str]]) -> tuple:
+    """
+    Return (steps, additional_input) with node inputs replaced by inputs ({node_id: value}).
+    The cached plan itself is never modified.
+    """
+    if not inputs:
+        return plan["steps"], plan["additional_input"]
+    steps = [{**step, "node_input": inputs[step["node_id"]]} if step["node_id"] in inputs else step for step in plan["steps"]]
+    additional_input = [
+        {**item, "node_input": inputs[item["node_id"]]} if item["node_id"] in inputs else item
+        for item in plan["additional_input"]
+    ]
+    return steps, additional_input
+
+
+async def get_workflow_plan(user_id: str, workflow_id: str) -> Dict[str, Any]:
+    """
+    Return the execution plan of a saved workflow: from this worker's memory, then Redis,
+    else built from the saved workflow and stored in both. Save and delete drop the plan
+    key in Redis, and a plan is only stored while the workflow blob exists, so a plan is
+    only served from memory while that key still exists.
+
+    Raises WorkflowNotFoundError, or ValueError when the workflow can't be run.
+    """
+    client = await get_redis_client()
+    key = workflow_plan_key(user_id, workflow_id)
+    plan = _memory_cache.get(key)
+    if plan is not None and await client.exists(key):
+        _count("hits")
+        return plan
+
+    data = await client.get(key)
+    plan = json.loads(data) if data else None
+    if plan is not None and plan.get("format") == PLAN_FORMAT:
+        _count("redis_hits")
+    else:
+        workflow = await get_user_workflow(user_id, workflow_id)
+        if not workflow:
+            _memory_cache.delete(key)
+            raise WorkflowNotFoundError(f"Workflow not found: {workflow_id}")
+        plan = build_workflow_plan(workflow)
+        _count("builds")
+        stored = await client.eval(SET_PLAN_IF_WORKFLOW_EXISTS_LUA, 2, workflow_key(user_id, workflow_id), key, json.dumps(plan), WORKFLOW_PLAN_REDIS_TTL)
+        if not stored:
+            # Deleted while the plan was being built
+            _memory_cache.delete(key)
+            raise WorkflowNotFoundError(f"Workflow not found: {workflow_id}")
+    _memory_cache.set(key, plan)
+    return plan
+
+
+def get_workflow_plan_stats() -> Dict[str, Any]:
+    with _stats_lock:
+        stats = dict(_stats)
+    lookups = sum(stats.values())
+    stats["hit_ratio"] = round((stats["hits"] + stats["redis_hits"]) / lookups, 4) if lookups else 0.0
+    stats["size"] = len(_memory_cache)
+    return stats
@@ -0,0 +1,10 @@
+import os
+import sys
+
+from cryptography.fernet import Fernet
+
+# redis_client refuses to import without a key; tests never talk to a real Redis
+os.environ.setdefault("FERNET_KEY", Fernet.generate_key().decode())
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
@@ -0,0 +1,44 @@
+import asyncio
+import time
+
+import pytest
+
+import code_graph_flow_auto
+from builder.graph_builder import graph_cache
+from mapping.node_mapping import node_functions
+
+NODE_SECONDS = 0.3
+RUNS = 10
+WORKFLOW = [{"node_id": "fdc3b924-2f2a-43e8-923f-3f118a51eb0e", "node_name": "get_weather", "seq": 1, "node_input": "Pune"}]
+
+
+def sleeping_node(state: dict) -> dict:
+    # Blocking, like the real nodes' HTTP and LLM calls
+    time.sleep(NODE_SECONDS)
+    state["node_result"] = f"slept for {state.get('node_input')}"
+    return state
+
+
+@pytest.fixture
+def stub_weather_node(monkeypatch):
+    monkeypatch.setitem(node_functions, "get_weather", sleeping_node)
+    graph_cache.clear()
+    yield
+    graph_cache.clear()
+
+
+def test_concurrent_runs_overlap(stub_weather_node):
+    async def run_all():
+        await code_graph_flow_auto.execute_graph_flow_async(WORKFLOW, [], user_id="warm-up")
+        started = time.perf_counter()
+        results = await asyncio.gather(*(
+            code_graph_flow_auto.execute_graph_flow_async(WORKFLOW, [], user_id=f"user-{i}") for i in range(RUNS)
+        ))
+        return time.perf_counter() - started, results
+
+    elapsed, results = asyncio.run(run_all())
+
+    # Run one after the other they would take RUNS * NODE_SECONDS (3s)
+    assert elapsed < NODE_SECONDS * 3
+    assert len(results) == RUNS
+    assert all(result["results"][0]["node_result"] == "slept for Pune" for result in results)
@@ -0,0 +1,54 @@
+import os
+
+import pytest
+
+from conftest import FIXTURES_DIR
+from services.content_extractor import extract_main_content, EXTRACT_MIN_CONTENT_CHARS
+
+EXTRACTION_FIXTURES = os.path.join(FIXTURES_DIR, "extraction")
+
+
+def _load(name: str) -> str:
+    with open(os.path.join(EXTRACTION_FIXTURES, name), encoding="utf-8") as f:
+        return f.read()
+
+
+# fixture, expected method, text that must be kept, text that must be stripped
+CASES = [
+    ("news_article.html", "article", "News paragraph 5", ["Section 12", "cookies", "SCRIPT_TEXT", "Share on Twitter", "Copyright"]),
+    ("blog_density.html", "density", "Blog paragraph 5", ["related link", "Section 3", "Copyright"]),
+    ("page_wrapper_sidebar.html", "density", "Wrapper paragraph 5", []),
+    ("hinted_content_only.html", "density", "Widget paragraph 5", ["cookies"]),
+]
+
+
+@pytest.mark.parametrize("name, method, kept, stripped", CASES)
+def test_extracts_main_content(name, method, kept, stripped):
+    result = extract_main_content(_load(name))
+    assert result["method"] == method
+    assert kept in result["text"]
+    for text in stripped:
+        assert text not in result["text"]
+    assert result["extracted_chars"] == len(result["text"])
+    assert result["extracted_chars"] <= result["original_chars"]
+
+
+def test_every_fixture_keeps_content():
+    for name in sorted(os.listdir(EXTRACTION_FIXTURES)):
+        result = extract_main_content(_load(name))
+        assert result["extracted_chars"] > 0, name
+
+
+def test_wrapper_with_boilerplate_hint_is_not_stripped():
+    result = extract_main_content(_load("page_wrapper_sidebar.html"))
+    assert result["extracted_chars"] >= EXTRACT_MIN_CONTENT_CHARS
+
+
+def test_short_page_falls_back_to_body():
+    result = extract_main_content(_load("short_page.html"))
+    assert result["method"] == "body"
+    assert "Sorry, this page does not exist." in result["text"]
+
+
+def test_empty_page():
+    assert extract_main_content("") == {"text": "", "method": "body", "original_chars": 0, "extracted_chars": 0}
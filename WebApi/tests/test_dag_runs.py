@@ -0,0 +1,90 @@
+import asyncio
+import time
+
+import pytest
+
+import code_graph_flow_auto
+from builder.graph_builder import get_compiled_graph, graph_cache
+from mapping.node_mapping import node_functions
+
+NODE_SECONDS = 0.3
+WEATHER = "fdc3b924-2f2a-43e8-923f-3f118a51eb0e"
+HTML_TEMPLATE = "1a7c2b8e-e4ae-4c8e-b2c4-999b4b3cf80d"
+TEMPLATE_GENERATOR = "f7e6d5c4-1234-4abc-9def-abcdef123456"
+EMAIL = "6789d23f-1352-4b11-b9a3-2f4f6f96fcd0"
+TOP_NEWS = "a1b2c3d4-e5f6-7890-abcd-ef1234567890"
+STUBBED = {
+    "get_weather": 0,
+    "convert_to_html_template": NODE_SECONDS,
+    "template_generator": NODE_SECONDS,
+    "fetch_top_news": NODE_SECONDS,
+    "send_email": 0,
+}
+
+
+def stub_node(name: str, seconds: float):
+    # Blocking like the real nodes; the result records which input the node was given
+    def node(state: dict) -> dict:
+        time.sleep(seconds)
+        state["node_result"] = f"{name}<-{state.get('node_result')}"
+        return state
+    return node
+
+
+@pytest.fixture(autouse=True)
+def stub_nodes(monkeypatch):
+    for name, seconds in STUBBED.items():
+        monkeypatch.setitem(node_functions, name, stub_node(name, seconds))
+    graph_cache.clear()
+    yield
+    graph_cache.clear()
+
+
+def steps(*node_ids) -> list:
+    return [{"node_id": node_id, "seq": seq} for seq, node_id in enumerate(node_ids, 1)]
+
+
+def run(workflow, edges) -> tuple:
+    started = time.perf_counter()
+    output = asyncio.run(code_graph_flow_auto.execute_graph_flow_async(workflow, [], user_id="user", edges=edges))
+    results = {result["node_id"]: result["node_result"] for result in output["results"]}
+    return time.perf_counter() - started, results
+
+
+def test_each_node_gets_its_own_predecessors_result():
+    # Two independent chains in the same supersteps: A -> B and C -> D
+    workflow = steps(WEATHER, HTML_TEMPLATE, TEMPLATE_GENERATOR, EMAIL)
+    edges = [{"source": WEATHER, "target": HTML_TEMPLATE}, {"source": TEMPLATE_GENERATOR, "target": EMAIL}]
+    _, results = run(workflow, edges)
+    assert results[HTML_TEMPLATE] == "convert_to_html_template<-get_weather<-None"
+    assert results[EMAIL] == "send_email<-template_generator<-None"
+
+
+def test_fan_out_fan_in_takes_as_long_as_the_slowest_branch():
+    workflow = steps(WEATHER, HTML_TEMPLATE, TEMPLATE_GENERATOR, TOP_NEWS, EMAIL)
+    branches = (HTML_TEMPLATE, TEMPLATE_GENERATOR, TOP_NEWS)
+    edges = [{"source": WEATHER, "target": branch} for branch in branches]
+    edges += [{"source": branch, "target": EMAIL} for branch in reversed(branches)]
+    get_compiled_graph(workflow, edges)  # compile outside the timing
+
+    elapsed, results = run(workflow, edges)
+
+    # Run one after the other the three branches would take 3 * NODE_SECONDS
+    assert elapsed < NODE_SECONDS * 2
+    # Branch results are joined in seq order, whatever order they finished in
+    assert results[EMAIL] == "send_email<-" + "\n\n".join([
+        "convert_to_html_template<-get_weather<-None",
+        "template_generator<-get_weather<-None",
+        "fetch_top_news<-get_weather<-None",
+    ])
+
+
+def test_cycles_are_rejected():
+    workflow = steps(WEATHER, HTML_TEMPLATE, EMAIL)
+    edges = [
+        {"source": WEATHER, "target": HTML_TEMPLATE},
+        {"source": HTML_TEMPLATE, "target": EMAIL},
+        {"source": EMAIL, "target": HTML_TEMPLATE},
+    ]
+    with pytest.raises(ValueError, match="cycle"):
+        get_compiled_graph(workflow, edges)
@@ -0,0 +1,41 @@
+import os
+
+import pytest
+
+from conftest import FIXTURES_DIR
+from services.feed_parser import parse_feed, parse_feed_with_feedparser, stream_feed_entries
+
+FEEDS_DIR = os.path.join(FIXTURES_DIR, "feeds")
+
+
+def load(name: str) -> bytes:
+    with open(os.path.join(FEEDS_DIR, name), "rb") as f:
+        return f.read()
+
+
+@pytest.mark.parametrize("name", ["news_rss_content_encoded.xml", "tech_atom.xml"])
+def test_streaming_parser_matches_feedparser(name):
+    content = load(name)
+    entries = parse_feed(content, 25)
+    expected = parse_feed_with_feedparser(content, 25)
+    assert len(entries) == 25
+    for entry, reference in zip(entries, expected):
+        assert entry["title"] == reference["title"]
+        assert entry["link"] == reference["link"]
+        assert entry["published"] == reference["published"]
+        assert entry["summary"]
+
+
+def test_streaming_parser_stops_at_the_limit():
+    # Truncating the feed right after the third item is still enough for limit=3
+    content = load("news_rss_content_encoded.xml")
+    cut = content.index(b"</item>", content.index(b"story-1002")) + len(b"</item>")
+    assert len(stream_feed_entries(content[:cut], 3)) == 3
+
+
+def test_malformed_feed_falls_back_to_feedparser():
+    entries = parse_feed(load("malformed_rss.xml"), 10)
+    assert [entry["link"] for entry in entries] == [
+        "https://broken.example.net/markets-rally",
+        "https://broken.example.net/second",
+    ]
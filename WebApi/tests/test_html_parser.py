@@ -0,0 +1,30 @@
+import os
+
+from conftest import FIXTURES_DIR
+from services import html_parser
+from services.content_extractor import extract_main_content, _extract_main_content
+
+
+def test_pool_never_forks():
+    try:
+        assert html_parser._get_pool()._mp_context.get_start_method() != "fork"
+    finally:
+        html_parser.shutdown_html_process_pool()
+
+
+def test_large_documents_are_offloaded(monkeypatch):
+    with open(os.path.join(FIXTURES_DIR, "extraction", "news_article.html"), encoding="utf-8") as f:
+        html = f.read()
+    monkeypatch.setattr(html_parser, "HTML_PROCESS_POOL_THRESHOLD", 100)
+    before = html_parser.get_html_parser_stats()["offloaded"]
+    try:
+        assert extract_main_content(html) == _extract_main_content(html)
+    finally:
+        html_parser.shutdown_html_process_pool()
+    assert html_parser.get_html_parser_stats()["offloaded"] == before + 1
+
+
+def test_small_documents_are_parsed_inline():
+    before = html_parser.get_html_parser_stats()["inline"]
+    extract_main_content("<html><body><p>small</p></body></html>")
+    assert html_parser.get_html_parser_stats()["inline"] == before + 1
@@ -0,0 +1,151 @@
+import asyncio
+import json
+import socket
+
+import redis.asyncio as aioredis
+from fastapi.testclient import TestClient
+
+import worker
+from services import job_queue
+
+
+def _unused_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class FakeQueue:
+    """Stands in for the job_queue calls used by worker.work()."""
+
+    def __init__(self, monkeypatch, jobs: int, job_seconds: float = 0.05):
+        self.queue = [
+            (f"{i}-0", {"run_id": f"run-{i}", "user_id": "user", "payload": json.dumps({"graph_flowData": [], "additional_input": []})})
+            for i in range(jobs)
+        ]
+        self.job_seconds = job_seconds
+        self.reads = 0
+        self.active = 0
+        self.peak = 0
+        self.completed = []
+        for name in ("read_jobs", "claim_stale_jobs", "mark_run_started", "complete_run", "fail_run", "ensure_job_group", "get_redis_client", "execute_graph_flow_async"):
+            monkeypatch.setattr(worker, name, getattr(self, name))
+
+    async def get_redis_client(self):
+        return None
+
+    async def ensure_job_group(self, client):
+        pass
+
+    async def read_jobs(self, consumer, count, block_ms):
+        self.reads += 1
+        if not self.queue:
+            await asyncio.sleep(0.01)
+            return []
+        entries, self.queue = self.queue[:count], self.queue[count:]
+        return entries
+
+    async def claim_stale_jobs(self, consumer, count):
+        return []
+
+    async def mark_run_started(self, run_id):
+        return 1
+
+    async def complete_run(self, run_id, message_id, result):
+        self.completed.append(run_id)
+
+    async def fail_run(self, run_id, message_id, error):
+        raise AssertionError(f"{run_id} failed: {error}")
+
+    async def execute_graph_flow_async(self, *args, **kwargs):
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        await asyncio.sleep(self.job_seconds)
+        self.active -= 1
+        return {"results": []}
+
+
+def test_worker_bounds_concurrency(monkeypatch):
+    fake = FakeQueue(monkeypatch, jobs=20)
+
+    async def run():
+        stop = asyncio.Event()
+        task = asyncio.create_task(worker.work("test", 4, stop))
+        while len(fake.completed) < 20:
+            await asyncio.sleep(0.01)
+        stop.set()
+        await asyncio.wait_for(task, 5)
+
+    asyncio.run(run())
+    assert fake.peak == 4
+    assert sorted(fake.completed) == sorted(f"run-{i}" for i in range(20))
+
+
+def test_worker_stops_reading_when_stopped_while_busy(monkeypatch):
+    fake = FakeQueue(monkeypatch, jobs=10, job_seconds=0.2)
+
+    async def run():
+        stop = asyncio.Event()
+        task = asyncio.create_task(worker.work("test", 2, stop))
+        # Both slots busy with the first two jobs; stop arrives while the loop waits for a slot
+        while fake.active < 2:
+            await asyncio.sleep(0.01)
+        reads = fake.reads
+        stop.set()
+        await asyncio.wait_for(task, 5)
+        return reads
+
+    reads_before_stop = asyncio.run(run())
+    assert fake.reads == reads_before_stop
+    assert len(fake.completed) == 2
+    assert len(fake.queue) == 8
+
+
+def test_queue_stats_when_redis_is_unreachable(monkeypatch):
+    unreachable = aioredis.Redis(host="127.0.0.1", port=_unused_port(), socket_connect_timeout=1, decode_responses=True)
+
+    async def get_unreachable_client():
+        return unreachable
+
+    monkeypatch.setattr(job_queue, "get_redis_client", get_unreachable_client)
+    stats = asyncio.run(job_queue.get_job_queue_stats())
+    assert stats["stream_length"] == 0
+    assert stats["error"] == "redis unavailable"
+
+
+def test_metrics_ok_when_redis_is_unreachable(monkeypatch):
+    import main
+
+    port = _unused_port()
+
+    async def get_unreachable_client():
+        return aioredis.Redis(host="127.0.0.1", port=port, socket_connect_timeout=1, decode_responses=True)
+
+    monkeypatch.setattr(job_queue, "get_redis_client", get_unreachable_client)
+    response = TestClient(main.app).get("/metrics")
+    assert response.status_code == 200
+    assert response.json()["job_queue"]["error"] == "redis unavailable"
+
+
+def test_worker_listens_for_key_invalidations_until_shutdown(monkeypatch):
+    events = []
+
+    async def listen_for_openai_key_invalidations():
+        events.append("listening")
+        try:
+            await asyncio.Event().wait()
+        except asyncio.CancelledError:
+            events.append("cancelled")
+            raise
+
+    async def work(consumer, concurrency, stop):
+        await asyncio.sleep(0.01)
+        events.append("worked")
+
+    monkeypatch.setattr(worker, "listen_for_openai_key_invalidations", listen_for_openai_key_invalidations)
+    monkeypatch.setattr(worker, "work", work)
+    for name in ("init_sync_redis_pool", "close_sync_redis_pool", "shutdown_html_process_pool"):
+        monkeypatch.setattr(worker, name, lambda: None)
+    monkeypatch.setattr("sys.argv", ["worker.py"])
+    asyncio.run(worker.main())
+    assert events == ["listening", "worked", "cancelled"]
@@ -0,0 +1,140 @@
+import asyncio
+import json
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from services import llm_gateway
+
+
+class FakeClient:
+    def __init__(self, api_key, base_url=None, max_retries=0):
+        self.api_key = api_key
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+def test_evicted_clients_are_not_closed(monkeypatch):
+    monkeypatch.setattr(llm_gateway, "LLM_CLIENT_CACHE_SIZE", 2)
+    clients = llm_gateway.OrderedDict()
+    first = llm_gateway._get_cached_client(clients, "key-1", FakeClient)
+    llm_gateway._get_cached_client(clients, "key-2", FakeClient)
+    llm_gateway._get_cached_client(clients, "key-3", FakeClient)
+    assert len(clients) == 2
+    assert not first.closed
+
+
+def test_user_semaphores_are_dropped_when_idle():
+    for i in range(50):
+        llm_gateway._call(f"user-{i}", lambda: None)
+    assert llm_gateway._user_semaphores == {}
+
+
+def test_user_semaphore_still_limits_concurrent_callers(monkeypatch):
+    monkeypatch.setattr(llm_gateway, "LLM_USER_CONCURRENCY", 2)
+    active, peak, lock = [0], [0], threading.Lock()
+
+    def call():
+        with lock:
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+        time.sleep(0.05)
+        with lock:
+            active[0] -= 1
+
+    threads = [threading.Thread(target=llm_gateway._call, args=("same-user", call)) for _ in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert peak[0] == 2
+    assert llm_gateway._user_semaphores == {}
+
+
+def test_async_user_semaphores_are_dropped_when_idle():
+    async def call():
+        await asyncio.sleep(0.01)
+
+    async def run():
+        await asyncio.gather(*(llm_gateway._acall(f"user-{i % 5}", call) for i in range(20)))
+
+    asyncio.run(run())
+    assert llm_gateway._async_user_semaphores == {}
+
+
+class FakeOpenAIHandler(BaseHTTPRequestHandler):
+    """OpenAI-compatible chat completions: the first request per API key gets a 429."""
+
+    protocol_version = "HTTP/1.1"
+    rate_limited_keys = set()
+    requests = []
+
+    def log_message(self, *args):
+        pass
+
+    def _send_json(self, status: int, body: dict, **headers):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in headers.items():
+            self.send_header(name.replace("_", "-"), value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_POST(self):
+        request = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        api_key = self.headers["Authorization"]
+        self.requests.append(self.path)
+        if api_key not in self.rate_limited_keys:
+            self.rate_limited_keys.add(api_key)
+            self._send_json(429, {"error": {"message": "Rate limit reached", "type": "requests", "code": "rate_limit_exceeded"}}, Retry_After="0")
+            return
+        self._send_json(200, {
+            "id": "chatcmpl-test",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": request["model"],
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": "hello from the fake server"}, "finish_reason": "stop"}],
+            "usage": {"prompt_tokens": 5, "completion_tokens": 5, "total_tokens": 10},
+        })
+
+
+@pytest.fixture
+def fake_openai(monkeypatch):
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), FakeOpenAIHandler)
+    httpd.daemon_threads = True
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    FakeOpenAIHandler.requests = []
+    monkeypatch.setattr(llm_gateway, "LLM_BASE_URL", f"http://127.0.0.1:{httpd.server_address[1]}/v1")
+    yield FakeOpenAIHandler
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def test_rate_limited_request_is_retried(fake_openai):
+    before = llm_gateway.get_llm_gateway_stats()
+    # A fresh key, so the pooled client points at the fake server
+    response = llm_gateway.chat_completion(f"sk-{uuid.uuid4()}", user_id="user", model="gpt-4.1-mini", messages=[{"role": "user", "content": "hi"}])
+    after = llm_gateway.get_llm_gateway_stats()
+
+    assert response.choices[0].message.content == "hello from the fake server"
+    assert fake_openai.requests == ["/v1/chat/completions", "/v1/chat/completions"]
+    assert after["requests"] - before["requests"] == 1
+    assert after["retries"] - before["retries"] == 1
+    assert after["rate_limited"] - before["rate_limited"] == 1
+
+
+def test_async_rate_limited_request_is_retried(fake_openai):
+    before = llm_gateway.get_llm_gateway_stats()
+    response = asyncio.run(llm_gateway.achat_completion(f"sk-{uuid.uuid4()}", user_id="user", model="gpt-4.1-mini", messages=[{"role": "user", "content": "hi"}]))
+    after = llm_gateway.get_llm_gateway_stats()
+
+    assert response.choices[0].message.content == "hello from the fake server"
+    assert len(fake_openai.requests) == 2
+    assert after["retries"] - before["retries"] == 1
@@ -0,0 +1,64 @@
+import asyncio
+import json
+
+import pytest
+
+import redis_client
+
+
+class FakeSyncRedis:
+    """get() returns a stored OpenAI key record; on_get runs in the middle of the read."""
+
+    def __init__(self, api_key: str, on_get=None):
+        self.value = json.dumps({"api_key": redis_client.encrypt_api_key(api_key)})
+        self.on_get = on_get
+
+    def get(self, key):
+        value = self.value
+        if self.on_get:
+            self.on_get()
+        return value
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    redis_client.invalidate_all_cached_openai_keys()
+    yield
+    redis_client.invalidate_all_cached_openai_keys()
+
+
+def test_sync_lookup_is_cached(monkeypatch):
+    monkeypatch.setattr(redis_client, "get_sync_redis_client", lambda: FakeSyncRedis("sk-old"))
+    assert redis_client.get_user_openai_key_sync("user") == "sk-old"
+    assert redis_client.openai_key_cache.get("user") == "sk-old"
+
+
+def test_sync_lookup_invalidated_mid_read_is_not_cached(monkeypatch):
+    # The key is rotated (and invalidated) after the lookup read the old ciphertext
+    fake = FakeSyncRedis("sk-old", on_get=lambda: redis_client.invalidate_cached_openai_key("user"))
+    monkeypatch.setattr(redis_client, "get_sync_redis_client", lambda: fake)
+    assert redis_client.get_user_openai_key_sync("user") == "sk-old"
+    assert redis_client.openai_key_cache.get("user") is None
+
+
+def test_async_lookup_invalidated_mid_read_is_not_cached(monkeypatch):
+    async def get_api_key(user_id, service_name):
+        redis_client.invalidate_cached_openai_key(user_id)
+        return {"api_key": "sk-old"}
+
+    monkeypatch.setattr(redis_client, "get_api_key", get_api_key)
+    assert asyncio.run(redis_client.get_user_openai_key("user")) == "sk-old"
+    assert redis_client.openai_key_cache.get("user") is None
+
+
+def test_clear_all_blocks_lookups_in_flight(monkeypatch):
+    fake = FakeSyncRedis("sk-old", on_get=redis_client.invalidate_all_cached_openai_keys)
+    monkeypatch.setattr(redis_client, "get_sync_redis_client", lambda: fake)
+    redis_client.get_user_openai_key_sync("user")
+    assert redis_client.openai_key_cache.get("user") is None
+
+
+def test_generation_counters_stay_bounded():
+    for i in range(redis_client.OPENAI_KEY_CACHE_SIZE * 2):
+        redis_client.invalidate_cached_openai_key(f"user-{i}")
+    assert len(redis_client._openai_key_generations) <= redis_client.OPENAI_KEY_CACHE_SIZE
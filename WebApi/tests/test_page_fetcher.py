@@ -0,0 +1,125 @@
+import functools
+import gzip
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from nodes.fetch_html_content import fetch_html_content
+from services import page_cache
+from services.page_fetcher import TRUNCATION_MARKER, UnsupportedContentError, download_page
+
+PARAGRAPH = "<p>Flowly fetches pages in chunks and stops at the byte cap, whatever the server sends.</p>"
+
+
+class PageHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, body: bytes, content_type: str, **headers):
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in headers.items():
+            self.send_header(name.replace("_", "-"), value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_chunks(self, data: bytes, pause: float):
+        # Never-ending chunked response: an endless stream (no pause) or a slow trickle
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        try:
+            while True:
+                self.wfile.write(b"%x\r\n%s\r\n" % (len(data), data))
+                self.wfile.flush()
+                time.sleep(pause)
+        except OSError:
+            pass
+
+    def do_GET(self):
+        if self.path == "/big":
+            self._send(("<html><body>" + PARAGRAPH * 2000 + "</body></html>").encode(), "text/html; charset=utf-8")
+        elif self.path == "/endless":
+            self._send_chunks(PARAGRAPH.encode() * 50, 0.001)
+        elif self.path == "/trickle":
+            self._send_chunks(b"<p>x</p>", 0.05)
+        elif self.path == "/gzip":
+            body = gzip.compress(("<p>caf\xe9 cr\xe8me</p>" * 20).encode("latin-1"))
+            self._send(body, "text/html; charset=iso-8859-1", Content_Encoding="gzip")
+        elif self.path == "/pdf":
+            # Claims a huge body but sends none: only the headers may be read
+            self.send_response(200)
+            self.send_header("Content-Type", "application/pdf")
+            self.send_header("Content-Length", "100000000")
+            self.end_headers()
+        else:
+            self.send_error(404)
+
+
+@pytest.fixture(scope="module")
+def server():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), PageHandler)
+    httpd.daemon_threads = True
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def test_download_stops_at_the_byte_cap(server):
+    result = download_page(server + "/big", max_bytes=10_000)
+    assert result["truncated"]
+    assert result["bytes_read"] == 10_000
+    assert result["text"].startswith("<html><body><p>Flowly")
+
+
+def test_small_page_is_not_truncated(server):
+    result = download_page(server + "/big", max_bytes=1_000_000)
+    assert not result["truncated"]
+    assert result["text"].endswith("</body></html>")
+
+
+def test_endless_response_stops_at_the_byte_cap(server):
+    result = download_page(server + "/endless", max_bytes=50_000, deadline=10)
+    assert result["truncated"]
+    assert result["bytes_read"] == 50_000
+
+
+def test_trickling_response_stops_at_the_deadline(server):
+    started = time.monotonic()
+    result = download_page(server + "/trickle", deadline=0.5)
+    assert time.monotonic() - started < 2
+    assert result["truncated"]
+    assert 0 < result["bytes_read"] < 1000
+
+
+def test_gzip_body_is_decoded_with_the_header_charset(server):
+    result = download_page(server + "/gzip")
+    assert result["encoding"] == "iso-8859-1"
+    assert result["text"].startswith("<p>café crème</p>")
+    assert not result["truncated"]
+
+
+def test_pdf_is_rejected_from_its_headers(server):
+    started = time.monotonic()
+    with pytest.raises(UnsupportedContentError):
+        download_page(server + "/pdf", timeout=5)
+    assert time.monotonic() - started < 1
+
+
+def test_fetch_html_content_marks_truncated_pages(server, monkeypatch):
+    monkeypatch.setattr(page_cache, "PAGE_CACHE_REDIS", False)
+    monkeypatch.setattr(page_cache, "download_page", functools.partial(download_page, max_bytes=10_000))
+    page_cache._memory_cache.delete(server + "/big")
+    try:
+        state = fetch_html_content({"node_input": server + "/big"})
+    finally:
+        page_cache._memory_cache.delete(server + "/big")
+    assert state["node_result"].startswith("Flowly fetches pages")
+    assert state["node_result"].endswith(TRUNCATION_MARKER)
@@ -0,0 +1,61 @@
+from contextlib import contextmanager
+
+import pytest
+
+from nodes import blog_researcher
+from services import page_cache, page_fetcher
+
+
+class RecordingLimiter:
+    def __init__(self):
+        self.urls = []
+
+    @contextmanager
+    def limit(self, url):
+        self.urls.append(url)
+        yield
+
+
+@pytest.fixture
+def limiter(monkeypatch):
+    limiter = RecordingLimiter()
+    monkeypatch.setattr(page_fetcher, "page_host_limiter", limiter)
+    monkeypatch.setattr(page_fetcher, "_stream_page", lambda url, *args: {"status": 200, "text": "<p>ok</p>"})
+    return limiter
+
+
+def test_plain_downloads_are_not_throttled(limiter):
+    page_fetcher.download_page("https://example.com/a")
+    assert limiter.urls == []
+
+
+def test_polite_downloads_wait_for_the_host_limiter(limiter):
+    page_fetcher.download_page("https://example.com/a", polite=True)
+    assert limiter.urls == ["https://example.com/a"]
+
+
+def test_only_the_search_fan_out_is_polite(monkeypatch):
+    calls = []
+
+    def get_page(url, polite=False):
+        calls.append((url, polite))
+        return {"text": "content", "original_chars": 10, "extracted_chars": 7}
+
+    monkeypatch.setattr(blog_researcher, "get_page", get_page)
+    blog_researcher.fetch_page_content("https://example.com/reference")
+    blog_researcher.fetch_first_good_page(["https://example.com/result"])
+    assert calls == [("https://example.com/reference", False), ("https://example.com/result", True)]
+
+
+def test_get_page_passes_polite_to_the_download(monkeypatch):
+    seen = []
+
+    def download_page(url, etag=None, modified=None, polite=False):
+        seen.append(polite)
+        raise page_fetcher.UnsupportedContentError("binary")
+
+    monkeypatch.setattr(page_cache, "download_page", download_page)
+    monkeypatch.setattr(page_cache, "PAGE_CACHE_REDIS", False)
+    with pytest.raises(page_cache.PageFetchError):
+        page_cache.get_page("https://example.com/polite-check", polite=True)
+    assert seen == [True]
@@ -0,0 +1,62 @@
+import pytest
+import requests
+
+from services import search_service
+
+
+class FakeBackend:
+    def __init__(self, results):
+        self.results = results
+        self.calls = 0
+
+    def search(self, query, limit):
+        self.calls += 1
+        return list(self.results)
+
+
+class FakeResponse:
+    def __init__(self, status_code: int, text: str = ""):
+        self.status_code = status_code
+        self.text = text
+
+
+@pytest.fixture(autouse=True)
+def offline_search(monkeypatch):
+    monkeypatch.setattr(search_service, "SEARCH_CACHE_REDIS", False)
+    monkeypatch.setattr(search_service, "_take_token", lambda backend_name: 0)
+    search_service._memory_cache.clear()
+    yield
+    search_service._memory_cache.clear()
+
+
+def test_results_are_cached():
+    backend = FakeBackend([{"title": "t", "link": "https://example.com", "snippet": "s"}])
+    search_service.register_search_backend("fake", backend)
+    assert search_service.search("Python  Asyncio", backend="fake") == backend.results
+    assert search_service.search("python asyncio", backend="fake") == backend.results
+    assert backend.calls == 1
+
+
+def test_empty_results_expire_quickly(monkeypatch):
+    backend = FakeBackend([])
+    search_service.register_search_backend("fake", backend)
+    writes = []
+    monkeypatch.setattr(search_service, "_write_redis", lambda key, results: writes.append(key))
+    assert search_service.search("throttled query", backend="fake") == []
+    entry = search_service._memory_cache.get_entry("fake:throttled query")
+    assert entry["expires_at"] - entry["stored_at"] == pytest.approx(search_service.SEARCH_CACHE_EMPTY_TTL)
+    assert writes == []
+
+    # Once the short TTL is over the backend is asked again
+    search_service._memory_cache.set("fake:throttled query", [], ttl=0)
+    backend.results = [{"title": "t", "link": "https://example.com", "snippet": "s"}]
+    assert search_service.search("throttled query", backend="fake") == backend.results
+    assert backend.calls == 2
+
+
+@pytest.mark.parametrize("status_code", [202, 403, 503])
+def test_duckduckgo_non_200_is_an_error(monkeypatch, status_code):
+    monkeypatch.setattr(search_service.requests, "post", lambda *args, **kwargs: FakeResponse(status_code))
+    with pytest.raises(requests.HTTPError):
+        search_service.search("anything", backend="ddg_html")
+    assert search_service._memory_cache.get("ddg_html:anything") is None
@@ -0,0 +1,116 @@
+import json
+
+import pytest
+
+import migrate_storage
+from services.storage_codec import CODEC_VERSION, MAGIC, decode_value, encode_value, is_encoded
+
+WORKFLOW = {"workflow_id": "wf", "name": "Daily news", "data": {"nodes": [{"id": "1", "data": {"title": "Fetch"}}], "edges": []}}
+
+
+def test_round_trip():
+    encoded = encode_value(WORKFLOW)
+    assert is_encoded(encoded)
+    assert encoded[len(MAGIC)] == CODEC_VERSION
+    assert decode_value(encoded) == WORKFLOW
+
+
+@pytest.mark.parametrize("legacy", [json.dumps(WORKFLOW), json.dumps(WORKFLOW).encode("utf-8")])
+def test_legacy_json_is_decoded(legacy):
+    assert not is_encoded(legacy)
+    assert decode_value(legacy) == WORKFLOW
+
+
+def test_none_decodes_to_none():
+    assert decode_value(None) is None
+
+
+def test_ints_beyond_64_bits_fall_back_to_json():
+    value = {"big": 2 ** 70}
+    encoded = encode_value(value)
+    assert not is_encoded(encoded)
+    assert decode_value(encoded) == value
+
+
+def test_unknown_version_is_rejected():
+    encoded = encode_value(WORKFLOW)
+    future = MAGIC + bytes([CODEC_VERSION + 1]) + encoded[len(MAGIC) + 1:]
+    with pytest.raises(ValueError):
+        decode_value(future)
+
+
+class FakePipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.calls = []
+
+    def memory_usage(self, key):
+        self.calls.append(lambda: len(self.redis.values.get(key, b"")))
+
+    def execute(self):
+        return [call() for call in self.calls]
+
+
+class FakeSyncRedis:
+    """Sync binary client for migrate_key_type; on_mget runs right after each MGET."""
+
+    def __init__(self, values, on_mget=None):
+        self.values = dict(values)
+        self.on_mget = on_mget
+
+    def scan_iter(self, match, count):
+        prefix = match.rstrip("*").encode()
+        return [key for key in self.values if key.startswith(prefix)]
+
+    def mget(self, keys):
+        values = [self.values.get(key) for key in keys]
+        if self.on_mget:
+            self.on_mget(self)
+        return values
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+    def register_script(self, script):
+        assert script == migrate_storage.REPLACE_IF_UNCHANGED_LUA
+
+        def replace_if_unchanged(keys, args, client):
+            def run():
+                if self.values.get(keys[0]) != args[0]:
+                    return 0
+                self.values[keys[0]] = args[1]
+                return 1
+            client.calls.append(run)
+        return replace_if_unchanged
+
+
+def test_migration_skips_encoded_and_concurrently_changed_values():
+    legacy = json.dumps(WORKFLOW).encode()
+    saved_meanwhile = encode_value({**WORKFLOW, "name": "Renamed"})
+
+    def save_during_migration(redis):
+        redis.values[b"workflow:u:changed"] = saved_meanwhile
+
+    client = FakeSyncRedis({
+        b"workflow:u:legacy": legacy,
+        b"workflow:u:encoded": encode_value(WORKFLOW),
+        b"workflow:u:changed": legacy,
+        b"user:u:config": b'{"theme": "dark"}',
+    }, on_mget=save_during_migration)
+
+    report = migrate_storage.migrate_key_type(client, "workflow", "workflow:*", batch_size=10, sample_size=10, dry_run=False)
+
+    assert (report["scanned"], report["already_encoded"], report["rewritten"], report["changed_concurrently"]) == (3, 1, 1, 1)
+    assert is_encoded(client.values[b"workflow:u:legacy"])
+    assert decode_value(client.values[b"workflow:u:legacy"]) == WORKFLOW
+    assert client.values[b"workflow:u:changed"] == saved_meanwhile
+    assert client.values[b"user:u:config"] == b'{"theme": "dark"}'
+
+
+def test_dry_run_rewrites_nothing():
+    legacy = json.dumps(WORKFLOW).encode()
+    client = FakeSyncRedis({b"workflow:u:legacy": legacy})
+    report = migrate_storage.migrate_key_type(client, "workflow", "workflow:*", batch_size=10, sample_size=10, dry_run=True)
+    assert report["rewritten"] == 0
+    assert report["value_bytes_after"] < report["value_bytes_before"]
+    assert client.values[b"workflow:u:legacy"] == legacy
@@ -0,0 +1,24 @@
+import threading
+
+from nodes import summarize_html_content
+from services.node_metrics import collect_node_metrics, record_node_metric
+
+
+def test_chunk_summaries_keep_node_metrics(monkeypatch):
+    threads = set()
+
+    def fake_completion(api_key, **kwargs):
+        threads.add(threading.current_thread().name)
+        record_node_metric("llm_calls", 1)
+        return "summary of: " + kwargs["messages"][1]["content"][:20]
+
+    monkeypatch.setattr(summarize_html_content, "cached_chat_completion", fake_completion)
+    monkeypatch.setattr(summarize_html_content, "SUMMARY_CHUNK_TOKENS", 200)
+    content = "\n\n".join(f"Paragraph {i}. " + "lorem ipsum dolor sit amet " * 20 for i in range(40))
+
+    with collect_node_metrics() as metrics:
+        summaries = summarize_html_content.summarize_chunks("sk-test", "user", False, content)
+
+    assert summaries[0].startswith("summary of: Paragraph 0.")
+    assert metrics["llm_calls"] == len(summaries) == metrics["summary_chunks"]
+    assert any(name.startswith("flowly-summary") for name in threads)
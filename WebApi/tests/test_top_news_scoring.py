@@ -0,0 +1,25 @@
+from nodes.fetch_top_news import CATEGORY_PATTERNS, compile_keyword_pattern, score_headline
+
+
+def score(pattern, title, description=""):
+    content = title + ("\n\n" + description if description else "")
+    return score_headline(pattern, content, len(title))
+
+
+def test_title_hits_count_double():
+    pattern = CATEGORY_PATTERNS["BBC News"]["business"]
+    assert score(pattern, "Market rally lifts banks") == 2
+    assert score(pattern, "Banks rally", "The market and the economy recovered") == 2
+    assert score(pattern, "Market rally", "The economy recovered") == 3
+
+
+def test_keywords_match_whole_words_only():
+    pattern = CATEGORY_PATTERNS["BBC News"]["technology"]
+    assert score(pattern, "Rain delays the train", "Said officials") == 0
+    assert score(pattern, "AI tools for apps", "New software from an AI lab") == 4
+
+
+def test_phrases_do_not_span_title_and_description():
+    pattern = compile_keyword_pattern(["artificial intelligence"])
+    assert score(pattern, "Report on artificial", "intelligence budgets") == 0
+    assert score(pattern, "Artificial intelligence report") == 2
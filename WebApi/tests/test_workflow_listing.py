@@ -0,0 +1,119 @@
+import asyncio
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+import redis_client
+from jwt_utils import get_current_user
+
+
+class FakePipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.results = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        return False
+
+    def zcard(self, key):
+        self.results.append(len(self.redis.zsets.get(key, {})))
+
+    def scard(self, key):
+        # No legacy (unindexed) workflows, so the backfill has nothing to do
+        self.results.append(0)
+
+    async def execute(self):
+        return self.results
+
+
+class FakeAsyncRedis:
+    """Just enough of redis.asyncio for the workflow listing."""
+
+    def __init__(self):
+        self.values = {}
+        self.zsets = {}
+        self.zrange_calls = 0
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+    async def zrevrangebyscore(self, key, max_score, min_score, start=0, num=None, withscores=False):
+        self.zrange_calls += 1
+        if max_score == "+inf":
+            below = lambda score: True
+        else:
+            limit = float(max_score.lstrip("("))
+            below = lambda score: score < limit
+        entries = sorted(((member, score) for member, score in self.zsets.get(key, {}).items() if below(score)), key=lambda entry: -entry[1])
+        return entries[start:start + num]
+
+    async def mget(self, keys):
+        return [self.values.get(key) for key in keys]
+
+
+@pytest.fixture
+def fake_redis(monkeypatch):
+    fake = FakeAsyncRedis()
+
+    async def get_redis_client():
+        return fake
+
+    monkeypatch.setattr(redis_client, "get_redis_client", get_redis_client)
+    monkeypatch.setattr(redis_client, "REDIS_BATCH_SIZE", 4)
+    index = fake.zsets.setdefault(redis_client._workflow_index_key("user"), {})
+    for i in range(20):
+        workflow_id = f"wf-{i}"
+        name = f"Daily news {i}" if i % 3 == 0 else f"Weather {i}"
+        index[workflow_id] = float(1000 + i)
+        fake.values[redis_client._workflow_summary_key("user", workflow_id)] = json.dumps({"workflow_id": workflow_id, "name": name})
+    return fake
+
+
+def list_all(**kwargs) -> list:
+    names, cursor = [], None
+    while True:
+        page = asyncio.run(redis_client.get_user_workflows("user", cursor=cursor, **kwargs))
+        names.append([workflow["name"] for workflow in page["workflows"]])
+        cursor = page["next_cursor"]
+        if not cursor:
+            return names
+
+
+def test_pages_cover_every_workflow_newest_first(fake_redis):
+    pages = list_all(limit=8)
+    assert [len(page) for page in pages] == [8, 8, 4]
+    assert pages[0][0] == "Weather 19"
+    assert sum(pages, [])[-1] == "Daily news 0"
+
+
+def test_query_filters_names_across_the_whole_index(fake_redis):
+    pages = list_all(limit=3, query="  DAILY ")
+    assert pages == [
+        ["Daily news 18", "Daily news 15", "Daily news 12"],
+        ["Daily news 9", "Daily news 6", "Daily news 3"],
+        ["Daily news 0"],
+    ]
+
+
+@pytest.mark.parametrize("cursor", ["not-a-number", "nan", "inf", "1e400"])
+def test_malformed_cursor_is_rejected(fake_redis, cursor):
+    with pytest.raises(ValueError):
+        asyncio.run(redis_client.get_user_workflows("user", cursor=cursor))
+    assert fake_redis.zrange_calls == 0
+
+
+def test_endpoint_returns_400_for_a_malformed_cursor(fake_redis):
+    main.app.dependency_overrides[get_current_user] = lambda: {"id": "user"}
+    try:
+        client = TestClient(main.app)
+        assert client.get("/user/list-workflows", params={"cursor": "abc"}).status_code == 400
+        response = client.get("/user/list-workflows", params={"q": "weather", "limit": 2})
+    finally:
+        main.app.dependency_overrides.clear()
+    assert response.status_code == 200
+    assert [workflow["name"] for workflow in response.json()["workflows"]] == ["Weather 19", "Weather 17"]
@@ -0,0 +1,126 @@
+import asyncio
+
+import pytest
+
+from redis_client import workflow_key, workflow_plan_key
+from services import workflow_plans
+from services.workflow_plans import build_workflow_plan
+
+HTML = "8c5a1f02-d0cd-4c6d-96b6-51f1bc1f0b17"
+SUMMARY = "0ff35b88-681c-4c64-94b5-7b74dbfbb471"
+TEMPLATE = "1a7c2b8e-e4ae-4c8e-b2c4-999b4b3cf80d"
+EMAIL = "6789d23f-1352-4b11-b9a3-2f4f6f96fcd0"
+
+
+def node(react_id: str, node_id: str, title: str, value: str = "") -> dict:
+    additional_input = {title: value} if value else {}
+    return {"id": react_id, "data": {"node_id": node_id, "title": title, "additional_input": additional_input}}
+
+
+def edge(source: str, target: str) -> dict:
+    return {"id": f"{source}-{target}", "source": source, "target": target}
+
+
+def plan_of(nodes, edges=None) -> dict:
+    return build_workflow_plan({"workflow_id": "wf", "data": {"nodes": nodes, "edges": edges or []}})
+
+
+def test_without_edges_every_node_runs_in_canvas_order():
+    plan = plan_of([node("1", HTML, "Fetch Html", "https://example.com"), node("2", SUMMARY, "Summarize")])
+    assert plan["steps"] == [
+        {"node_id": HTML, "node_name": "Fetch Html", "seq": 1, "node_result": "", "node_input": "https://example.com"},
+        {"node_id": SUMMARY, "node_name": "Summarize", "seq": 2, "node_result": ""},
+    ]
+    assert plan["edges"] is None
+
+
+def test_edges_run_the_connected_nodes_as_one_chain():
+    # Canvas order differs from the chain; the unconnected email node does not run
+    nodes = [node("3", TEMPLATE, "Html Template"), node("1", HTML, "Fetch Html", "https://example.com"),
+             node("2", SUMMARY, "Summarize Content"), node("4", EMAIL, "Send Email")]
+    plan = plan_of(nodes, [edge("2", "3"), edge("1", "2")])
+    assert [(step["seq"], step["node_id"], step["node_name"]) for step in plan["steps"]] == [
+        (1, HTML, "Fetch_Html"), (2, SUMMARY, "Summarize_Content"), (3, TEMPLATE, "Html_Template"),
+    ]
+    assert plan["steps"][0]["node_input"] == "https://example.com"
+    assert plan["edges"] is None
+    assert plan["graph_key"] == [["fetch_html_content", "summarize_html_content", "convert_to_html_template"], []]
+    # additional_input still covers every node on the canvas, like the editor's request
+    assert [item["node_id"] for item in plan["additional_input"]] == [TEMPLATE, HTML, SUMMARY, EMAIL]
+
+
+def test_branching_edges_follow_the_last_edge_like_the_editor():
+    # The editor keeps one next node per node (the last edge wins), so a fan-out runs one branch
+    nodes = [node("1", HTML, "Fetch"), node("2", SUMMARY, "Summary"), node("3", TEMPLATE, "Template")]
+    plan = plan_of(nodes, [edge("1", "2"), edge("1", "3")])
+    assert [step["node_id"] for step in plan["steps"]] == [HTML, TEMPLATE]
+
+
+def test_invalid_edges_are_rejected():
+    nodes = [node("1", HTML, "Fetch"), node("2", SUMMARY, "Summary")]
+    with pytest.raises(ValueError):
+        plan_of(nodes, [edge("1", "missing")])
+    with pytest.raises(ValueError):
+        plan_of(nodes, [edge("1", "2"), edge("2", "1")])
+
+
+class FakePlanRedis:
+    """get/exists/eval for get_workflow_plan; eval runs SET_PLAN_IF_WORKFLOW_EXISTS_LUA."""
+
+    def __init__(self):
+        self.values = {}
+
+    async def get(self, key):
+        return self.values.get(key)
+
+    async def exists(self, key):
+        return int(key in self.values)
+
+    async def eval(self, script, numkeys, blob_key, plan_key, plan, ttl):
+        assert script == workflow_plans.SET_PLAN_IF_WORKFLOW_EXISTS_LUA
+        if blob_key not in self.values:
+            return 0
+        self.values[plan_key] = plan
+        return 1
+
+
+@pytest.fixture
+def plan_redis(monkeypatch):
+    fake = FakePlanRedis()
+
+    async def get_redis_client():
+        return fake
+
+    monkeypatch.setattr(workflow_plans, "get_redis_client", get_redis_client)
+    workflow_plans._memory_cache.clear()
+    yield fake
+    workflow_plans._memory_cache.clear()
+
+
+def saved_workflow(on_read=None):
+    async def get_user_workflow(user_id, workflow_id):
+        workflow = {"workflow_id": workflow_id, "data": {"nodes": [node("1", HTML, "Fetch Html", "https://example.com")], "edges": []}}
+        if on_read:
+            on_read()
+        return workflow
+    return get_user_workflow
+
+
+def test_plan_is_built_once_and_stored(plan_redis, monkeypatch):
+    plan_redis.values[workflow_key("user", "wf")] = b"blob"
+    monkeypatch.setattr(workflow_plans, "get_user_workflow", saved_workflow())
+    plan = asyncio.run(workflow_plans.get_workflow_plan("user", "wf"))
+    assert plan["steps"][0]["node_id"] == HTML
+    assert workflow_plan_key("user", "wf") in plan_redis.values
+    assert asyncio.run(workflow_plans.get_workflow_plan("user", "wf")) is plan
+
+
+def test_plan_of_a_workflow_deleted_mid_build_is_not_stored(plan_redis, monkeypatch):
+    blob_key = workflow_key("user", "wf")
+    plan_redis.values[blob_key] = b"blob"
+    # delete_user_workflow runs after the workflow was read, before the plan is written
+    monkeypatch.setattr(workflow_plans, "get_user_workflow", saved_workflow(on_read=lambda: plan_redis.values.pop(blob_key)))
+    with pytest.raises(workflow_plans.WorkflowNotFoundError):
+        asyncio.run(workflow_plans.get_workflow_plan("user", "wf"))
+    assert workflow_plan_key("user", "wf") not in plan_redis.values
+    assert workflow_plans._memory_cache.get(workflow_plan_key("user", "wf")) is None
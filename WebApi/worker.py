@@ -0,0 +1,138 @@
+"""
+Background worker for async workflow runs (/run-graph with async=true).
+
+    python worker.py --concurrency 4
+
+Pulls jobs from the Redis stream consumer group and runs at most --concurrency workflows
+at a time. Start as many worker processes as needed; each gets its own consumer name.
+Jobs a crashed worker left unacknowledged are claimed again after JOB_CLAIM_IDLE_MS.
+"""
+import argparse
+import asyncio
+import json
+import os
+import signal
+import socket
+import time
+from contextlib import suppress
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from code_graph_flow_auto import execute_graph_flow_async
+from redis_client import get_redis_client, init_sync_redis_pool, close_sync_redis_pool, listen_for_openai_key_invalidations
+from services.html_parser import shutdown_html_process_pool
+from services.job_queue import (
+    JOB_MAX_ATTEMPTS, ensure_job_group, read_jobs, claim_stale_jobs,
+    mark_run_started, complete_run, fail_run,
+)
+
+JOB_WORKER_CONCURRENCY = int(os.getenv("JOB_WORKER_CONCURRENCY", "4"))
+JOB_READ_BLOCK_MS = int(os.getenv("JOB_READ_BLOCK_MS", "5000"))
+# Seconds between scans for jobs abandoned by crashed workers
+JOB_CLAIM_INTERVAL = float(os.getenv("JOB_CLAIM_INTERVAL", "60"))
+
+
+async def run_job(message_id: str, fields: dict):
+    run_id = fields.get("run_id", "")
+    try:
+        attempts = await mark_run_started(run_id)
+        if attempts > JOB_MAX_ATTEMPTS:
+            await fail_run(run_id, message_id, f"Gave up after {JOB_MAX_ATTEMPTS} attempts")
+            return
+        payload = json.loads(fields["payload"])
+        started = time.perf_counter()
+        result = await execute_graph_flow_async(
+            payload["graph_flowData"],
+            payload.get("additional_input") or [],
+            user_id=fields.get("user_id") or None,
+            edges=payload.get("edges"),
+            no_cache=bool(payload.get("no_cache", False)),
+        )
+        await complete_run(run_id, message_id, result)
+        print(f"✅ Run {run_id} completed in {time.perf_counter() - started:.1f}s")
+    except asyncio.CancelledError:
+        # Left unacknowledged so another worker claims it
+        raise
+    except Exception as e:
+        print(f"❌ Run {run_id} failed: {e}")
+        try:
+            await fail_run(run_id, message_id, str(e) or type(e).__name__)
+        except Exception as e:
+            print(f"❌ Error recording failure of run {run_id}: {e}")
+
+
+async def work(consumer: str, concurrency: int, stop: asyncio.Event):
+    client = await get_redis_client()
+    await ensure_job_group(client)
+    slots = asyncio.Semaphore(concurrency)
+    running = set()
+    last_claim = 0.0
+
+    def start(entries):
+        for message_id, fields in entries:
+            task = asyncio.create_task(run_job(message_id, fields))
+            running.add(task)
+            task.add_done_callback(lambda done: (running.discard(done), slots.release()))
+
+    print(f"👷 Worker {consumer} started (concurrency {concurrency})")
+    while not stop.is_set():
+        # Wait for a free slot, then read as many jobs as there are free slots
+        await slots.acquire()
+        free = 1
+        while not slots.locked() and free < concurrency:
+            await slots.acquire()
+            free += 1
+        if stop.is_set():
+            # Stopped while waiting for a slot: don't take new jobs
+            for _ in range(free):
+                slots.release()
+            break
+        try:
+            entries = []
+            if time.monotonic() - last_claim >= JOB_CLAIM_INTERVAL:
+                last_claim = time.monotonic()
+                entries = await claim_stale_jobs(consumer, free)
+            if not entries:
+                entries = await read_jobs(consumer, free, JOB_READ_BLOCK_MS)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"❌ Error reading jobs: {e}")
+            entries = []
+            await asyncio.sleep(1)
+        for _ in range(free - len(entries)):
+            slots.release()
+        start(entries)
+
+    if running:
+        print(f"⏳ Waiting for {len(running)} running jobs")
+        await asyncio.gather(*running, return_exceptions=True)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Run queued workflow runs")
+    parser.add_argument("--concurrency", type=int, default=JOB_WORKER_CONCURRENCY, help="Max workflows run at once")
+    parser.add_argument("--name", default=f"{socket.gethostname()}-{os.getpid()}", help="Consumer name in the group")
+    args = parser.parse_args()
+
+    init_sync_redis_pool()
+    # Queued runs use the in-process OpenAI key cache too: evict keys other processes save or delete
+    key_invalidation_task = asyncio.create_task(listen_for_openai_key_invalidations())
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+    try:
+        await work(args.name, args.concurrency, stop)
+    finally:
+        key_invalidation_task.cancel()
+        with suppress(asyncio.CancelledError):
+            await key_invalidation_task
+        close_sync_redis_pool()
+        shutdown_html_process_pool()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
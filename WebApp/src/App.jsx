@@ -46,7 +46,10 @@ function AppPageComponent() {
   const [savedWorkflows, setSavedWorkflows] = useState([]);
   const [isLoadingWorkflows, setIsLoadingWorkflows] = useState(false);
   const [loadError, setLoadError] = useState(null);
+  const [workflowsCursor, setWorkflowsCursor] = useState(null);
   const [searchTerm, setSearchTerm] = useState('');
+  // Id of the latest list request, so a slow response for an older search is ignored
+  const workflowsRequestRef = useRef(0);
 
   const handleBackToHome = () => {
     navigate('/');
@@ -255,8 +258,29 @@ function AppPageComponent() {
         graph_flowData: executionList,
         additional_input: additionalInput,
       };
+      // Nodes that have started streaming tokens in this run
+      const streamedNodeIds = new Set();
       // Use the new streaming service
       for await (const data of streamGraphExecution(payload)) {
+        if (data.type === 'delta' && data.node_id) {
+          // Incremental LLM output: show tokens as they arrive, the final result line follows
+          const isFirstDelta = !streamedNodeIds.has(data.node_id);
+          streamedNodeIds.add(data.node_id);
+          setNodes(currentNodes =>
+            currentNodes.map(node => {
+              if (node.data.node_id !== data.node_id) return node;
+              const previous = isFirstDelta ? '' : (node.data.node_result || '');
+              return {
+                ...node,
+                data: {
+                  ...node.data,
+                  node_result: previous + data.delta,
+                }
+              };
+            })
+          );
+          continue;
+        }
         if (data.results && data.results.node_id) {
           setNodes(currentNodes =>
             currentNodes.map(node => {
@@ -523,13 +547,18 @@ function AppPageComponent() {
     return orderedNodes;
   };
 
-  // Fetch saved workflows from backend
-  const fetchSavedWorkflows = async () => {
+  // Fetch saved workflow summaries from backend (one page; pass the cursor to load more).
+  // The name search runs on the server, so it covers workflows on pages not loaded yet.
+  const fetchSavedWorkflows = async (cursor = null, query = '') => {
+    const requestId = ++workflowsRequestRef.current;
     setIsLoadingWorkflows(true);
     setLoadError(null);
     try {
       const token = localStorage.getItem('flowly_jwt_token');
-      const response = await fetch(`${API_BASE_URL}/user/list-workflows`, {
+      const params = new URLSearchParams();
+      if (cursor) params.set('cursor', cursor);
+      if (query.trim()) params.set('q', query.trim());
+      const response = await fetch(`${API_BASE_URL}/user/list-workflows?${params}`, {
         method: 'GET',
         headers: {
           'Authorization': `Bearer ${token}`,
@@ -537,22 +566,48 @@ function AppPageComponent() {
       });
       if (!response.ok) throw new Error('Failed to fetch workflows');
       const data = await response.json();
-      setSavedWorkflows(data.workflows || []);
+      if (requestId !== workflowsRequestRef.current) return;
+      setSavedWorkflows(prev => cursor ? [...prev, ...(data.workflows || [])] : (data.workflows || []));
+      setWorkflowsCursor(data.next_cursor || null);
     } catch (e) {
+      if (requestId !== workflowsRequestRef.current) return;
       setLoadError('Failed to load workflows');
-      setSavedWorkflows([]);
+      if (!cursor) setSavedWorkflows([]);
     } finally {
-      setIsLoadingWorkflows(false);
+      if (requestId === workflowsRequestRef.current) setIsLoadingWorkflows(false);
     }
   };
 
   const handleOpen = useCallback(() => {
-    setIsOpenModalOpen(true);
     setSearchTerm(""); // Clear search box on open
-    fetchSavedWorkflows();
+    setIsOpenModalOpen(true);
   }, []);
 
-  const handleLoadWorkflow = (workflow) => {
+  // Load the first page when the modal opens, and again (debounced) as the search changes
+  useEffect(() => {
+    if (!isOpenModalOpen) return;
+    const timer = setTimeout(() => fetchSavedWorkflows(null, searchTerm), searchTerm ? 300 : 0);
+    return () => clearTimeout(timer);
+  }, [isOpenModalOpen, searchTerm]);
+
+  const handleLoadWorkflow = async (summary) => {
+    if (!summary || !summary.workflow_id) return;
+    // The list only has summaries; fetch the full graph for the chosen workflow
+    let workflow;
+    try {
+      const token = localStorage.getItem('flowly_jwt_token');
+      const response = await fetch(`${API_BASE_URL}/user/workflow/${summary.workflow_id}`, {
+        method: 'GET',
+        headers: {
+          'Authorization': `Bearer ${token}`,
+        },
+      });
+      if (!response.ok) throw new Error('Failed to fetch workflow');
+      workflow = await response.json();
+    } catch (e) {
+      toast.error('❌ Failed to load workflow');
+      return;
+    }
     if (!workflow || !workflow.data) return;
     const { nodes: loadedNodes, edges: loadedEdges } = workflow.data;
     if (!Array.isArray(loadedNodes) || !Array.isArray(loadedEdges)) {
@@ -593,11 +648,6 @@ function AppPageComponent() {
     }
   };
 
-  // Filtered workflows for search
-  const filteredWorkflows = savedWorkflows.filter(wf =>
-    wf.name.toLowerCase().includes(searchTerm.toLowerCase())
-  );
-
   return (
     <div style={{ 
       display: 'flex', 
@@ -709,15 +759,15 @@ function AppPageComponent() {
             }}
           />
         </div>
-        {isLoadingWorkflows ? (
+        {isLoadingWorkflows && savedWorkflows.length === 0 ? (
           <div style={{ padding: 24, textAlign: 'center' }}>Loading...</div>
         ) : loadError ? (
           <div style={{ color: 'red', padding: 24 }}>{loadError}</div>
-        ) : filteredWorkflows.length === 0 ? (
+        ) : savedWorkflows.length === 0 ? (
           <div style={{ padding: 24, color: theme.colors.text.secondary }}>No saved workflows found.</div>
         ) : (
           <div style={{ maxHeight: 320, overflowY: 'auto' }}>
-            {filteredWorkflows.map(wf => (
+            {savedWorkflows.map(wf => (
               <div key={wf.workflow_id} style={{
                 padding: '12px 0',
                 borderBottom: `1px solid ${theme.colors.border}`,
@@ -772,6 +822,24 @@ function AppPageComponent() {
                 </div>
               </div>
             ))}
+            {workflowsCursor && (
+              <button
+                style={{
+                  width: '100%',
+                  marginTop: 12,
+                  padding: '8px 12px',
+                  borderRadius: 6,
+                  border: `1px solid ${theme.colors.border}`,
+                  background: theme.colors.background,
+                  color: theme.colors.text.primary,
+                  cursor: 'pointer',
+                }}
+                disabled={isLoadingWorkflows}
+                onClick={() => fetchSavedWorkflows(workflowsCursor, searchTerm)}
+              >
+                {isLoadingWorkflows ? 'Loading...' : 'Load more'}
+              </button>
+            )}
           </div>
         )}
       </Modal>